@@ -0,0 +1,87 @@
+# backend/ml-service/src/api/routes/ats.py
+
+import json
+from typing import Any, AsyncIterator, List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, conint
+from ml.ats_checker import get_ats_checker
+
+router = APIRouter()
+
+# Resumes scored together (one sparse product) when ranking an NDJSON upload
+STREAM_CHUNK_SIZE = 64
+
+# ---------- Request Models ----------
+class BatchATSRequest(BaseModel):
+    job_description: str
+    resumes: List[str]
+    # Return only the best k applicants (None = all, ranked)
+    top_k: Optional[conint(ge=1)] = None
+
+# ---------- Helpers ----------
+async def _ndjson_lines(body: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parses an NDJSON request body one line at a time, as the chunks arrive.
+    """
+    buffer = b""
+    async for data in body:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+# ---------- Routes ----------
+@router.post("/rank")
+def rank_resumes(req: BatchATSRequest):
+    ranked = get_ats_checker().rank_resumes(req.resumes, req.job_description, top_k=req.top_k)
+    return {"count": len(req.resumes), "results": ranked}
+
+@router.post("/rank/stream")
+async def rank_resumes_stream(request: Request):
+    # NDJSON in and out: the first line is {"job_description": ...}, every further line one
+    # resume (a JSON string or {"text": ...}). Resumes are scored a chunk at a time while the
+    # upload is still arriving and one report line per resume is written back in input
+    # order, so neither side holds the whole batch.
+    lines = _ndjson_lines(request.stream())
+    try:
+        header = await lines.__anext__()
+        job_description = header["job_description"]
+    except (StopAsyncIteration, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail='The first NDJSON line must be {"job_description": "..."}.')
+
+    checker = get_ats_checker()
+    # The JD is vectorized (and its keyword weights computed) once for the whole upload
+    job = await run_in_threadpool(checker.prepare_job, job_description)
+
+    async def reports():
+        index, chunk, error = 0, [], None
+        while True:
+            # Only reading the line is guarded: scoring errors are not reported as bad input
+            try:
+                item = await lines.__anext__()
+                text = item if isinstance(item, str) else item["text"]
+                if not isinstance(text, str):
+                    raise TypeError("resume text must be a string")
+                chunk.append(text)
+            except StopAsyncIteration:
+                break
+            except (ValueError, KeyError, TypeError) as e:
+                error = f"Invalid resume line: {e}"
+                break
+            if len(chunk) == STREAM_CHUNK_SIZE:
+                for report in await run_in_threadpool(checker.score_chunk, chunk, job, index):
+                    yield json.dumps(report) + "\n"
+                index, chunk = index + len(chunk), []
+
+        # The resumes read before a bad line are still scored
+        for report in await run_in_threadpool(checker.score_chunk, chunk, job, index):
+            yield json.dumps(report) + "\n"
+        if error is not None:
+            yield json.dumps({"index": index + len(chunk), "error": error}) + "\n"
+
+    return StreamingResponse(reports(), media_type="application/x-ndjson")
@@ -2,23 +2,27 @@
 
 from fastapi import APIRouter
 from pydantic import BaseModel
-from ml.nlp_pipeline import parse_resume, extract_skills_from_description
-from ml.similarity import calculate_similarity
+from ml.nlp_pipeline import parse_resume, parse_resume_incremental, extract_skills_from_description
+from ml.similarity import calculate_similarity, match_skills_semantic
 
 router = APIRouter()
 
 # ---------- Request Models ----------
 class ResumeRequest(BaseModel):
     text: str
+    # Re-parse only the sections that changed since the last call (resume builder edits)
+    incremental: bool = False
 
 class MatchRequest(BaseModel):
     resume_text: str
     job_description: str
+    # Match skills by embedding similarity as well as by name
+    semantic_matching: bool = False
 
 # ---------- Routes ----------
 @router.post("/analyze-resume")
 def analyze_resume(req: ResumeRequest):
-    parsed = parse_resume(req.text)
+    parsed = parse_resume_incremental(req.text) if req.incremental else parse_resume(req.text)
     return {"resume": parsed}
 
 @router.post("/match-job")
@@ -26,23 +30,40 @@ def match_job(req: MatchRequest):
     parsed_resume = parse_resume(req.resume_text)
     job_skills = extract_skills_from_description(req.job_description)
 
+    # Best resume skill (and cosine) for each job skill; computed once for the score and the response
+    semantic = req.semantic_matching
+    skill_matches = None
+    if semantic:
+        try:
+            skill_matches = match_skills_semantic(parsed_resume.get("skills", []), job_skills)
+        except Exception as e:
+            # Unknown skills need the encoder; if it cannot load, match skills by name instead
+            print(f"Error matching skills semantically: {e}")
+            semantic = False
+
     score, matched, missing = calculate_similarity(
         parsed_resume.get("skills", []),
         job_skills,
-        return_details=True
+        return_details=True,
+        semantic=semantic,
+        skill_matches=skill_matches
     )
 
+    analysis = {
+        "score": score,
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "match_level": (
+            "High" if score >= 75 else
+            "Medium" if score >= 50 else
+            "Low"
+        )
+    }
+    if req.semantic_matching:
+        analysis["skill_matches"] = skill_matches
+
     return {
         "resume": parsed_resume,
         "job_description": {"skills": job_skills},
-        "analysis": {
-            "score": score,
-            "matched_skills": matched,
-            "missing_skills": missing,
-            "match_level": (
-                "High" if score >= 75 else
-                "Medium" if score >= 50 else
-                "Low"
-            )
-        }
+        "analysis": analysis
     }
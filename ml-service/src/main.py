@@ -1,21 +1,102 @@
 # backend/ml-service/src/main.py
 
+import json
+import os
+from typing import List
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 # from src.api.routes import resume
-from api.routes import resume
+from api.routes import resume, ats
 # resume import from api routes
-from ml.output import generate_complete_report
+from ml.output import generate_complete_report_async, stream_complete_report
+from ml.model_registry import registry
+from ml.cache import cache_stats
+from ml.similarity import get_encode_batcher
+from ml.llm_client import get_llm_client
+from ml.recommendation import ensure_job_catalog, get_recommender, job_catalog
 
 app = FastAPI(title="ML Resume Service")
 
+class JobPosting(BaseModel):
+    job_id: str
+    role_title: str
+    skills: str = ""
+    job_description: str = ""
+
+class JobIds(BaseModel):
+    job_ids: List[str]
+
 # Register routes
 app.include_router(resume.router, prefix="/resume", tags=["Resume Analysis"])
+app.include_router(ats.router, prefix="/ats", tags=["ATS"])
+
+@app.on_event("startup")
+def warmup_models():
+    # Models load lazily on first use; set ML_WARMUP=1 to load them before serving traffic
+    if os.getenv("ML_WARMUP", "0") == "1":
+        for name, status in registry.warmup().items():
+            print(f"[warmup] {name}: {status}")
 
 @app.get("/")
 def root():
     return {"message": "ML Resume Service is running 🚀"}
 
+@app.get("/models")
+def models_status():
+    return registry.report()
+
+@app.post("/models/warmup")
+def models_warmup():
+    return registry.warmup()
+
+@app.get("/cache")
+def caches_status():
+    return cache_stats()
+
+@app.get("/encoder")
+def encoder_status():
+    # Micro-batching queue depth and batch sizes in front of the sentence encoder
+    return get_encode_batcher().stats()
+
+@app.get("/llm")
+def llm_stats():
+    # Backend, concurrency limit, in-flight requests and latency of the shared LLM client
+    return get_llm_client().stats()
+
+@app.get("/jobs/catalog")
+def job_catalog_status():
+    return job_catalog.stats()
+
+@app.post("/jobs")
+def upsert_jobs(jobs: List[JobPosting]):
+    # Vectorized with the current vectorizer; other workers pick the new generation up on their next poll
+    manifest = ensure_job_catalog().upsert_jobs(job.dict() for job in jobs)
+    get_recommender(refresh=True)
+    return {"generation": manifest["generation"], "rebuild_due": job_catalog.rebuild_due(manifest)}
+
+@app.post("/jobs/delete")
+def delete_jobs(req: JobIds):
+    manifest = ensure_job_catalog().delete_jobs(req.job_ids)
+    get_recommender(refresh=True)
+    return {"generation": manifest["generation"]}
+
+@app.post("/jobs/rebuild")
+def rebuild_jobs():
+    # Refits TF-IDF (fresh IDF weights) over all live jobs and compacts the segments
+    manifest = ensure_job_catalog().rebuild()
+    get_recommender(refresh=True)
+    return {"generation": manifest["generation"], "jobs": manifest["base_rows"]}
+
 @app.post("/generate-report")
-def generate_report(resume_text: str, job_description: str, target_role: str):
-    report = generate_complete_report(resume_text, job_description, target_role)
-    return report
\ No newline at end of file
+async def generate_report(resume_text: str, job_description: str, target_role: str):
+    # Local stages run on the stage pool and LLM calls on the event loop, so this stays async
+    report = await generate_complete_report_async(resume_text, job_description, target_role)
+    return report
+
+@app.post("/generate-report/stream")
+async def generate_report_stream(resume_text: str, job_description: str, target_role: str):
+    # One NDJSON line per section as soon as it is ready: local sections first, then each LLM section
+    sections = stream_complete_report(resume_text, job_description, target_role)
+    return StreamingResponse((json.dumps(chunk, default=str) + "\n" async for chunk in sections),
+                             media_type="application/x-ndjson")
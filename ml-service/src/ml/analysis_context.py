@@ -0,0 +1,123 @@
+# backend/src/ml/analysis_context.py
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ml.cache import normalize_text
+from ml.nlp_pipeline import extract_skills_from_description, get_nlp, make_skill_doc, parse_resume
+from ml.preprocess import clean_text
+
+
+class AnalysisContext:
+    """
+    Everything derived from one resume (and job description) during a single request.
+
+    Each artifact is computed on first use and memoized: the normalized and cleaned
+    resume text, the spaCy Docs, the parsed resume and skill lists, pooled skill
+    embeddings, TF-IDF vectors per vectorizer and ATS keyword scans. The report stages
+    share one context, so the resume goes through the tokenizer and each vectorizer once
+    however many stages need it. Safe to use from concurrent stages: a value being
+    computed by one thread is waited for, not recomputed, by the others.
+    """
+    # Texts tfidf() can vectorize
+    FIELDS = ("resume", "job_description", "resume_skills")
+
+    def __init__(self, resume_text: str, job_description: Optional[str] = None):
+        """
+        Args:
+            resume_text (str): The text of the candidate's resume.
+            job_description (str, optional): The job description it is analyzed against.
+        """
+        self.resume_text = resume_text
+        self.job_description = job_description
+        self._values: Dict[Any, Any] = {}
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def memo(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the value stored under `key`, computing it once with `compute()`.
+        """
+        if key in self._values:
+            return self._values[key]
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._values:
+                self._values[key] = compute()
+        return self._values[key]
+
+    @property
+    def normalized_resume(self) -> str:
+        return self.memo("normalized_resume", lambda: normalize_text(self.resume_text))
+
+    @property
+    def cleaned_resume(self) -> str:
+        return self.memo("cleaned_resume", lambda: clean_text(self.normalized_resume))
+
+    @property
+    def resume_doc(self):
+        """
+        spaCy Doc (NER) of the normalized resume; only built when the parse cache misses.
+        """
+        return self.memo("resume_doc", lambda: get_nlp()(self.normalized_resume))
+
+    @property
+    def skill_doc(self):
+        """
+        Tokenizer-only Doc of the cleaned resume that skills are matched on; only built
+        when the parse cache misses.
+        """
+        return self.memo("skill_doc", lambda: make_skill_doc(self.cleaned_resume))
+
+    @property
+    def parsed_resume(self) -> dict:
+        return self.memo("parsed_resume", lambda: parse_resume(
+            self.normalized_resume, get_doc=lambda: self.resume_doc, get_skill_doc=lambda: self.skill_doc))
+
+    @property
+    def resume_skills(self) -> List[str]:
+        return self.parsed_resume.get("skills", [])
+
+    @property
+    def job_skills(self) -> List[str]:
+        return self.memo("job_skills", lambda: extract_skills_from_description(self.job_description or ""))
+
+    def skill_embedding(self, field: str = "resume") -> np.ndarray:
+        """
+        Mean of the precomputed embeddings of the resume's or job description's skills.
+
+        Args:
+            field (str): "resume" or "job_description".
+
+        Returns:
+            np.ndarray: (dim,) normalized embedding. Raises if the embedding table is unavailable.
+        """
+        from ml.similarity import pooled_skill_embedding
+
+        skills = {"resume": lambda: self.resume_skills, "job_description": lambda: self.job_skills}[field]
+        return self.memo(("skill_embedding", field), lambda: pooled_skill_embedding(skills()))
+
+    def text(self, field: str) -> str:
+        if field == "resume":
+            return self.resume_text
+        if field == "job_description":
+            return self.job_description or ""
+        if field == "resume_skills":
+            # What the career recommender matches against job descriptions
+            return ", ".join(self.resume_skills)
+        raise ValueError(f"Unknown field '{field}'. Choose from {self.FIELDS}.")
+
+    def tfidf(self, vectorizer, field: str):
+        """
+        (1, vocabulary) sparse TF-IDF row of one of the texts, once per vectorizer.
+
+        Args:
+            vectorizer (TfidfVectorizer): A fitted vectorizer (ATS, career recommender, ...).
+            field (str): "resume", "job_description" or "resume_skills".
+        """
+        # The vectorizer is kept with its vector so its id cannot be reused while cached
+        key = ("tfidf", id(vectorizer), field)
+        return self.memo(key, lambda: (vectorizer, vectorizer.transform([self.text(field)])))[1]
@@ -1,24 +1,29 @@
 # backend/src/ml/analyzer.py
 
-from ml.nlp_pipeline import parse_resume, extract_skills_from_description
+from ml.analysis_context import AnalysisContext
 from ml.similarity import calculate_similarity
 
-def analyze_resume_vs_job(resume_text: str, job_description: str) -> dict:
+def analyze_resume_vs_job(resume_text: str, job_description: str, context: AnalysisContext = None) -> dict:
     """
     End-to-end analyzer that:
     1. Parses the resume for name and skills.
     2. Extracts required skills from the job description.
     3. Calculates similarity, matched, and missing skills.
+
+    Pass the request's AnalysisContext to share the parse and vectors with other stages.
     """
+    context = context or AnalysisContext(resume_text, job_description)
+
     # Parse resume
-    parsed_resume = parse_resume(resume_text)
+    parsed_resume = context.parsed_resume
     resume_skills = parsed_resume.get("skills", [])
 
     # Extract job description skills
-    job_skills = extract_skills_from_description(job_description)
+    job_skills = context.job_skills
 
     # Calculate similarity score
-    similarity_score, matched, missing = calculate_similarity(resume_skills, job_skills, return_details=True)
+    similarity_score, matched, missing = calculate_similarity(resume_skills, job_skills, return_details=True,
+                                                              context=context)
     
     print(f"Resume Skills: {resume_skills}")
 
@@ -33,12 +38,13 @@ def analyze_resume_vs_job(resume_text: str, job_description: str) -> dict:
     }
 
 
-resume_text = """John Doe
+if __name__ == '__main__':
+    resume_text = """John Doe
     Software Engineer
     Skills: Python, Java, SQL
     Experience: 5 years in software development."""
-    
-job_description = """We are looking for a Software Engineer with skills in Python, Docker, Kubernetes, and AWS."""
-    
-result = analyze_resume_vs_job(resume_text, job_description)
-print(result)
\ No newline at end of file
+
+    job_description = """We are looking for a Software Engineer with skills in Python, Docker, Kubernetes, and AWS."""
+
+    result = analyze_resume_vs_job(resume_text, job_description)
+    print(result)
@@ -0,0 +1,368 @@
+# backend/src/ml/ann_index.py
+
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+_ARRAYS = ("centroids", "offsets", "ids", "vectors")
+# Dimensions sparse TF-IDF rows are reduced to (TruncatedSVD) before clustering
+ANN_DIM = int(os.getenv("ML_ANN_DIM", "128"))
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npy")
+    os.close(fd)
+    try:
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 20, sample_size: int = 100_000,
+                     seed: int = 0, batch_size: int = 65_536) -> np.ndarray:
+    """
+    k-means on the unit sphere (cosine distance), trained on a sample of the rows.
+
+    Returns:
+        np.ndarray: (n_clusters, dim) normalized centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)] if n > sample_size else vectors
+    sample = _normalize(sample)
+    n_clusters = min(n_clusters, len(sample))
+    centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assign = _assign(sample, centroids, batch_size)
+        counts = np.bincount(assign, minlength=n_clusters)
+        order = np.argsort(assign, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        empty = counts == 0
+        # Re-seed empty lists with random points so every list stays in use
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65_536) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        block = _normalize(vectors[start:start + batch_size])
+        out[start:start + batch_size] = (block @ centroids.T).argmax(axis=1)
+    return out
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index for maximum inner product / cosine search.
+
+    Rows are clustered with spherical k-means and stored grouped by list, so a list
+    is one contiguous slice of the vector array. A query scores the centroids,
+    scans only its `nprobe` closest lists and keeps the top k. Raising `nprobe`
+    trades latency for recall; `nprobe == n_lists` is exact.
+
+    The arrays are plain .npy files opened with mmap at serve time, so workers share
+    the pages and a large catalog does not have to fit in each process's heap.
+
+    An optional `projection` (dim x input_dim) maps queries into the space the rows were
+    indexed in, e.g. the TruncatedSVD components of a TF-IDF matrix (see build_reduced).
+    """
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray, vectors: np.ndarray,
+                 meta: Optional[dict] = None, projection: Optional[np.ndarray] = None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self.meta = dict(meta or {})
+        self.projection = projection
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: Optional[int] = None, n_iter: int = 20, seed: int = 0,
+              meta: Optional[dict] = None, projection: Optional[np.ndarray] = None) -> "IVFIndex":
+        """
+        Clusters the rows and groups them by list.
+
+        Args:
+            vectors (np.ndarray): (n, dim) rows; normalized here, so scores are cosines.
+            n_lists (int, optional): Number of lists (default: about sqrt(n)).
+            n_iter (int): k-means iterations.
+            seed (int): Seed for sampling and initialization.
+            meta (dict, optional): Stored alongside the index (e.g. the source version).
+            projection (np.ndarray, optional): (dim, input_dim) map applied to queries.
+        """
+        vectors = _normalize(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        centroids = spherical_kmeans(vectors, n_lists, n_iter=n_iter, seed=seed)
+        assign = _assign(vectors, centroids)
+
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        meta = dict(meta or {}, dim=int(vectors.shape[1]), n_lists=int(len(centroids)), size=int(len(vectors)),
+                    projected=projection is not None)
+        if projection is not None:
+            projection = np.asarray(projection, dtype=np.float32)
+        return cls(centroids, offsets, order.astype(np.int64), vectors[order], meta, projection)
+
+    @classmethod
+    def build_reduced(cls, matrix, n_components: int = ANN_DIM, n_lists: Optional[int] = None, seed: int = 0,
+                      meta: Optional[dict] = None) -> "IVFIndex":
+        """
+        Indexes a sparse TF-IDF matrix through a TruncatedSVD projection.
+
+        Clustering the raw rows would mean dense vocabulary-wide centroids and rows; the
+        reduced rows are small enough to memory-map and scan, and queries are projected
+        with the same components. Scores are cosines in the reduced space, so callers
+        should rescore the returned candidates against the original rows.
+
+        Args:
+            matrix (sparse matrix | np.ndarray): (n, vocab) rows.
+            n_components (int): Reduced dimensions (capped by the matrix shape).
+            n_lists (int, optional): Number of lists (default: about sqrt(n)).
+            seed (int): Seed for the SVD and k-means.
+            meta (dict, optional): Stored alongside the index.
+        """
+        from sklearn.decomposition import TruncatedSVD
+
+        n_components = max(1, min(n_components, min(matrix.shape) - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=seed)
+        reduced = svd.fit_transform(matrix)
+        return cls.build(reduced, n_lists=n_lists, seed=seed, meta=meta, projection=svd.components_)
+
+    def project(self, queries) -> np.ndarray:
+        """
+        Maps (n, input_dim) queries, dense or sparse, into the indexed space.
+        """
+        if self.projection is not None:
+            queries = queries @ self.projection.T
+        if sparse.issparse(queries):
+            queries = queries.toarray()
+        return np.asarray(queries, dtype=np.float32)
+
+    def save(self, prefix: str) -> None:
+        """
+        Writes `{prefix}.{array}.npy` files, then `{prefix}.json` last: a reader that
+        sees the manifest sees a complete index.
+        """
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        for name in _ARRAYS:
+            _save_array(f"{prefix}.{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        if self.projection is not None:
+            _save_array(f"{prefix}.projection.npy", np.ascontiguousarray(self.projection))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(prefix) or ".", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, f"{prefix}.json")
+
+    @classmethod
+    def load(cls, prefix: str, mmap: bool = True) -> "IVFIndex":
+        """
+        Opens an index written by `save`; the row vectors are memory-mapped by default.
+        """
+        with open(f"{prefix}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(f"{prefix}.{name}.npy", mmap_mode="r" if mmap and name == "vectors" else None)
+                  for name in _ARRAYS}
+        if len(arrays["vectors"]) != meta.get("size"):
+            raise ValueError(f"Index at {prefix} is incomplete")
+        projection = np.load(f"{prefix}.projection.npy") if meta.get("projected") else None
+        return cls(meta=meta, projection=projection, **arrays)
+
+    def search(self, queries: np.ndarray, k: int = 5, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k by cosine.
+
+        Args:
+            queries (np.ndarray): (dim,) or (n, dim) query vectors (dense or sparse, in the
+                                  input space when the index has a projection).
+            k (int): Results per query.
+            nprobe (int): Lists scanned per query.
+
+        Returns:
+            tuple: (ids, scores), each (n, k) best first; unfilled slots are -1 / -inf.
+        """
+        queries = _normalize(np.atleast_2d(self.project(queries)))
+        nprobe = max(1, min(nprobe, self.n_lists))
+        k = max(0, k)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        if not k or not len(self):
+            return ids, scores
+
+        centroid_scores = queries @ self.centroids.T
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), centroid_scores.shape)
+
+        # Scan list by list: every query probing a list is scored in one matrix product
+        # against the list's contiguous slice of rows
+        found_scores: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+        found_rows: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+        probing = np.argsort(probes, axis=None, kind="stable") // probes.shape[1]
+        probe_lists = np.sort(probes, axis=None, kind="stable")
+        bounds = np.searchsorted(probe_lists, np.arange(self.n_lists + 1))
+        for l in range(self.n_lists):
+            lo, hi = self.offsets[l], self.offsets[l + 1]
+            if hi == lo or bounds[l] == bounds[l + 1]:
+                continue
+            qs = probing[bounds[l]:bounds[l + 1]]
+            block = queries[qs] @ np.asarray(self.vectors[lo:hi]).T
+            rows = np.arange(lo, hi)
+            if hi - lo > k:
+                keep = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                block = np.take_along_axis(block, keep, axis=1)
+                row_block = rows[keep]
+            else:
+                row_block = np.broadcast_to(rows, block.shape)
+            for i, q in enumerate(qs):
+                found_scores[q].append(block[i])
+                found_rows[q].append(row_block[i])
+
+        for q in range(len(queries)):
+            if not found_rows[q]:
+                continue
+            candidate_scores = np.concatenate(found_scores[q])
+            candidate_ids = self.ids[np.concatenate(found_rows[q])]
+            # Ties break by original row id, like the exact path
+            best = np.lexsort((candidate_ids, -candidate_scores))[:k]
+            ids[q, :len(best)] = candidate_ids[best]
+            scores[q, :len(best)] = candidate_scores[best]
+        return ids, scores
+
+
+def recall_at_k(found_scores: Sequence[Sequence[float]], expected_scores: Sequence[Sequence[float]]) -> float:
+    """
+    Fraction of the exact top-k that the approximate results recovered.
+
+    The approximate path rescores its candidates exactly, so a returned job is a hit
+    when its score reaches the exact k-th score (with ties, either job is a correct answer).
+    """
+    hits = total = 0
+    for found, expected in zip(found_scores, expected_scores):
+        total += len(expected)
+        if len(expected):
+            hits += min(len(expected), sum(1 for s in found if s >= expected[-1] - 1e-6))
+    return hits / max(1, total)
+
+
+def benchmark(recommender, students: Sequence[str], k: int = 5, nprobes: Sequence[int] = (1, 2, 4, 8, 16, 32, 64),
+              n_lists: Optional[int] = None, n_components: int = ANN_DIM) -> List[Dict[str, float]]:
+    """
+    Recall@k and per-query latency of the serving path against the exact scan.
+
+    Builds the index the way production does (build_reduced on the recommender's TF-IDF
+    job matrix) and times `get_recommendations` with it, so the IVF search and the
+    ML_ANN_CANDIDATES rescoring are both measured, and without it (top_k_indices over
+    every job).
+
+    Args:
+        recommender (CareerRecommender): Recommender whose job matrix is indexed; its own
+                                         index settings are restored afterwards.
+        students (Sequence[str]): Skill strings used as queries.
+        k (int): Recommendations per student.
+        nprobes (Sequence[int]): Lists scanned per query to measure.
+        n_lists (int, optional): Number of lists (default: about sqrt(n)).
+        n_components (int): Reduced dimensions.
+
+    Returns:
+        list: One dict per nprobe with `nprobe`, `recall`, `ann_ms` and `exact_ms` (per query).
+    """
+    start = time.perf_counter()
+    index = IVFIndex.build_reduced(recommender.job_vectors, n_components=n_components, n_lists=n_lists)
+    print(f"Built IVF index: {len(index)} rows, {index.meta['dim']} dims, {index.n_lists} lists "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    def scores():
+        return [[r['match_score'] for r in recommender.get_recommendations(s, top_n=k)] for s in students]
+
+    saved = (recommender.ann_index, recommender.ann_nprobe, recommender.ann_rows, recommender.ann_delta)
+    try:
+        recommender.ann_index = None
+        start = time.perf_counter()
+        expected = scores()
+        exact_ms = (time.perf_counter() - start) / len(students) * 1000
+
+        # The new index covers every row of the matrix
+        recommender.ann_index, recommender.ann_rows = index, None
+        recommender.ann_delta = np.empty(0, dtype=np.int64)
+        results = []
+        for nprobe in nprobes:
+            recommender.ann_nprobe = nprobe
+            start = time.perf_counter()
+            found = scores()
+            ann_ms = (time.perf_counter() - start) / len(students) * 1000
+            results.append({
+                "nprobe": nprobe,
+                "recall": round(recall_at_k(found, expected), 4),
+                "ann_ms": round(ann_ms, 3),
+                "exact_ms": round(exact_ms, 3),
+            })
+    finally:
+        recommender.ann_index, recommender.ann_nprobe, recommender.ann_rows, recommender.ann_delta = saved
+    return results
+
+
+if __name__ == '__main__':
+    # Offline build for the default catalog plus a recall benchmark on a synthetic
+    # large catalog: python -m ml.ann_index (from ml-service/)
+    from sklearn.preprocessing import normalize
+
+    from ml.job_catalog import CatalogSnapshot
+    from ml.recommendation import JOB_ANN_PATH, JOB_DATA_PATH, VECTORIZER_PATH, CareerRecommender
+
+    # The static CSV matrix; the job catalog builds its own index on every rebuild
+    recommender = CareerRecommender(JOB_DATA_PATH, VECTORIZER_PATH)
+    index = IVFIndex.build_reduced(recommender.job_vectors, meta={"version": recommender.index_version})
+    index.save(JOB_ANN_PATH)
+    print(f"Wrote {len(index)}-row job index ({index.meta['dim']} dims, {index.n_lists} lists) to {JOB_ANN_PATH}")
+
+    # Synthetic postings: blends of two or three real roles plus a few random extra
+    # terms, and students whose skills are a noisy subset of some posting
+    rng = np.random.default_rng(0)
+    base = recommender.job_vectors
+    terms = recommender.vectorizer.get_feature_names_out()
+    n_jobs, n_queries = 200_000, 500
+    mix = sparse.random(n_jobs, base.shape[0], density=2.5 / base.shape[0], format="csr", random_state=rng)
+    noise = sparse.random(n_jobs, len(terms), density=8 / len(terms), format="csr", random_state=rng)
+    catalog = sparse.csr_matrix(normalize(mix @ base + noise * 0.3), dtype=np.float32)
+    titles = np.array([f"job-{i}" for i in range(n_jobs)])
+    synthetic = CareerRecommender.from_catalog(CatalogSnapshot(
+        generation=0, vectorizer=recommender.vectorizer, job_vectors=catalog, job_ids=titles,
+        role_titles=titles, texts=np.full(n_jobs, ""), delta_rows=np.empty(0, dtype=np.int64)))
+
+    students = []
+    for row in rng.integers(0, n_jobs, n_queries):
+        columns = catalog[row].indices
+        kept = columns[rng.random(len(columns)) < 0.6]
+        extra = rng.integers(0, len(terms), rng.integers(0, 3))
+        students.append(", ".join(terms[np.concatenate([kept, extra])]))
+
+    results = benchmark(synthetic, students, k=5)
+    print(f"{'nprobe':>7} {'recall@5':>9} {'ann ms/q':>9} {'exact ms/q':>11}")
+    for row in results:
+        print(f"{row['nprobe']:>7} {row['recall']:>9.4f} {row['ann_ms']:>9.3f} {row['exact_ms']:>11.3f}")
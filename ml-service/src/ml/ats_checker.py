@@ -1,10 +1,14 @@
 # backend/src/ml/ats_checker.py
 import re
+import heapq
+import itertools
 import joblib
 import os
-import spacy
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from ml.keyword_automaton import AhoCorasick, regex_word_boundary
+from ml.model_registry import registry
 
 # --- Configuration ---
 # Path to the pre-trained TF-IDF vectorizer for ATS
@@ -12,43 +16,92 @@ ATS_VECTORIZER_PATH = 'src/ml/data_model/ats_vectorizer.pkl'
 # Path to the pre-processed list of keywords/skills from job descriptions
 JOB_KEYWORDS_PATH = 'src/ml/data_model/job_keywords.pkl' 
 
+
+# The spaCy model is not used for scoring; load it only when asked to (ML_ATS_SPACY=1)
+ATS_LOAD_SPACY = os.getenv("ML_ATS_SPACY", "0") == "1"
+
+
+def _load_ats_spacy():
+    import spacy
+
+    try:
+        return spacy.load("en_core_web_sm")
+    except OSError as e:
+        # Never download at runtime: install the model with the service instead
+        raise OSError("spaCy model 'en_core_web_sm' is not installed. "
+                      "Run `python -m spacy download en_core_web_sm`.") from e
+
+
+registry.register("ats_vectorizer", lambda: joblib.load(ATS_VECTORIZER_PATH))
+registry.register("job_keywords", lambda: joblib.load(JOB_KEYWORDS_PATH))
+if ATS_LOAD_SPACY:
+    registry.register("ats_spacy", _load_ats_spacy)
+
+
+def _load(name: str, path: str, default_path: str):
+    # Default artifacts are shared through the registry; custom paths are loaded directly
+    return registry.get(name) if path == default_path else joblib.load(path)
+
+
+def build_keyword_automaton(keywords: List[str]) -> AhoCorasick:
+    """
+    Character-level automaton over the (lowercased) keywords; values are keyword indices.
+    """
+    automaton = AhoCorasick()
+    for i, keyword in enumerate(keywords):
+        automaton.add(keyword, i)
+    return automaton.build()
+
 class ATSChecker:
     """
     Analyzes a resume against a job description to provide an ATS score and optimization tips.
     Uses a dedicated TF-IDF model for accurate keyword and phrase matching.
     """
-    def __init__(self, vectorizer_path: str = ATS_VECTORIZER_PATH, job_keywords_path: str = JOB_KEYWORDS_PATH):
+    def __init__(self, vectorizer_path: str = ATS_VECTORIZER_PATH, job_keywords_path: str = JOB_KEYWORDS_PATH,
+                 load_spacy: bool = ATS_LOAD_SPACY):
         """
         Initializes the ATS checker by loading pre-trained models.
         
         Args:
             vectorizer_path (str): Path to the saved TF-IDF vectorizer.
             job_keywords_path (str): Path to a list of extracted job-specific keywords.
+            load_spacy (bool): Also load the spaCy model into `self.nlp` (not needed for scoring).
         """
         if not os.path.exists(vectorizer_path) or not os.path.exists(job_keywords_path):
             raise FileNotFoundError("ATS models not found. Please run train_models.py first to create them.")
         
         # Load the dedicated vectorizer for ATS
-        self.vectorizer = joblib.load(vectorizer_path)
+        self.vectorizer = _load("ats_vectorizer", vectorizer_path, ATS_VECTORIZER_PATH)
         # Load the pre-processed list of important keywords from job descriptions
-        self.job_keywords = joblib.load(job_keywords_path)
+        self.job_keywords = _load("job_keywords", job_keywords_path, JOB_KEYWORDS_PATH)
+
+        # Optional pre-trained spaCy model for NER (Named Entity Recognition)
+        self.nlp = None
+        if load_spacy:
+            self.nlp = registry.get("ats_spacy") if ATS_LOAD_SPACY else _load_ats_spacy()
 
-        # Load a pre-trained spaCy model for NER (Named Entity Recognition)
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Downloading spacy model 'en_core_web_sm'...")
-            from spacy.cli import download
-            download("en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
+        # All keywords are found in one pass over the resume instead of one regex each
+        self._keyword_automaton = build_keyword_automaton(self.job_keywords)
+        # Vocabulary column of each keyword (for its weight in the job description) and its
+        # idf; keywords outside the vocabulary rank last
+        vocabulary = self.vectorizer.vocabulary_
+        self._keyword_columns = np.array([vocabulary.get(k, -1) for k in self.job_keywords], dtype=np.int64)
+        idf = getattr(self.vectorizer, "idf_", None)
+        known = self._keyword_columns >= 0
+        self._keyword_idf = np.full(len(self.job_keywords), np.inf)
+        if idf is not None:
+            self._keyword_idf[known] = idf[self._keyword_columns[known]]
 
-    def _calculate_keyword_match_score(self, resume_text: str, job_description_text: str) -> float:
+    def _calculate_keyword_match_score(self, resume_text: str, job_description_text: str,
+                                       job_description_vector=None, resume_vector=None) -> float:
         """
         Calculates a semantic similarity score using the dedicated TF-IDF model.
         """
         # Transform the texts using the ATS-specific vectorizer
-        resume_vector = self.vectorizer.transform([resume_text])
-        job_description_vector = self.vectorizer.transform([job_description_text])
+        if resume_vector is None:
+            resume_vector = self.vectorizer.transform([resume_text])
+        if job_description_vector is None:
+            job_description_vector = self.vectorizer.transform([job_description_text])
 
         # Compute cosine similarity
         cosine_sim = float(cosine_similarity(resume_vector, job_description_vector)[0][0])
@@ -56,22 +109,53 @@ class ATSChecker:
         # Scale and return the score as a percentage
         return round(cosine_sim * 100, 2)
 
-    def _get_missing_keywords(self, resume_text: str) -> List[str]:
+    def _find_keywords(self, resume_text: str) -> np.ndarray:
+        """
+        Boolean mask over job_keywords: True where the keyword occurs in the resume
+        as a whole word (same semantics as re.search(r'\b' + keyword + r'\b')).
+        """
+        text = resume_text.lower()
+        found = np.zeros(len(self.job_keywords), dtype=bool)
+        for start, end, i in self._keyword_automaton.iter_matches(text):
+            if not found[i] and regex_word_boundary(text, start) and regex_word_boundary(text, end):
+                found[i] = True
+        return found
+
+    def _keyword_weights(self, job_description_vector) -> np.ndarray:
+        """
+        TF-IDF weight of every job keyword in the job description (0 outside the vocabulary).
+        """
+        row = job_description_vector.toarray().ravel()
+        known = self._keyword_columns >= 0
+        weights = np.zeros(len(self.job_keywords))
+        weights[known] = row[self._keyword_columns[known]]
+        return weights
+
+    def _get_missing_keywords(self, resume_text: str, job_description_vector=None, top_n: int = 10,
+                              found: Optional[np.ndarray] = None,
+                              keyword_weights: Optional[np.ndarray] = None) -> List[str]:
         """
         Identifies important keywords from the pre-processed job keywords list
         that are missing from the resume.
+
+        Missing keywords are ranked by their TF-IDF weight in the job description (when
+        given), then by idf (terms common across job descriptions first). `found` is a
+        precomputed _find_keywords mask for the resume, `keyword_weights` a precomputed
+        _keyword_weights row for the job description.
         """
-        resume_text_lower = resume_text.lower()
-        missing = []
-        
-        for keyword in self.job_keywords:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', resume_text_lower):
-                continue
-            else:
-                missing.append(keyword)
-        
+        if found is None:
+            found = self._find_keywords(resume_text)
+        missing = np.flatnonzero(~found)
+        if not len(missing):
+            return []
+
+        if keyword_weights is None and job_description_vector is not None:
+            keyword_weights = self._keyword_weights(job_description_vector)
+        jd_weight = keyword_weights[missing] if keyword_weights is not None else np.zeros(len(missing))
+        order = np.lexsort((missing, self._keyword_idf[missing], -jd_weight))
+
         # Return a sample of the most relevant missing keywords
-        return missing[:10]
+        return [self.job_keywords[i] for i in missing[order[:top_n]]]
 
     def _analyze_quantifiable_achievements(self, resume_text: str) -> List[str]:
         """
@@ -93,12 +177,28 @@ class ATSChecker:
         feedback.append("Your resume lacks quantifiable achievements. Add metrics like percentages, numbers, and dollar amounts to highlight your impact.")
         return feedback
 
-    def get_ats_report(self, resume_text: str, job_description_text: str) -> Dict[str, Any]:
+    def get_ats_report(self, resume_text: str, job_description_text: str, context=None) -> Dict[str, Any]:
         """
         Generates a comprehensive ATS report with a score and actionable feedback.
+
+        With an AnalysisContext for the same texts, the TF-IDF vectors and the keyword scan
+        come from (and are stored in) the context.
         """
-        keyword_score = self._calculate_keyword_match_score(resume_text, job_description_text)
-        missing_keywords = self._get_missing_keywords(resume_text)
+        if context is not None:
+            job_description_vector = context.tfidf(self.vectorizer, "job_description")
+            resume_vector = context.tfidf(self.vectorizer, "resume")
+            found = context.memo(("ats_keywords", id(self)), lambda: self._find_keywords(resume_text))
+        else:
+            job_description_vector = self.vectorizer.transform([job_description_text])
+            resume_vector = found = None
+        keyword_score = self._calculate_keyword_match_score(resume_text, job_description_text, job_description_vector,
+                                                            resume_vector)
+        missing_keywords = self._get_missing_keywords(resume_text, job_description_vector, found=found)
+        report = self._build_report(resume_text, keyword_score, missing_keywords)
+        print(report)
+        return report
+
+    def _build_report(self, resume_text: str, keyword_score: float, missing_keywords: List[str]) -> Dict[str, Any]:
         quantifiable_feedback = self._analyze_quantifiable_achievements(resume_text)
         
         suggestions = []
@@ -116,12 +216,105 @@ class ATSChecker:
             
         suggestions.extend([{"type": "Achievement", "message": msg} for msg in quantifiable_feedback])
             
-        report = {
+        return {
             'ats_score': keyword_score,
             'suggestions': suggestions,
         }
-        print(report)
-        return report
+
+    def prepare_job(self, job_description_text: str) -> Tuple[Any, np.ndarray]:
+        """
+        Everything batch scoring needs from the job description, computed once:
+        its TF-IDF row and the per-keyword weights used to rank missing keywords.
+        """
+        job_description_vector = self.vectorizer.transform([job_description_text])
+        return job_description_vector, self._keyword_weights(job_description_vector)
+
+    def score_chunk(self, resume_texts: List[str], job: Tuple[Any, np.ndarray],
+                    start_index: int = 0) -> List[Dict[str, Any]]:
+        """
+        Scores a chunk of resumes with one sparse product against a prepare_job result.
+
+        Returns:
+            list: The get_ats_report result for each resume, plus 'index' (from `start_index`).
+        """
+        if not resume_texts:
+            return []
+        job_description_vector, keyword_weights = job
+        scores = cosine_similarity(self.vectorizer.transform(resume_texts), job_description_vector).ravel()
+        reports = []
+        for offset, (resume_text, score) in enumerate(zip(resume_texts, scores)):
+            keyword_score = round(float(score) * 100, 2)
+            missing_keywords = self._get_missing_keywords(resume_text, keyword_weights=keyword_weights)
+            reports.append(dict(self._build_report(resume_text, keyword_score, missing_keywords),
+                                index=start_index + offset))
+        return reports
+
+    def iter_ats_reports(self, resume_texts: Iterable[str], job_description_text: str,
+                         chunk_size: int = 512) -> Iterator[Dict[str, Any]]:
+        """
+        Scores many resumes against one job description, yielding reports in input order.
+
+        The job description is vectorized once; resumes are vectorized a chunk at a time
+        and scored with one sparse product per chunk, so memory stays bounded however
+        many resumes are streamed through.
+
+        Args:
+            resume_texts (Iterable[str]): Resume texts (may be a generator).
+            job_description_text (str): The job description.
+            chunk_size (int): Resumes vectorized and scored together.
+
+        Yields:
+            dict: The get_ats_report result for each resume, plus its input 'index'.
+        """
+        job = self.prepare_job(job_description_text)
+        resumes = iter(resume_texts)
+        index = 0
+        while True:
+            chunk = list(itertools.islice(resumes, chunk_size))
+            if not chunk:
+                return
+            yield from self.score_chunk(chunk, job, index)
+            index += len(chunk)
+
+    def rank_resumes(self, resume_texts: Iterable[str], job_description_text: str, top_k: Optional[int] = None,
+                     chunk_size: int = 512) -> List[Dict[str, Any]]:
+        """
+        Ranks resumes for one job description by ATS score (recruiter view).
+
+        Args:
+            resume_texts (Iterable[str]): Resume texts (may be a generator).
+            job_description_text (str): The job description.
+            top_k (int, optional): Keep only the best k; only k reports are held in memory.
+            chunk_size (int): Resumes vectorized and scored together.
+
+        Returns:
+            list: Reports (with 'index' and 'rank'), best score first; ties keep input order.
+        """
+        reports = self.iter_ats_reports(resume_texts, job_description_text, chunk_size)
+        if top_k is None:
+            ranked = sorted(reports, key=lambda r: (-r['ats_score'], r['index']))
+        else:
+            # Min-heap of the best k so far, keyed so the worst (lowest score, latest index) pops first
+            heap = []
+            for report in reports:
+                item = (report['ats_score'], -report['index'], report)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif top_k > 0 and item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+            ranked = [item[2] for item in sorted(heap, key=lambda item: item[:2], reverse=True)]
+        for rank, report in enumerate(ranked, start=1):
+            report['rank'] = rank
+        return ranked
+
+registry.register("ats_checker", ATSChecker)
+
+
+def get_ats_checker() -> ATSChecker:
+    """
+    Returns the shared ATS checker for the default artifacts.
+    """
+    return registry.get("ats_checker")
 
 if __name__ == "__main__":
     checker = ATSChecker()
@@ -0,0 +1,281 @@
+# backend/src/ml/cache.py
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Returned by lookups that miss (None is a valid cached value)
+MISSING = object()
+
+# Every cache created in the process, for the /cache stats endpoint
+_CACHES: Dict[str, "TwoTierCache"] = {}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a text for cache keys: unicode NFC, unified line endings,
+    no trailing whitespace per line. The cached parsers (parse_resume, JD skill
+    extraction) run on this form too, so a cached result is exactly what parsing the
+    normalized text gives, whichever equivalent spelling was seen first.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Content-addressed key: sha256 over the given parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with an entry limit and a TTL.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                self.expirations += 1
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    On-disk key/value store shared by every worker process on the host.
+    Values are stored as JSON; entries expire after `ttl_seconds` and the least
+    recently used ones are evicted beyond `max_entries`.
+    """
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reconnect after a fork: sqlite connections must not cross processes
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return MISSING
+                now = time.time()
+                if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self.expirations += 1
+                    return MISSING
+                conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+                return json.loads(row[0])
+            except (sqlite3.Error, OSError, ValueError) as e:
+                # The disk tier is an optimization; never fail a request because of it
+                self.errors += 1
+                print(f"Cache store error ({self.path}): {e}")
+                return MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            try:
+                conn = self._connection()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                overflow = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self.evictions += overflow
+                conn.commit()
+            except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+                self.errors += 1
+                print(f"Cache store error ({self.path}): {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM cache")
+                conn.commit()
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"Cache store error ({self.path}): {e}")
+
+
+class TwoTierCache:
+    """
+    In-process LRU backed by an optional SQLite store shared between workers.
+
+    Lookups try memory first, then disk (promoting disk hits into memory); values
+    must be JSON-serializable. Callers always get their own copy of a cached value,
+    so mutating a result cannot corrupt the cache.
+    """
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600,
+                 disk_path: Optional[str] = None, disk_max_entries: int = 100_000,
+                 disk_ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Args:
+            name (str): Name the cache reports its stats under.
+            max_entries (int): In-memory entry limit (0 disables the memory tier).
+            ttl_seconds (float, optional): In-memory TTL; None keeps entries until evicted.
+            disk_path (str, optional): SQLite file for the shared tier; None disables it.
+            disk_max_entries (int): Entry limit of the disk tier.
+            disk_ttl_seconds (float, optional): TTL of the disk tier.
+        """
+        self.name = name
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self.disk = SQLiteStore(disk_path, disk_max_entries, disk_ttl_seconds) if disk_path else None
+        self._counter_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        _CACHES[name] = self
+
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            self._count("memory_hits")
+            return copy.deepcopy(value)
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not MISSING:
+                self._count("disk_hits")
+                self.memory.set(key, value)
+                return copy.deepcopy(value)
+        self._count("misses")
+        return MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, copy.deepcopy(value))
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        stats = {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_max_entries": self.memory.max_entries,
+            "memory_evictions": self.memory.evictions,
+            "memory_expirations": self.memory.expirations,
+        }
+        if self.disk is not None:
+            stats.update({
+                "disk_path": self.disk.path,
+                "disk_evictions": self.disk.evictions,
+                "disk_expirations": self.disk.expirations,
+                "disk_errors": self.disk.errors,
+            })
+        return stats
+
+
+def cache_from_env(name: str, prefix: str, max_entries: int = 1024, ttl_seconds: float = 3600,
+                   disk_max_entries: int = 100_000, disk_ttl_seconds: float = 7 * 24 * 3600) -> TwoTierCache:
+    """
+    Builds a TwoTierCache configured by environment variables:
+    {prefix}_SIZE, {prefix}_TTL (seconds), {prefix}_DB (SQLite path; unset disables disk),
+    {prefix}_DB_SIZE and {prefix}_DB_TTL (seconds).
+    """
+    return TwoTierCache(
+        name,
+        max_entries=int(os.getenv(f"{prefix}_SIZE", max_entries)),
+        ttl_seconds=float(os.getenv(f"{prefix}_TTL", ttl_seconds)),
+        disk_path=os.getenv(f"{prefix}_DB") or None,
+        disk_max_entries=int(os.getenv(f"{prefix}_DB_SIZE", disk_max_entries)),
+        disk_ttl_seconds=float(os.getenv(f"{prefix}_DB_TTL", disk_ttl_seconds)),
+    )
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Hit/miss/eviction counters for every cache in the process.
+    """
+    return {name: cache.stats() for name, cache in _CACHES.items()}
@@ -1,24 +1,23 @@
 # Generates career roadmaps & timelines based on user skills
 
-import os
-import google.generativeai as genai
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from ml.llm_client import LLMClient, get_llm_client, run_blocking
 
 class CareerPathGenerator:
     """
     An AI-powered agent that generates a personalized, step-by-step career roadmap.
     It acts as a career coach, using the Gemini API to create actionable plans.
     """
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: Optional[str] = None, client: Optional[LLMClient] = None):
         """
-        Initializes the CareerPathGenerator with a Gemini API key.
+        Initializes the CareerPathGenerator on the shared LLM client.
         
         Args:
-            api_key (str): Your Google Gemini API key.
+            api_key (str, optional): Your Google Gemini API key (GEMINI_API_KEY by default).
+            client (LLMClient, optional): Client to use instead of the shared one.
         """
-        # Configure the Gemini API client
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        # Every generator shares one LLM client (model, connections and concurrency limit)
+        self.client = client or get_llm_client(api_key)
 
     def _generate_roadmap_prompt(self, student_skills: List[str], missing_skills: List[str], target_role: str, timeline_months: int) -> str:
         """
@@ -80,35 +79,45 @@ class CareerPathGenerator:
         Returns:
             dict: The generated roadmap content and metadata.
         """
+        # Also safe to call from a running event loop (see run_blocking)
+        try:
+            return run_blocking(lambda: self.generate_roadmap_async(student_skills, missing_skills, target_role, timeline_months))
+        except Exception as e:
+            return self._format_error(e)
+
+    async def generate_roadmap_async(self, student_skills: List[str], missing_skills: List[str], target_role: str, timeline_months: int = 3) -> Dict[str, Any]:
+        """
+        Same as `generate_roadmap`, awaiting the LLM call instead of blocking a thread.
+        """
         try:
             prompt = self._generate_roadmap_prompt(student_skills, missing_skills, target_role, timeline_months)
             
-            # The agent makes a call to the Gemini API
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    # A low temperature ensures a more structured and less 'creative' output
-                    temperature=0.4, 
-                ),
-            )
-            
-            # Clean and format the generated content
-            roadmap_content = response.text.strip()
-            
-            return {
-                'status': 'success',
-                'target_role': target_role,
-                'timeline': f"{timeline_months} months",
-                'roadmap': roadmap_content,
-                'source_model': 'Gemini 1.5 Pro'
-            }
+            # The agent makes a call to the LLM (Gemini by default);
+            # a low temperature ensures a more structured and less 'creative' output
+            text = await self.client.generate(prompt, temperature=0.4)
+            return self._format_roadmap(text, target_role, timeline_months)
 
         except Exception as e:
-            return {
-                'status': 'error',
-                'message': f"An error occurred while generating the roadmap: {e}",
-                'roadmap': None
-            }
+            return self._format_error(e)
+
+    def _format_roadmap(self, text: str, target_role: str, timeline_months: int) -> Dict[str, Any]:
+        # Clean and format the generated content
+        roadmap_content = text.strip()
+        
+        return {
+            'status': 'success',
+            'target_role': target_role,
+            'timeline': f"{timeline_months} months",
+            'roadmap': roadmap_content,
+            'source_model': self.client.label
+        }
+
+    def _format_error(self, e: Exception) -> Dict[str, Any]:
+        return {
+            'status': 'error',
+            'message': f"An error occurred while generating the roadmap: {e}",
+            'roadmap': None
+        }
 
 # Example of how this class is used in your FastAPI backend
 if __name__ == '__main__':
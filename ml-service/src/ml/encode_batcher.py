@@ -0,0 +1,173 @@
+# backend/src/ml/encode_batcher.py
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Defaults for the shared batcher; both can be tuned per deployment
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("ML_ENCODE_MAX_BATCH", "64"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("ML_ENCODE_MAX_WAIT_MS", "5"))
+
+
+class EncodeBatcher:
+    """
+    Micro-batching scheduler in front of the sentence encoder.
+
+    Callers submit texts from any thread and get a Future back. A single worker
+    thread takes the first pending text, keeps collecting for up to `max_wait_ms`
+    or until `max_batch_size` texts are queued, sorts the batch by length so the
+    encoder pads less, runs one forward pass and resolves each caller's future
+    with its own row.
+    """
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            encode (Callable): Maps a list of texts to a (n, dim) array in the same order.
+            max_batch_size (int): Most texts per forward pass.
+            max_wait_ms (float): How long the first text in a batch may wait for company.
+        """
+        self._encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._largest_batch = 0
+        self._last_batch = 0
+        self._queue_wait = 0.0
+        self._errors = 0
+
+    def _ensure_worker(self) -> None:
+        # Started lazily, and again after a fork (threads don't survive it)
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queues one text; the future resolves to its (dim,) embedding.
+        """
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        self._ensure_worker()
+        return future
+
+    def encode(self, texts: Sequence[str], timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Blocking encode of several texts through the shared queue.
+
+        Args:
+            texts (Sequence[str]): Texts to encode.
+            timeout (float, optional): Seconds to wait for each result.
+
+        Returns:
+            np.ndarray: (n, dim) embeddings in input order.
+        """
+        futures = [self.submit(text) for text in texts]
+        if not futures:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([f.result(timeout) for f in futures])
+
+    async def encode_async(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Same as `encode`, awaitable from an event loop without blocking it.
+        """
+        futures = [asyncio.wrap_future(self.submit(text)) for text in texts]
+        if not futures:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(await asyncio.gather(*futures))
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            # Drop callers that gave up (cancelled futures) before spending encoder time on them
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            batch.sort(key=lambda item: len(item[0]))
+
+            try:
+                vectors = np.asarray(self._encode([text for text, _, _ in batch]))
+            except BaseException as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for row, (_, future, _) in enumerate(batch):
+                future.set_result(vectors[row])
+            with self._stats_lock:
+                self._batches += 1
+                self._texts += len(batch)
+                self._last_batch = len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+                self._queue_wait += sum(started - queued for _, _, queued in batch)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Queue depth and batching metrics since startup.
+        """
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "texts": self._texts,
+                "mean_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "last_batch": self._last_batch,
+                "mean_queue_wait_ms": round(self._queue_wait / self._texts * 1000, 3) if self._texts else 0.0,
+                "errors": self._errors,
+            }
+
+
+if __name__ == '__main__':
+    # Simulates concurrent single-text requests: python -m ml.encode_batcher (from ml-service/src)
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ml.similarity import get_encode_batcher, get_model
+
+    model = get_model()
+    texts = [f"skill number {i} with python and docker" for i in range(512)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda t: model.encode([t]), texts))
+    unbatched = time.perf_counter() - start
+
+    batcher = get_encode_batcher()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda t: batcher.encode([t]), texts))
+    batched = time.perf_counter() - start
+
+    print(f"one call per request: {len(texts) / unbatched:.1f} texts/s")
+    print(f"micro-batched:        {len(texts) / batched:.1f} texts/s")
+    print(batcher.stats())
@@ -0,0 +1,302 @@
+# backend/src/ml/encoder.py
+
+import os
+import platform
+import statistics
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(__file__)
+MODEL_PATH = os.path.join(BASE_DIR, "model_weights", "all-MiniLM-L6-v2")
+
+ENCODER_BACKENDS = ("torch", "onnx", "openvino")
+# Backend used by the service; onnx / openvino need onnxruntime / openvino installed
+DEFAULT_ENCODER_BACKEND = os.getenv("ML_ENCODER_BACKEND", "torch")
+# Optional override of the model file, e.g. "model_O3.onnx" or "openvino_model.xml"
+ENCODER_VARIANT = os.getenv("ML_ENCODER_VARIANT") or None
+
+# Same limit as sentence_bert_config.json
+MAX_SEQ_LENGTH = 256
+OPENVINO_VARIANT = "openvino_model_qint8_quantized.xml"
+
+
+def cpu_flags() -> Set[str]:
+    """
+    CPU feature flags from /proc/cpuinfo (empty where it is not available).
+    """
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("flags", "Features")):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def pick_onnx_variant(flags: Optional[Set[str]] = None, machine: Optional[str] = None) -> str:
+    """
+    Chooses the ONNX file best suited to the CPU: an int8 model for the widest
+    supported instruction set, or the graph-optimized fp32 model otherwise.
+
+    Args:
+        flags (set, optional): CPU flags (defaults to this machine's).
+        machine (str, optional): platform.machine() value (defaults to this machine's).
+
+    Returns:
+        str: File name inside the model's onnx/ folder.
+    """
+    flags = cpu_flags() if flags is None else flags
+    machine = (platform.machine() if machine is None else machine).lower()
+
+    if machine in ("arm64", "aarch64"):
+        return "model_qint8_arm64.onnx"
+    if "avx512_vnni" in flags or "avx512vnni" in flags:
+        return "model_qint8_avx512_vnni.onnx"
+    if "avx512f" in flags and "avx512bw" in flags:
+        return "model_qint8_avx512.onnx"
+    if "avx2" in flags:
+        return "model_quint8_avx2.onnx"
+    # O4 is fp16 for GPUs; O3 is the most optimized graph that stays fp32 on CPU
+    return "model_O3.onnx"
+
+
+def resolve_variant(backend: str, variant: Optional[str] = None) -> Optional[str]:
+    """
+    Model file a backend will load (None for torch, which reads the whole folder).
+    """
+    if backend == "onnx":
+        return variant or pick_onnx_variant()
+    if backend == "openvino":
+        return variant or OPENVINO_VARIANT
+    return None
+
+
+def describe_backend(backend: Optional[str] = None, variant: Optional[str] = None) -> str:
+    """
+    Short identifier of the configured encoder, e.g. "onnx:model_qint8_avx512_vnni.onnx".
+    Artifacts built from encoder outputs are keyed by it.
+    """
+    backend = backend or DEFAULT_ENCODER_BACKEND
+    variant = resolve_variant(backend, variant or ENCODER_VARIANT)
+    return backend if variant is None else f"{backend}:{variant}"
+
+
+class _TransformerEncoder(ABC):
+    """
+    Runs the exported MiniLM graph outside PyTorch with the same steps as the
+    SentenceTransformer pipeline (modules.json): tokenizer.json tokenization,
+    mean pooling over the attention mask, then L2 normalization.
+
+    `encode` accepts the SentenceTransformer arguments the service uses, so the
+    backends are interchangeable.
+    """
+    def __init__(self, model_path: str = MODEL_PATH, max_seq_length: int = MAX_SEQ_LENGTH):
+        from tokenizers import Tokenizer
+
+        self.model_path = model_path
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_path, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+
+    @abstractmethod
+    def _forward(self, feeds: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Returns the token embeddings (batch, seq, dim) for one tokenized batch.
+        """
+
+    def _tokenize(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        batch = self.tokenizer.encode_batch(texts)
+        return {
+            "input_ids": np.array([e.ids for e in batch], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in batch], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in batch], dtype=np.int64),
+        }
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True, **kwargs):
+        """
+        Encodes a string or a list of strings into sentence embeddings.
+
+        Args:
+            sentences (str | list): Text(s) to encode.
+            batch_size (int): Texts per forward pass.
+            convert_to_numpy (bool): Kept for SentenceTransformer compatibility (always numpy).
+            normalize_embeddings (bool): L2-normalize the pooled vectors.
+
+        Returns:
+            np.ndarray: (dim,) for a single string, (n, dim) for a list.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Length-sorted batches pad less; results are put back in input order
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        pooled = [None] * len(texts)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            feeds = self._tokenize([texts[i] for i in idx])
+            tokens = self._forward(feeds).astype(np.float32)
+            mask = feeds["attention_mask"][..., None].astype(np.float32)
+            vectors = (tokens * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if normalize_embeddings:
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            for row, i in enumerate(idx):
+                pooled[i] = vectors[row]
+
+        embeddings = np.stack(pooled)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxEncoder(_TransformerEncoder):
+    """
+    Sentence encoder on ONNX Runtime (CPU).
+    """
+    def __init__(self, model_path: str = MODEL_PATH, variant: Optional[str] = None,
+                 max_seq_length: int = MAX_SEQ_LENGTH):
+        import onnxruntime as ort
+
+        super().__init__(model_path, max_seq_length)
+        self.variant = variant or pick_onnx_variant()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(os.path.join(model_path, "onnx", self.variant), options,
+                                            providers=["CPUExecutionProvider"])
+        self._inputs = [i.name for i in self.session.get_inputs()]
+
+    def _forward(self, feeds: Dict[str, np.ndarray]) -> np.ndarray:
+        return self.session.run(None, {name: feeds[name] for name in self._inputs})[0]
+
+
+class OpenVINOEncoder(_TransformerEncoder):
+    """
+    Sentence encoder on the OpenVINO runtime (CPU).
+    """
+    def __init__(self, model_path: str = MODEL_PATH, variant: Optional[str] = None,
+                 max_seq_length: int = MAX_SEQ_LENGTH):
+        import openvino as ov
+
+        super().__init__(model_path, max_seq_length)
+        self.variant = variant or OPENVINO_VARIANT
+        core = ov.Core()
+        model = core.read_model(os.path.join(model_path, "openvino", self.variant))
+        self.compiled = core.compile_model(model, "CPU", {"PERFORMANCE_HINT": "LATENCY"})
+        self._inputs = [port.get_any_name() for port in self.compiled.inputs]
+
+    def _forward(self, feeds: Dict[str, np.ndarray]) -> np.ndarray:
+        result = self.compiled({name: feeds[name] for name in self._inputs})
+        return result[self.compiled.outputs[0]]
+
+
+def load_encoder(backend: Optional[str] = None, variant: Optional[str] = None, model_path: str = MODEL_PATH):
+    """
+    Loads the sentence encoder for a backend.
+
+    Args:
+        backend (str, optional): "torch", "onnx" or "openvino" (default: ML_ENCODER_BACKEND).
+        variant (str, optional): Model file for onnx/openvino (default: ML_ENCODER_VARIANT,
+                                 then chosen from the CPU features).
+        model_path (str): The sentence-transformers model folder.
+
+    Returns:
+        An object with a SentenceTransformer-compatible `encode`. Falls back to the
+        PyTorch model when the requested runtime is not installed or the model file
+        fails to load (missing export, unsupported instruction set, ...).
+    """
+    backend = backend or DEFAULT_ENCODER_BACKEND
+    variant = variant or ENCODER_VARIANT
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Use one of {ENCODER_BACKENDS}.")
+
+    if backend != "torch":
+        try:
+            encoder_cls = OnnxEncoder if backend == "onnx" else OpenVINOEncoder
+            encoder = encoder_cls(model_path, variant)
+            print(f"Loaded {backend} sentence encoder: {encoder.variant}")
+            return encoder
+        except Exception as e:
+            print(f"Could not load {describe_backend(backend, variant)} encoder ({e}); falling back to PyTorch")
+
+    # Imported here: sentence_transformers pulls in torch, which dominates import time
+    from sentence_transformers import SentenceTransformer
+
+    print(f"Loading model from local path: {model_path}")
+    return SentenceTransformer(model_path)
+
+
+def benchmark(texts: Sequence[str], backends: Iterable[str] = ENCODER_BACKENDS, batch_size: int = 32,
+              repeats: int = 20, model_path: str = MODEL_PATH) -> List[Dict[str, float]]:
+    """
+    Compares encoder backends against the PyTorch baseline.
+
+    Args:
+        texts (Sequence[str]): Sample inputs (skills, resume snippets, job descriptions).
+        backends (Iterable[str]): Backends to measure; unavailable ones are skipped.
+        batch_size (int): Batch size for the throughput run.
+        repeats (int): Single-text calls timed for latency.
+        model_path (str): The sentence-transformers model folder.
+
+    Returns:
+        list: One dict per backend with `backend`, `p50_ms`, `p95_ms` (single text),
+              `texts_per_s` (batched), and `min_cosine` / `mean_cosine` against PyTorch.
+    """
+    texts = list(texts)
+    baseline = load_encoder("torch", model_path=model_path)
+    reference = baseline.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+
+    results = []
+    for backend in backends:
+        if backend == "torch":
+            encoder = baseline
+        else:
+            try:
+                encoder_cls = OnnxEncoder if backend == "onnx" else OpenVINOEncoder
+                encoder = encoder_cls(model_path)
+            except Exception as e:
+                print(f"Skipping {describe_backend(backend)}: {e}")
+                continue
+
+        encoder.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+        latencies = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            encoder.encode([texts[i % len(texts)]])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        embeddings = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        elapsed = time.perf_counter() - start
+
+        cosines = np.sum(np.asarray(embeddings) * reference, axis=1)
+        results.append({
+            "backend": describe_backend(backend),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "texts_per_s": round(len(texts) / elapsed, 1),
+            "min_cosine": round(float(cosines.min()), 5),
+            "mean_cosine": round(float(cosines.mean()), 5),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    # python -m ml.encoder (from ml-service/src)
+    import json
+
+    with open(os.path.join(BASE_DIR, "skills.json"), "r", encoding="utf-8") as f:
+        skills = [s for group in json.load(f).values() for s in group]
+    samples = skills + [
+        "Built REST APIs in Python and Django, deployed with Docker on AWS.",
+        "Looking for a data scientist with experience in machine learning, SQL and Tableau.",
+    ] * 20
+
+    print(f"CPU flags -> onnx variant: {pick_onnx_variant()}")
+    print(f"{'backend':<42} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9} {'min cos':>9} {'mean cos':>9}")
+    for row in benchmark(samples):
+        print(f"{row['backend']:<42} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {row['texts_per_s']:>9.1f} "
+              f"{row['min_cosine']:>9.5f} {row['mean_cosine']:>9.5f}")
@@ -0,0 +1,256 @@
+# backend/src/ml/fuzzy_index.py
+
+import random
+import string
+import time
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Same cut-off the pipeline has always used: a skill is a fuzzy hit when
+# fuzz.partial_ratio(token, skill) > 92.
+DEFAULT_THRESHOLD = 92
+# Character n-gram size used for candidate prefiltering.
+GRAM_SIZE = 3
+
+
+def _grams(text: str, q: int = GRAM_SIZE) -> Set[str]:
+    return {text[i:i + q] for i in range(len(text) - q + 1)}
+
+
+class FuzzySkillIndex:
+    """
+    Precomputed fuzzy index over the skill vocabulary.
+
+    Returns exactly the skills for which `fuzz.partial_ratio(token, skill) > threshold`
+    holds for at least one token, without scoring every token against every skill.
+
+    partial_ratio aligns the shorter string against a window of the longer one, so a
+    score above the threshold means the shorter string survives at most
+    `2 * len * (100 - threshold) / 100` insert/delete edits into that window. Every edit
+    destroys at most `GRAM_SIZE` of its character n-grams, which gives a lower bound on
+    the n-grams a real match must share with the skill. Skills below that bound can never
+    reach the threshold and are dropped before any scoring happens; the survivors are
+    scored in one vectorized rapidfuzz call over unique tokens only.
+    """
+    def __init__(self, skills: Iterable[str], threshold: int = DEFAULT_THRESHOLD, gram_size: int = GRAM_SIZE,
+                 memo_size: int = 50_000):
+        """
+        Builds the n-gram postings for the skill vocabulary.
+
+        Args:
+            skills (Iterable[str]): Skill strings (already lowercased).
+            threshold (int): partial_ratio score a match has to exceed.
+            gram_size (int): Character n-gram size used for prefiltering.
+            memo_size (int): Per-token results remembered across calls (0 disables).
+        """
+        self.skills = list(dict.fromkeys(skills))
+        self.threshold = threshold
+        self.gram_size = gram_size
+        # token -> matched skills; resume/JD vocabularies repeat heavily between calls
+        self.memo_size = memo_size
+        self._memo: Dict[str, frozenset] = {}
+
+        self._lengths = np.array([len(s) for s in self.skills], dtype=np.int64)
+        self._min_shared = np.array([self._required_shared(s) for s in self.skills], dtype=np.int64)
+        # Skills that cannot be prefiltered (too short or too repetitive) are always scored.
+        self._always = np.flatnonzero(self._min_shared <= 0)
+
+        postings: Dict[str, List[int]] = {}
+        short_postings: Dict[str, List[int]] = {}
+        for skill_id, skill in enumerate(self.skills):
+            for gram in _grams(skill, gram_size):
+                postings.setdefault(gram, []).append(skill_id)
+            # Substrings shorter than a gram, for tokens too short to have grams
+            short = {skill[i:i + n] for n in range(1, gram_size) for i in range(len(skill) - n + 1)}
+            for sub in short:
+                short_postings.setdefault(sub, []).append(skill_id)
+
+        self._postings = {g: np.array(ids, dtype=np.int64) for g, ids in postings.items()}
+        self._short_postings = {g: np.array(ids, dtype=np.int64) for g, ids in short_postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def _max_edits(self, length: int) -> int:
+        # score = 100 * (1 - edits / (len + window)) > threshold, and window <= len
+        return int(2 * length * (100 - self.threshold) / 100)
+
+    def _required_shared(self, text: str) -> int:
+        return len(_grams(text, self.gram_size)) - self._max_edits(len(text)) * self.gram_size
+
+    def _candidates(self, token: str) -> np.ndarray:
+        """
+        Returns ids of skills that may score above the threshold against `token`.
+        """
+        m = len(token)
+        if m < self.gram_size:
+            # Short tokens only match as exact substrings of a skill (or vice versa).
+            ids = self._short_postings.get(token)
+            if ids is None:
+                return self._always
+            return np.union1d(ids, self._always)
+
+        token_need = self._required_shared(token)
+        if token_need <= 0:
+            # Nothing to prefilter on: every skill at least as long as the token is a candidate.
+            return np.union1d(np.flatnonzero(self._lengths >= m), self._always)
+
+        lists = [self._postings[g] for g in _grams(token, self.gram_size) if g in self._postings]
+        if not lists:
+            return self._always
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+
+        lengths = self._lengths[ids]
+        skill_need = self._min_shared[ids]
+        need = np.where(
+            lengths > m, token_need,
+            np.where(lengths < m, skill_need, np.minimum(token_need, skill_need))
+        )
+        return np.union1d(ids[shared >= need], self._always)
+
+    def match(self, tokens: Iterable[str]) -> Set[str]:
+        """
+        Returns the skills whose partial_ratio against any token exceeds the threshold.
+
+        Args:
+            tokens (Iterable[str]): Lowercased tokens from a resume or job description.
+
+        Returns:
+            set: Matched skill strings.
+        """
+        found: Set[str] = set()
+        query_list, choice_list = [], []
+        pending = []
+        for token in set(tokens):
+            if not token:
+                continue
+            known = self._memo.get(token)
+            if known is not None:
+                found.update(known)
+                continue
+            pending.append(token)
+            for skill_id in self._candidates(token):
+                query_list.append(token)
+                choice_list.append(self.skills[skill_id])
+
+        hits: Dict[str, Set[str]] = {token: set() for token in pending}
+        if query_list:
+            scores = _score_pairs(query_list, choice_list, self.threshold)
+            for i in np.flatnonzero(scores > self.threshold):
+                hits[query_list[i]].add(choice_list[i])
+
+        if self.memo_size > 0:
+            if len(self._memo) + len(hits) > self.memo_size:
+                self._memo = {}
+            for token, skills in hits.items():
+                self._memo[token] = frozenset(skills)
+        for skills in hits.values():
+            found.update(skills)
+        return found
+
+
+def _score_pairs(queries: List[str], choices: List[str], threshold: int) -> np.ndarray:
+    """
+    Scores queries[i] against choices[i] with partial_ratio in one vectorized call.
+    """
+    cpdist = getattr(process, "cpdist", None)
+    if cpdist is not None:
+        return cpdist(queries, choices, scorer=fuzz.partial_ratio, score_cutoff=threshold, dtype=np.float64)
+
+    # Older rapidfuzz: group pairs per query and use cdist row by row.
+    scores = np.zeros(len(queries), dtype=np.float64)
+    by_query: Dict[str, List[int]] = {}
+    for i, q in enumerate(queries):
+        by_query.setdefault(q, []).append(i)
+    for q, idx in by_query.items():
+        row = process.cdist([q], [choices[i] for i in idx], scorer=fuzz.partial_ratio,
+                            score_cutoff=threshold, dtype=np.float64)[0]
+        scores[idx] = row
+    return scores
+
+
+def brute_force_match(tokens: Iterable[str], skills: Iterable[str], threshold: int = DEFAULT_THRESHOLD) -> Set[str]:
+    """
+    Reference implementation: the original tokens x skills partial_ratio loop.
+    """
+    skills = list(skills)
+    found = set()
+    for tok in tokens:
+        for skill in skills:
+            if fuzz.partial_ratio(tok, skill) > threshold:
+                found.add(skill)
+    return found
+
+
+def benchmark(base_skills: List[str], sizes=(60, 250, 1000, 2500, 10000), doc_tokens: int = 600,
+              repeats: int = 5, brute_force_limit: int = 1000, seed: int = 7) -> List[Dict[str, float]]:
+    """
+    Measures per-document fuzzy matching cost as the skill vocabulary grows.
+
+    The vocabulary is padded with synthetic skill names up to each size; every run is
+    checked against the brute-force loop for vocabularies up to `brute_force_limit`.
+
+    Args:
+        base_skills (List[str]): Real skills to start the vocabulary from.
+        sizes (tuple): Vocabulary sizes to measure.
+        doc_tokens (int): Tokens in the synthetic resume.
+        repeats (int): Timed runs per size (best is reported).
+        brute_force_limit (int): Largest vocabulary also timed with the brute-force loop.
+        seed (int): Seed for the synthetic vocabulary and document.
+
+    Returns:
+        list: One dict per size with `skills`, `index_ms`, `brute_force_ms` and `build_ms`.
+    """
+    rng = random.Random(seed)
+    vocab = list(dict.fromkeys(base_skills))
+    while len(vocab) < max(sizes):
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 14)))
+        if rng.random() < 0.2:
+            word += rng.choice([".js", "db", "ql", " studio", "-ml"])
+        vocab.append(word)
+
+    filler = ("experience developed built team project using data services platform led "
+              "design deployed api backend frontend university bachelor engineer managed "
+              "customers improved performance 2019 2021 - present , .").split()
+    doc = [rng.choice(filler) if rng.random() < 0.9 else rng.choice(base_skills) for _ in range(doc_tokens)]
+
+    results = []
+    for size in sizes:
+        skills = vocab[:size]
+        start = time.perf_counter()
+        index = FuzzySkillIndex(skills, memo_size=0)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            found = index.match(doc)
+            best = min(best, time.perf_counter() - start)
+
+        row = {"skills": size, "build_ms": round(build_ms, 2), "index_ms": round(best * 1000, 3),
+               "brute_force_ms": None}
+        if size <= brute_force_limit:
+            start = time.perf_counter()
+            expected = brute_force_match(doc, skills)
+            row["brute_force_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            if expected != found:
+                raise AssertionError(f"Index diverged from brute force at {size} skills: "
+                                     f"{sorted(expected ^ found)}")
+        results.append(row)
+    return results
+
+
+if __name__ == '__main__':
+    import json
+    import os
+
+    with open(os.path.join(os.path.dirname(__file__), "skills.json"), "r", encoding="utf-8") as f:
+        categories = json.load(f)
+    base = [skill.lower() for group in categories.values() for skill in group]
+
+    print(f"{'skills':>8} {'build ms':>10} {'index ms/doc':>14} {'brute ms/doc':>14}")
+    for row in benchmark(base):
+        brute = "-" if row["brute_force_ms"] is None else f"{row['brute_force_ms']:.3f}"
+        print(f"{row['skills']:>8} {row['build_ms']:>10.2f} {row['index_ms']:>14.3f} {brute:>14}")
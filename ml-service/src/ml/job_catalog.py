@@ -0,0 +1,383 @@
+# backend/src/ml/job_catalog.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from ml.ann_index import IVFIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process writers are serialized
+    fcntl = None
+
+# On-disk catalog (relative to the ml-service root, like the other job artifacts)
+CATALOG_DIR = 'src/ml/data_model/job_catalog'
+# Share of rows added since the last full rebuild after which IDF weights are considered stale
+REBUILD_FRACTION = float(os.getenv("ML_CATALOG_REBUILD_FRACTION", "0.25"))
+# Rebuilds of catalogs with at least this many jobs also build an IVF index (0 disables it)
+ANN_MIN_ROWS = int(os.getenv("ML_CATALOG_ANN_MIN_ROWS", "50000"))
+
+_write_lock = threading.Lock()
+
+
+def new_vectorizer():
+    """
+    The TF-IDF configuration the job matrix has always used (matches vectorizer.pkl).
+    """
+    return TfidfVectorizer(stop_words='english', token_pattern=r'(?u)\b[a-zA-Z0-9_]{2,}\b')
+
+
+def _job_text(row: dict) -> str:
+    if row.get('combined_text'):
+        return str(row['combined_text'])
+    return f"{row.get('skills', '')} {row.get('job_description', '')}".strip()
+
+
+def _atomic_write(path: str, write) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CatalogSnapshot:
+    """
+    One consistent generation of the catalog: vectorizer, job matrix and row metadata.
+
+    When the last rebuild wrote an IVF index, `ann_index` holds it; its ids are rows of
+    the rebuild's segment, `base_rows` maps them to rows of this snapshot (-1 once
+    deleted or replaced) and `delta_rows` lists the rows added since, which the index
+    does not cover. `vectorizer_name` and `segment_names` record which files it was
+    read from, so a later snapshot can apply only the segments added since.
+    """
+    def __init__(self, generation: int, vectorizer, job_vectors, job_ids, role_titles, texts,
+                 ann_index: Optional[IVFIndex] = None, base_rows=None, delta_rows=None,
+                 vectorizer_name: Optional[str] = None, segment_names=()):
+        self.generation = generation
+        self.vectorizer = vectorizer
+        self.job_vectors = job_vectors
+        self.job_ids = job_ids
+        self.role_titles = role_titles
+        self.texts = texts
+        self.ann_index = ann_index
+        self.base_rows = base_rows
+        self.delta_rows = delta_rows
+        self.vectorizer_name = vectorizer_name
+        self.segment_names = list(segment_names)
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+
+class JobCatalog:
+    """
+    Incrementally updated job index: TF-IDF vectors plus metadata in append-only segments.
+
+    New or edited jobs are vectorized with the current vectorizer (no refit) and written
+    as a new segment; a job id that appears again supersedes its earlier row, and
+    deletions are recorded as tombstones. `manifest.json` lists the live vectorizer and
+    segments and is replaced atomically, so readers always see a complete generation and
+    running workers pick up a new one by reading just the segments they have not seen. `rebuild` refits the vectorizer on
+    all live rows (refreshing IDF weights) and compacts everything into one segment.
+    """
+    def __init__(self, root: str = CATALOG_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def manifest(self) -> dict:
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def generation(self) -> int:
+        """
+        Current generation number (0 if the catalog has not been created).
+        """
+        try:
+            return int(self.manifest()["generation"])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    @contextmanager
+    def _locked(self):
+        # One writer at a time, across threads and (where flock exists) processes
+        os.makedirs(self.root, exist_ok=True)
+        with _write_lock, open(os.path.join(self.root, ".lock"), "a+") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _write_segment(self, generation: int, job_ids, role_titles, texts, vectors, deleted=()) -> str:
+        name = f"segment-{generation:08d}.npz"
+        vectors = sparse.csr_matrix(vectors, dtype=np.float32)
+
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f, data=vectors.data, indices=vectors.indices, indptr=vectors.indptr,
+                    shape=np.array(vectors.shape, dtype=np.int64),
+                    job_ids=np.array(job_ids, dtype=str), role_titles=np.array(role_titles, dtype=str),
+                    texts=np.array(texts, dtype=str), deleted=np.array(list(deleted), dtype=str),
+                )
+        _atomic_write(self._path(name), write)
+        return name
+
+    def _read_segment(self, name: str) -> dict:
+        with np.load(self._path(name), allow_pickle=False) as data:
+            segment = {key: data[key] for key in data.files}
+        segment["vectors"] = sparse.csr_matrix(
+            (segment.pop("data"), segment.pop("indices"), segment.pop("indptr")),
+            shape=tuple(segment.pop("shape")),
+        )
+        return segment
+
+    def _write_manifest(self, manifest: dict) -> None:
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        _atomic_write(self.manifest_path, write)
+
+    def _collect_garbage(self, keep: Iterable[str]) -> None:
+        # Workers load whole files into memory (and a memory-mapped index stays readable
+        # after unlinking), so unreferenced files can go right away
+        keep = set(keep) | {"manifest.json", ".lock"}
+        for name in os.listdir(self.root):
+            if name.split(".")[0] not in keep and name not in keep and not name.endswith(".tmp"):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    def _publish_rebuild(self, generation: int, rows: List[dict], vectorizer) -> dict:
+        vectorizer_name = f"vectorizer-{generation:08d}.pkl"
+        _atomic_write(self._path(vectorizer_name), lambda tmp: joblib.dump(vectorizer, tmp))
+        texts = [_job_text(r) for r in rows]
+        vectors = vectorizer.transform(texts)
+        segment = self._write_segment(generation, [r['job_id'] for r in rows], [r['role_title'] for r in rows],
+                                      texts, vectors)
+        ann = None
+        if ANN_MIN_ROWS and len(rows) >= ANN_MIN_ROWS:
+            ann = f"ann-{generation:08d}"
+            IVFIndex.build_reduced(vectors, meta={"version": f"catalog-{generation}"}).save(self._path(ann))
+        manifest = {
+            "generation": generation,
+            "vectorizer": vectorizer_name,
+            "segments": [segment],
+            "ann": ann,
+            "base_generation": generation,
+            "base_rows": len(rows),
+            "delta_rows": 0,
+            "rebuilt_at": time.time(),
+        }
+        self._write_manifest(manifest)
+        self._collect_garbage([vectorizer_name, segment] + ([ann] if ann else []))
+        return manifest
+
+    def _load_ann(self, manifest: dict) -> Optional[IVFIndex]:
+        if not manifest.get("ann"):
+            return None
+        index = IVFIndex.load(self._path(manifest["ann"]))
+        if index.meta.get("version") != f"catalog-{manifest.get('base_generation')}":
+            print(f"Ignoring job catalog ANN index {manifest['ann']}: built for another generation")
+            return None
+        return index
+
+    def create(self, job_data_path: str, vectorizer=None, exist_ok: bool = False) -> dict:
+        """
+        Creates the catalog from the job CSV (rows get ids "row-<n>").
+
+        Args:
+            job_data_path (str): CSV with 'role_title' and 'combined_text' (or 'skills' and
+                                 'job_description') columns.
+            vectorizer (TfidfVectorizer, optional): A fitted vectorizer to keep; a new one is
+                                                    fitted on the CSV when omitted.
+            exist_ok (bool): Leave an existing catalog untouched instead of replacing it.
+
+        Returns:
+            dict: The new manifest.
+        """
+        jobs_df = pd.read_csv(job_data_path).fillna("")
+        rows = [dict(r, job_id=f"row-{i}") for i, r in enumerate(jobs_df.to_dict("records"))]
+        with self._locked():
+            if exist_ok and self.exists():
+                return self.manifest()
+            generation = self.generation() + 1
+            if vectorizer is None:
+                vectorizer = new_vectorizer().fit([_job_text(r) for r in rows])
+            return self._publish_rebuild(generation, rows, vectorizer)
+
+    def upsert_jobs(self, jobs: Iterable[dict]) -> dict:
+        """
+        Adds or replaces jobs without refitting the vectorizer.
+
+        Args:
+            jobs (Iterable[dict]): Each with 'job_id', 'role_title' and 'combined_text'
+                                   (or 'skills' and 'job_description').
+
+        Returns:
+            dict: The new manifest.
+        """
+        jobs = list(jobs)
+        for job in jobs:
+            if not job.get('job_id') or not job.get('role_title'):
+                raise ValueError("Each job needs a 'job_id' and a 'role_title'.")
+        return self._append(jobs, deleted=())
+
+    def delete_jobs(self, job_ids: Iterable[str]) -> dict:
+        """
+        Removes jobs by id (recorded as a tombstone segment).
+        """
+        return self._append([], deleted=[str(j) for j in job_ids])
+
+    def _append(self, jobs: List[dict], deleted) -> dict:
+        with self._locked():
+            manifest = self.manifest()
+            vectorizer = joblib.load(self._path(manifest["vectorizer"]))
+            generation = manifest["generation"] + 1
+            texts = [_job_text(j) for j in jobs]
+            vectors = vectorizer.transform(texts) if texts else sparse.csr_matrix((0, len(vectorizer.vocabulary_)))
+            segment = self._write_segment(generation, [str(j['job_id']) for j in jobs],
+                                          [j['role_title'] for j in jobs], texts, vectors, deleted)
+            manifest = dict(manifest, generation=generation, segments=manifest["segments"] + [segment],
+                            delta_rows=manifest.get("delta_rows", 0) + len(jobs) + len(deleted))
+            self._write_manifest(manifest)
+            return manifest
+
+    def rebuild(self) -> dict:
+        """
+        Refits the vectorizer on every live job and compacts the catalog into one segment.
+        """
+        with self._locked():
+            snapshot = self.snapshot()
+            rows = [{'job_id': j, 'role_title': t, 'combined_text': x}
+                    for j, t, x in zip(snapshot.job_ids, snapshot.role_titles, snapshot.texts)]
+            vectorizer = new_vectorizer().fit([r['combined_text'] for r in rows])
+            return self._publish_rebuild(snapshot.generation + 1, rows, vectorizer)
+
+    def rebuild_due(self, manifest: Optional[dict] = None) -> bool:
+        manifest = manifest or self.manifest()
+        return manifest.get("delta_rows", 0) > REBUILD_FRACTION * max(1, manifest.get("base_rows", 0))
+
+    @staticmethod
+    def _snapshot_as_segment(snapshot: CatalogSnapshot) -> dict:
+        # The live rows of an earlier snapshot, in order, stand in for the segments it was read from
+        base = np.full(len(snapshot), -1, dtype=np.int64)
+        kept = snapshot.base_rows >= 0
+        base[snapshot.base_rows[kept]] = np.flatnonzero(kept)
+        return {
+            "vectors": snapshot.job_vectors, "job_ids": snapshot.job_ids, "role_titles": snapshot.role_titles,
+            "texts": snapshot.texts, "deleted": np.array([], dtype=str), "base": base,
+        }
+
+    def snapshot(self, previous: Optional[CatalogSnapshot] = None) -> CatalogSnapshot:
+        """
+        Loads the current generation: later rows for a job id replace earlier ones (keeping
+        the original position) and tombstoned ids are dropped.
+
+        Args:
+            previous (CatalogSnapshot, optional): A snapshot already in memory. If the catalog
+                has not been rebuilt since, only the segments added after it are read and
+                applied to it; the vectorizer, index and older segments are not reloaded.
+        """
+        for attempt in range(3):
+            manifest = self.manifest()
+            seen = len(previous.segment_names) if previous is not None else 0
+            try:
+                if (previous is not None and previous.vectorizer_name == manifest["vectorizer"]
+                        and manifest["segments"][:seen] == previous.segment_names):
+                    vectorizer, ann_index, n_base = previous.vectorizer, previous.ann_index, len(previous.base_rows)
+                    segments = [self._snapshot_as_segment(previous)]
+                    segments += [self._read_segment(name) for name in manifest["segments"][seen:]]
+                else:
+                    vectorizer = joblib.load(self._path(manifest["vectorizer"]))
+                    segments = [self._read_segment(name) for name in manifest["segments"]]
+                    ann_index = self._load_ann(manifest)
+                    # The index covers the rebuild's segment (the first one); rows since are scored exactly
+                    n_base = len(segments[0]["job_ids"])
+                    segments[0]["base"] = np.arange(n_base, dtype=np.int64)
+                break
+            except FileNotFoundError:
+                # A rebuild replaced this generation while we were reading it; take the new one
+                if attempt == 2:
+                    raise
+
+        live: Dict[str, tuple] = {}
+        for s, segment in enumerate(segments):
+            for job_id in segment["deleted"]:
+                live.pop(str(job_id), None)
+            for row, job_id in enumerate(segment["job_ids"]):
+                live[str(job_id)] = (s, row)
+
+        offsets = np.cumsum([0] + [seg["vectors"].shape[0] for seg in segments])
+        rows = np.array([offsets[s] + row for s, row in live.values()], dtype=np.int64)
+        all_vectors = sparse.vstack([seg["vectors"] for seg in segments], format="csr", dtype=np.float32)
+        all_titles = np.concatenate([seg["role_titles"] for seg in segments])
+        all_texts = np.concatenate([seg["texts"] for seg in segments])
+        row_base = np.concatenate([seg.get("base", np.full(len(seg["job_ids"]), -1, dtype=np.int64))
+                                   for seg in segments])[rows]
+
+        in_base = row_base >= 0
+        base_rows = np.full(n_base, -1, dtype=np.int64)
+        base_rows[row_base[in_base]] = np.flatnonzero(in_base)
+        return CatalogSnapshot(
+            generation=manifest["generation"], vectorizer=vectorizer,
+            job_vectors=all_vectors[rows], job_ids=np.array(list(live), dtype=str),
+            role_titles=all_titles[rows], texts=all_texts[rows],
+            ann_index=ann_index, base_rows=base_rows, delta_rows=np.flatnonzero(~in_base),
+            vectorizer_name=manifest["vectorizer"], segment_names=manifest["segments"],
+        )
+
+    def stats(self) -> dict:
+        if not self.exists():
+            return {"exists": False}
+        manifest = self.manifest()
+        return {
+            "exists": True,
+            "generation": manifest["generation"],
+            "segments": len(manifest["segments"]),
+            "ann_index": bool(manifest.get("ann")),
+            "base_rows": manifest.get("base_rows", 0),
+            "delta_rows": manifest.get("delta_rows", 0),
+            "rebuild_due": self.rebuild_due(manifest),
+        }
+
+
+if __name__ == '__main__':
+    # python -m ml.job_catalog [create|rebuild|stats] (from ml-service/)
+    import sys
+
+    from ml.recommendation import ensure_job_catalog
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    catalog = JobCatalog()
+    if command == "create":
+        print(ensure_job_catalog().manifest())
+    elif command == "rebuild":
+        print(catalog.rebuild())
+    else:
+        print(catalog.stats())
@@ -0,0 +1,96 @@
+# backend/src/ml/keyword_automaton.py
+
+from collections import deque
+from typing import Any, Dict, Hashable, Iterator, List, Sequence, Tuple
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: finds every occurrence of every pattern in one linear
+    scan, independent of how many patterns there are.
+
+    Patterns and texts are sequences of hashable symbols, so the same automaton
+    works over characters (a str) or over tokens (a list of str). Matches are
+    reported as (start, end, value) with `end` exclusive; word-boundary rules are
+    left to the caller.
+    """
+    def __init__(self):
+        self._goto: List[Dict[Hashable, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+        self.size = 0
+
+    def add(self, pattern: Sequence[Hashable], value: Any = None) -> None:
+        """
+        Adds a pattern; `value` (default: the pattern itself) is reported on match.
+        """
+        if not pattern:
+            return
+        state = 0
+        for symbol in pattern:
+            nxt = self._goto[state].get(symbol)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][symbol] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), pattern if value is None else value))
+        self._built = False
+        self.size += 1
+
+    def build(self) -> "AhoCorasick":
+        """
+        Computes failure links (breadth-first) and merges outputs along them.
+        """
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for symbol, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and symbol not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(symbol, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, seq: Sequence[Hashable]) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Yields (start, end, value) for every (possibly overlapping) occurrence.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, symbol in enumerate(seq):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if out[state]:
+                end = i + 1
+                for length, value in out[state]:
+                    yield end - length, end, value
+
+
+def is_word_char(ch: str) -> bool:
+    r"""
+    Same character class as `\w` in Python's re for str patterns.
+    """
+    return ch.isalnum() or ch == "_"
+
+
+def regex_word_boundary(text: str, i: int) -> bool:
+    r"""
+    True where re's `\b` matches at position `i` of `text`: between a word and a
+    non-word character, or between a word character and either end of the text.
+    """
+    before = i > 0 and is_word_char(text[i - 1])
+    after = i < len(text) and is_word_char(text[i])
+    return before != after
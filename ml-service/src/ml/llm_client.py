@@ -0,0 +1,344 @@
+# backend/src/ml/llm_client.py
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, TypeVar
+
+from ml.cache import MISSING, TwoTierCache, cache_from_env, make_key, normalize_text
+from ml.model_registry import registry
+
+# "gemini" (Google Generative AI) or "stub" (offline stand-in with a fixed latency)
+LLM_BACKENDS = ("gemini", "stub")
+DEFAULT_LLM_BACKEND = os.getenv("ML_LLM_BACKEND", "gemini")
+LLM_MODEL = os.getenv("ML_LLM_MODEL", "gemini-1.5-pro")
+# Most LLM calls in flight at once per event loop; the rest wait for a slot
+LLM_MAX_CONCURRENCY = int(os.getenv("ML_LLM_MAX_CONCURRENCY", "8"))
+STUB_LATENCY_MS = float(os.getenv("ML_LLM_STUB_LATENCY_MS", "800"))
+
+# Replies by (backend, model, generation config, normalized prompt). ML_LLM_CACHE_SIZE/_TTL
+# size the in-process LRU. Prompts contain resume text, so the SQLite tier shared by the
+# workers is opt-in: set ML_LLM_CACHE_DB to a runtime path (_DB_SIZE/_DB_TTL to bound it).
+llm_cache = cache_from_env("llm", "ML_LLM_CACHE", max_entries=512, ttl_seconds=24 * 3600,
+                           disk_max_entries=20_000, disk_ttl_seconds=24 * 3600)
+
+# Display names used in the 'source_model' field of generated sections
+MODEL_LABELS = {"gemini-1.5-pro": "Gemini 1.5 Pro", "gemini-1.5-flash": "Gemini 1.5 Flash"}
+
+
+T = TypeVar("T")
+
+
+def run_blocking(make_coro: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs a coroutine to completion for a blocking caller.
+
+    Without a running event loop this is asyncio.run. Inside one (an `async def`
+    FastAPI route, a notebook) asyncio.run would raise, so the coroutine gets its own
+    loop on a worker thread and the caller blocks until it is done, just as the old
+    synchronous SDK call did.
+
+    Args:
+        make_coro (Callable): Returns the coroutine to run (called on the thread that runs it).
+
+    Returns:
+        The coroutine's result; its exception is raised in the caller.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coro())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-blocking") as pool:
+        return pool.submit(lambda: asyncio.run(make_coro())).result()
+
+
+def _for_loop(store: Dict, lock: threading.Lock, create):
+    """
+    The value for the running event loop in `store`, created on first use. Entries of
+    closed loops (e.g. from asyncio.run in blocking callers) are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    with lock:
+        for closed in [other for other in store if other.is_closed()]:
+            del store[closed]
+        value = store.get(loop)
+        if value is None:
+            value = store[loop] = create()
+    return value
+
+
+class LLMBlockedError(Exception):
+    """
+    The prompt or the response was blocked by the provider's safety filters.
+    """
+
+
+class GeminiBackend:
+    """
+    Google Gemini through google-generativeai's async API.
+
+    The SDK's async client holds a channel bound to the event loop that created it, so
+    one GenerativeModel is kept per loop and reused by every request on that loop.
+    """
+    name = "gemini"
+
+    def __init__(self, model_name: str = LLM_MODEL, api_key: Optional[str] = None):
+        import google.generativeai as genai
+
+        self._genai = genai
+        self.model_name = model_name
+        self.label = MODEL_LABELS.get(model_name, model_name)
+        self._models: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._lock = threading.Lock()
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if api_key:
+            self.configure(api_key)
+
+    def configure(self, api_key: str) -> None:
+        # Process-wide, like genai.configure has always been
+        self._genai.configure(api_key=api_key)
+
+    def _model(self):
+        return _for_loop(self._models, self._lock, lambda: self._genai.GenerativeModel(self.model_name))
+
+    async def generate(self, prompt: str, temperature: float, json_keys: Optional[Sequence[str]] = None) -> str:
+        config = {"temperature": temperature}
+        if json_keys:
+            config["response_mime_type"] = "application/json"
+        generation_types = self._genai.types.generation_types
+        try:
+            response = await self._model().generate_content_async(
+                prompt, generation_config=self._genai.types.GenerationConfig(**config))
+        except (generation_types.StopCandidateException, generation_types.BlockedPromptException) as e:
+            raise LLMBlockedError(str(e)) from e
+        if getattr(getattr(response, "prompt_feedback", None), "block_reason", None):
+            raise LLMBlockedError(f"Prompt blocked: {response.prompt_feedback.block_reason}")
+        return response.text
+
+
+class StubBackend:
+    """
+    Offline stand-in for throughput tests: waits `latency_ms` and returns canned text
+    (or a JSON object with the requested keys).
+    """
+    name = "stub"
+
+    def __init__(self, latency_ms: float = STUB_LATENCY_MS, model_name: str = "stub"):
+        self.latency_ms = latency_ms
+        self.model_name = model_name
+        self.label = model_name
+
+    def configure(self, api_key: str) -> None:
+        pass
+
+    async def generate(self, prompt: str, temperature: float, json_keys: Optional[Sequence[str]] = None) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        if json_keys:
+            return json.dumps({key: f"[stub] {key} for a {len(prompt)}-character prompt" for key in json_keys})
+        return f"[stub] response to a {len(prompt)}-character prompt"
+
+
+def load_backend(backend: Optional[str] = None, model_name: str = LLM_MODEL):
+    backend = backend or DEFAULT_LLM_BACKEND
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}'. Choose from {LLM_BACKENDS}.")
+    if backend == "stub":
+        return StubBackend()
+    return GeminiBackend(model_name)
+
+
+def parse_json_object(text: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """
+    Parses a JSON object reply (tolerating a ```json fence) and checks it has `keys`.
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object.")
+    missing = [key for key in keys if key not in data]
+    if missing:
+        raise ValueError(f"Response is missing keys: {', '.join(missing)}.")
+    return data
+
+
+class LLMClient:
+    """
+    Async client shared by the LLM-backed generators.
+
+    Calls go through one backend instance (one model and connection per event loop
+    instead of one per generator) and a semaphore that caps concurrent requests, so a
+    burst of reports queues inside the service rather than flooding the provider.
+    Successful replies are cached, so the same prompt for the same model and settings
+    (e.g. a resubmitted resume) is answered without a provider call.
+    """
+    def __init__(self, backend=None, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 cache: Optional[TwoTierCache] = llm_cache):
+        """
+        Args:
+            backend: A GeminiBackend, StubBackend or anything with the same
+                     `async generate(prompt, temperature, json_keys)`; ML_LLM_BACKEND by default.
+            max_concurrency (int): Most requests in flight at once (per event loop).
+            cache (TwoTierCache, optional): Reply cache; None disables caching.
+        """
+        self.backend = backend if backend is not None else load_backend()
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._errors = 0
+        self._blocked = 0
+        self._latency = 0.0
+        self._queue_wait = 0.0
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+
+    @property
+    def label(self) -> str:
+        return self.backend.label
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; blocking callers each run their own
+        return _for_loop(self._semaphores, self._lock, lambda: asyncio.Semaphore(self.max_concurrency))
+
+    def _cache_key(self, prompt: str, temperature: float, json_keys: Optional[Sequence[str]]) -> str:
+        config = json.dumps({"temperature": temperature, "json_keys": list(json_keys or [])}, sort_keys=True)
+        return make_key("llm", self.backend.name, self.model_name, config, normalize_text(prompt))
+
+    @staticmethod
+    def _cacheable(text: str, json_keys: Optional[Sequence[str]]) -> bool:
+        # Only complete answers: no empty replies, no JSON replies the caller would reject
+        if not isinstance(text, str) or not text.strip():
+            return False
+        if json_keys:
+            try:
+                data = parse_json_object(text, json_keys)
+            except ValueError:
+                return False
+            # A null or empty section (e.g. one target of a combined optimization) is an error reply
+            for key in json_keys:
+                value = data[key]
+                if value is None or value == [] or (isinstance(value, str) and not value.strip()):
+                    return False
+        return True
+
+    async def generate(self, prompt: str, temperature: float = 0.4, json_keys: Optional[Sequence[str]] = None,
+                       use_cache: bool = True) -> str:
+        """
+        Sends one prompt and returns the reply text, from the cache when the same
+        prompt was answered before with the same model and generation settings.
+
+        Args:
+            prompt (str): The full prompt.
+            temperature (float): Sampling temperature.
+            json_keys (Sequence[str], optional): Ask for a JSON object reply with these keys.
+            use_cache (bool): Look up and store the reply in the client's cache.
+
+        Returns:
+            str: The generated text. Raises LLMBlockedError for safety blocks and the
+                 backend's exception for other failures; neither is cached.
+        """
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            key = self._cache_key(prompt, temperature, json_keys)
+            # The disk tier is SQLite: keep it off the event loop
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not MISSING:
+                return cached
+
+        text = await self._call(prompt, temperature, json_keys)
+        if cache is not None and self._cacheable(text, json_keys):
+            await asyncio.to_thread(cache.set, key, text)
+        return text
+
+    async def _call(self, prompt: str, temperature: float, json_keys: Optional[Sequence[str]]) -> str:
+        queued = time.perf_counter()
+        async with self._semaphore():
+            started = time.perf_counter()
+            with self._lock:
+                self._requests += 1
+                self._in_flight += 1
+                self._max_in_flight = max(self._max_in_flight, self._in_flight)
+                self._queue_wait += started - queued
+            try:
+                return await self.backend.generate(prompt, temperature, json_keys)
+            except LLMBlockedError:
+                with self._lock:
+                    self._blocked += 1
+                raise
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._latency += time.perf_counter() - started
+
+    async def generate_json(self, prompt: str, keys: Sequence[str], temperature: float = 0.4) -> Dict[str, Any]:
+        """
+        Like `generate`, for prompts that ask for a JSON object with `keys`.
+        """
+        return parse_json_object(await self.generate(prompt, temperature, json_keys=keys), keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "model": self.model_name,
+                "max_concurrency": self.max_concurrency,
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+                "errors": self._errors,
+                "blocked": self._blocked,
+                "mean_latency_ms": round(self._latency / self._requests * 1000, 2) if self._requests else 0.0,
+                "mean_queue_wait_ms": round(self._queue_wait / self._requests * 1000, 2) if self._requests else 0.0,
+                "cache": self.cache.stats() if self.cache is not None else None,
+            }
+
+
+registry.register("llm_client", LLMClient)
+
+
+def get_llm_client(api_key: Optional[str] = None) -> LLMClient:
+    """
+    Returns the shared LLM client; an explicit api_key configures the backend with it.
+    """
+    client = registry.get("llm_client")
+    if api_key:
+        client.backend.configure(api_key)
+    return client
+
+
+if __name__ == '__main__':
+    # Offline throughput check: python -m ml.llm_client (from ml-service/src)
+    # 50 reports' worth of optimization calls, three separate prompts vs one combined prompt
+    from ml.resume_optimizer import ResumeOptimizer
+
+    # Uncached, so every call reaches the backend
+    client = LLMClient(StubBackend(latency_ms=STUB_LATENCY_MS), max_concurrency=LLM_MAX_CONCURRENCY, cache=None)
+    optimizer = ResumeOptimizer(client=client)
+    resume, job = "Senior engineer. Python, AWS, Docker.", "Backend developer: Python, FastAPI, AWS."
+    targets = ('summary', 'experience', 'skills')
+
+    async def separate():
+        await asyncio.gather(*(optimizer.optimize_resume_section_async(resume, job, t) for _ in range(50) for t in targets))
+
+    async def combined():
+        await asyncio.gather(*(optimizer.optimize_resume_sections_async(resume, job, targets) for _ in range(50)))
+
+    for name, run in (("separate", separate), ("combined", combined)):
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8}: {50 / elapsed:.1f} reports/s ({elapsed:.2f}s)")
+    print(client.stats())
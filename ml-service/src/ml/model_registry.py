@@ -0,0 +1,124 @@
+# backend/src/ml/model_registry.py
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class ModelRegistry:
+    """
+    Central, lazy store for the service's heavy artifacts (spaCy pipeline, skill matcher,
+    sentence encoder, TF-IDF vectorizers, keyword lists).
+
+    Modules register a loader under a name at import time, which is cheap; the artifact
+    itself is only built on the first `get()` or when `warmup()` is called, and is then
+    shared by every caller in the process. Load times are recorded per artifact so
+    cold-start cost can be inspected with `report()`.
+    """
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._artifacts: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Registers a zero-argument loader for an artifact. Re-registering a name
+        drops any artifact already loaded under it.
+
+        Args:
+            name (str): Artifact name used with `get()`.
+            loader (Callable): Builds and returns the artifact.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._artifacts.pop(name, None)
+            self._load_seconds.pop(name, None)
+            self._errors.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the artifact, loading it on first use. A failed load is remembered
+        and re-raised on later calls instead of being retried on every request;
+        use `reset()` to try again.
+        """
+        if name in self._artifacts:
+            return self._artifacts[name]
+        if name not in self._loaders:
+            raise KeyError(f"No loader registered for artifact '{name}'.")
+
+        with self._locks[name]:
+            if name in self._artifacts:
+                return self._artifacts[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            start = time.perf_counter()
+            try:
+                artifact = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = e
+                self._load_seconds[name] = time.perf_counter() - start
+                raise
+            self._load_seconds[name] = time.perf_counter() - start
+            self._artifacts[name] = artifact
+            return artifact
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._artifacts
+
+    def set(self, name: str, artifact: Any) -> None:
+        """
+        Replaces a loaded artifact in place (e.g. after a rebuild). Readers that
+        already hold the old object keep using it; new `get()` calls see the new one.
+        """
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+            self._artifacts[name] = artifact
+            self._errors.pop(name, None)
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """
+        Forgets a loaded (or failed) artifact so the next `get()` reloads it.
+        With no name, resets everything.
+        """
+        with self._lock:
+            names = [name] if name else list(self._loaders)
+            for n in names:
+                self._artifacts.pop(n, None)
+                self._load_seconds.pop(n, None)
+                self._errors.pop(n, None)
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Eagerly loads artifacts (all registered ones by default) and returns the report.
+        Failures are reported, not raised, so one missing artifact does not stop the rest.
+        """
+        for name in list(names) if names is not None else list(self._loaders):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Failed to load '{name}': {e}")
+        return self.report()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-artifact load status and time in seconds.
+        """
+        report = {}
+        for name in self._loaders:
+            seconds = self._load_seconds.get(name)
+            error = self._errors.get(name)
+            report[name] = {
+                "loaded": name in self._artifacts,
+                "load_seconds": round(seconds, 4) if seconds is not None else None,
+                "error": str(error) if error else None,
+            }
+        return report
+
+
+# Process-wide registry shared by all ml modules
+registry = ModelRegistry()
@@ -1,22 +1,53 @@
 # backend/src/ml/nlp_pipeline.py
 
 import os
+import itertools
 import json
+import multiprocessing
 import re
+from collections import deque
 from datetime import datetime
-import spacy
-from spacy.matcher import Matcher
+from typing import Iterable, Iterator
 from ml.preprocess import clean_text
-from rapidfuzz import fuzz
+from ml.fuzzy_index import FuzzySkillIndex
+from ml.model_registry import registry
+from ml.cache import MISSING, cache_from_env, make_key, normalize_text
+from ml.skill_matcher import load_skill_matcher
+from ml.taxonomy import get_taxonomy, taxonomy_version
+from ml.keyword_automaton import AhoCorasick
+
+
+def _ner_components(pipeline) -> list:
+    """
+    Names of the pipeline components NER needs: the ner pipe itself plus any
+    shared tok2vec it listens to (en_core_web_* ship NER with its own embedding).
+    """
+    needed = []
+    for name, component in pipeline.pipeline:
+        if name == "ner" or "ner" in getattr(component, "listening_components", []):
+            needed.append(name)
+    return needed
+
+
+def _load_spacy():
+    """
+    Loads the spaCy pipeline: try large, fallback to small.
+    """
+    import spacy
 
-# --- spaCy model: try large, fallback to small ---
-try:
-    nlp = spacy.load("en_core_web_lg")
-except Exception:
     try:
-        nlp = spacy.load("en_core_web_sm")
+        nlp = spacy.load("en_core_web_lg")
     except Exception:
-        raise RuntimeError("spaCy model not found. Run: python -m spacy download en_core_web_lg")
+        try:
+            nlp = spacy.load("en_core_web_sm")
+        except Exception:
+            raise RuntimeError("spaCy model not found. Run: python -m spacy download en_core_web_lg")
+
+    # Only NER output is used downstream and skill matching runs on tokenizer output,
+    # so the tagger, parser and lemmatizer stay disabled for every call.
+    nlp.select_pipes(enable=_ner_components(nlp))
+    return nlp
+
 
 # --- Load skills from skills.json (flatten categories) ---
 BASE_DIR = os.path.dirname(__file__)
@@ -28,13 +59,138 @@ with open(SKILLS_FILE, "r", encoding="utf-8") as f:
     SKILL_CATEGORIES = json.load(f)
 
 SKILLS_LIST = [skill.lower() for group in SKILL_CATEGORIES.values() for skill in group]
+# Version of the skill taxonomy (skills, roles, aliases); compiled artifacts and caches are keyed by it
+SKILLS_HASH = taxonomy_version()
+
+
+def _build_matcher():
+    """
+    Matcher setup (token-level, case-insensitive) over every skills.json entry and alias,
+    keyed by canonical skill; loaded from the compiled pattern artifact and only rebuilt when
+    the taxonomy changes.
+    """
+    return load_skill_matcher(get_nlp(), get_taxonomy().extraction_terms(), SKILLS_HASH)
+
+
+def _load_skill_tokenizer():
+    """
+    spaCy's English tokenizer on its own (the rules en_core_web_* use), without
+    loading any model weights.
+    """
+    import spacy
+
+    return spacy.blank("en").tokenizer
+
+
+def skill_tokens(cleaned_text: str) -> list:
+    """
+    Lowercased spaCy tokens, the same sequence the Matcher compares its LOWER patterns to.
+    """
+    return [token.lower_ for token in get_skill_tokenizer()(cleaned_text)]
+
+
+def _build_skill_automaton() -> AhoCorasick:
+    """
+    Token-level Aho-Corasick automaton over every skills.json entry and alias, reporting
+    the canonical skill; since it steps over whole tokens, a match can never start or
+    end inside a word.
+    """
+    automaton = AhoCorasick()
+    for term, skill in get_taxonomy().extraction_terms():
+        automaton.add(tuple(skill_tokens(term)), skill)
+    return automaton.build()
+
+
+registry.register("spacy", _load_spacy)
+registry.register("skill_matcher", _build_matcher)
+registry.register("skill_tokenizer", _load_skill_tokenizer)
+registry.register("skill_automaton", _build_skill_automaton)
+# Fuzzy fallback: n-gram prefiltered partial_ratio index over SKILLS_LIST
+registry.register("fuzzy_skill_index", lambda: FuzzySkillIndex(SKILLS_LIST, threshold=92))
+
+
+# Parse results keyed by normalized text + SKILLS_HASH. Configure with
+# ML_PARSE_CACHE_SIZE / ML_PARSE_CACHE_TTL / ML_PARSE_CACHE_DB (shared SQLite file).
+parse_cache = cache_from_env("parse", "ML_PARSE_CACHE", max_entries=2048, ttl_seconds=3600)
+
 
-# Matcher setup (token-level, case-insensitive)
-matcher = Matcher(nlp.vocab)
-for skill in SKILLS_LIST:
-    pattern = [{"LOWER": token.lower_} for token in nlp(skill)]
-    # Use the skill string as the matcher ID (lowercased)
-    matcher.add(skill, [pattern])
+def get_nlp():
+    return registry.get("spacy")
+
+
+def get_matcher():
+    return registry.get("skill_matcher")
+
+
+def get_fuzzy_index() -> FuzzySkillIndex:
+    return registry.get("fuzzy_skill_index")
+
+
+def get_skill_tokenizer():
+    return registry.get("skill_tokenizer")
+
+
+def get_skill_automaton() -> AhoCorasick:
+    return registry.get("skill_automaton")
+
+
+# Skill extraction engines for job descriptions: "matcher" (spaCy tokenizer + Matcher)
+# or "automaton" (spaCy's tokenizer alone + Aho-Corasick, no NER pipeline loaded). Both
+# see the same tokens and add the fuzzy fallback, so they return the same skills.
+SKILL_ENGINES = ("matcher", "automaton")
+DEFAULT_SKILL_ENGINE = os.getenv("ML_SKILL_ENGINE", "matcher")
+
+
+def _match_skills(doc) -> set:
+    """
+    Skills in a (tokenized) Doc via matcher + fuzzy token fallback.
+    """
+    found = set()
+    for match_id, start, end in get_matcher()(doc):
+        found.add(doc.vocab.strings[match_id])
+
+    # fuzzy token fallback
+    found.update(get_fuzzy_index().match(token.text.lower() for token in doc))
+    return _canonical_skills(found)
+
+
+def _match_skills_fast(cleaned_text: str) -> set:
+    """
+    Matcher-free equivalent of _match_skills for text already passed through clean_text:
+    the same tokens, matched by the Aho-Corasick automaton.
+    """
+    tokens = skill_tokens(cleaned_text)
+    found = {skill for _, _, skill in get_skill_automaton().iter_matches(tokens)}
+
+    # fuzzy token fallback
+    found.update(get_fuzzy_index().match(tokens))
+    return _canonical_skills(found)
+
+
+def _skills_in(cleaned_text: str, engine: str = None) -> set:
+    """
+    Skills in text already passed through clean_text, with the given skill engine.
+    """
+    engine = engine or DEFAULT_SKILL_ENGINE
+    if engine not in SKILL_ENGINES:
+        raise ValueError(f"Unknown skill engine '{engine}'. Choose from {SKILL_ENGINES}.")
+    if engine == "automaton":
+        return _match_skills_fast(cleaned_text)
+
+    return _match_skills(make_skill_doc(cleaned_text))
+
+
+def make_skill_doc(cleaned_text: str):
+    """
+    Tokenizer-only Doc of text already passed through clean_text: what the skill
+    Matcher runs on (no NER or parse output is used for skills).
+    """
+    return get_nlp().make_doc(cleaned_text)
+
+
+def _canonical_skills(skills: set) -> set:
+    taxonomy = get_taxonomy()
+    return {taxonomy.canonical(skill) for skill in skills}
 
 
 # --- Helpers for education extraction ---
@@ -108,11 +264,21 @@ def extract_experience_years(text: str) -> float:
       3) fallback: largest "X years" phrase found
     Returns float (years), rounded to 1 decimal. Returns 0.0 if none detected.
     """
+    return experience_years_from_evidence([extract_experience_evidence(text)])
+
+
+def extract_experience_evidence(text: str) -> dict:
+    """
+    Collects the raw experience signals of a text so that several texts (e.g. the
+    sections of one resume) can be combined with experience_years_from_evidence:
+      - "explicit": first explicit total experience in years, or None
+      - "intervals": [start_month, end_month] date ranges (unmerged)
+      - "fallback": largest "X years" phrase, or None
+    """
     text_orig = text  # keep original to get better matches
     # 1) explicit total experience
     m = re.search(r'(?:total|overall)?\s*experience[:\s]*([0-9]+(?:\.[0-9]+)?)\s*\+?\s*years', text_orig, flags=re.I)
-    if m:
-        return round(float(m.group(1)), 1)
+    explicit = float(m.group(1)) if m else None
 
     # 2) date ranges (YYYY-YYYY and month YYYY - month YYYY, with "present")
     intervals = []
@@ -152,9 +318,28 @@ def extract_experience_years(text: str) -> float:
     for s, e in year_intervals:
         month_intervals.append((s*12, e*12))
 
+    # 3) fallback: any "X years" phrase, use the largest numeric value found
+    found_yrs = [float(m.group(1)) for m in re.finditer(r'(\d+(?:\.\d+)?)\s*\+?\s*years', text_orig, flags=re.I)]
+
+    return {
+        "explicit": explicit,
+        "intervals": [[s, e] for s, e in month_intervals],
+        "fallback": max(found_yrs) if found_yrs else None,
+    }
+
+
+def experience_years_from_evidence(evidence: list) -> float:
+    """
+    Combines experience evidence (in document order) into total years, with the
+    same precedence as extract_experience_years.
+    """
+    for ev in evidence:
+        if ev["explicit"] is not None:
+            return round(ev["explicit"], 1)
+
+    month_intervals = [tuple(it) for ev in evidence for it in ev["intervals"]]
     if not month_intervals:
-        # 3) fallback: any "X years" phrase, use the largest numeric value found
-        found_yrs = [float(m.group(1)) for m in re.finditer(r'(\d+(?:\.\d+)?)\s*\+?\s*years', text_orig, flags=re.I)]
+        found_yrs = [ev["fallback"] for ev in evidence if ev["fallback"] is not None]
         if found_yrs:
             return round(max(found_yrs), 1)
         return 0.0
@@ -177,7 +362,7 @@ def extract_experience_years(text: str) -> float:
 
 
 # --- parse_resume: final function used by others ---
-def parse_resume(resume_text: str) -> dict:
+def parse_resume(resume_text: str, use_cache: bool = True, get_doc=None, get_skill_doc=None) -> dict:
     """
     Full resume parsing:
       - extract skills (matcher + fuzzy)
@@ -185,12 +370,116 @@ def parse_resume(resume_text: str) -> dict:
       - extract organizations (NER ORG)
       - extract education lines (heuristic)
       - estimate experience years
+    Results are cached by content hash unless use_cache is False; cached parsing runs
+    on the normalize_text form of the resume (NFC, unified line endings, lines
+    right-stripped), so NER sees that form rather than the raw upload.
+
+    `get_doc` (returning the NER Doc of the normalized text) and `get_skill_doc`
+    (returning make_skill_doc of its clean_text) let a caller that keeps them, e.g. an
+    AnalysisContext, tokenize the resume once for every stage; both are only called
+    when the result is not cached.
+    """
+    if use_cache:
+        text = normalize_text(resume_text)
+        key = make_key("parse_resume", SKILLS_HASH, text)
+        return parse_cache.get_or_compute(
+            key, lambda: parse_resume(text, use_cache=False, get_doc=get_doc, get_skill_doc=get_skill_doc)
+        )
+
+    # Single pipeline pass: NER on the text as given (normalized when called via the cache)
+    doc_raw = get_doc() if get_doc is not None else get_nlp()(resume_text)
+    return _extract_from_doc(doc_raw, get_skill_doc() if get_skill_doc is not None else None)
+
+
+def _parse_chunk(texts: list, batch_size: int) -> list:
+    # Runs in a parse_resumes worker: NER and every extraction step, not just NER
+    return [_extract_from_doc(doc_raw) for doc_raw in get_nlp().pipe(texts, batch_size=batch_size)]
+
+
+def parse_resumes(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> Iterator[dict]:
+    """
+    Batch version of parse_resume for bulk imports.
+
+    Streams the texts through nlp.pipe so spaCy batches NER, then runs skill
+    matching, education and experience extraction per Doc. With n_process > 1,
+    chunks of batch_size texts are parsed end to end in a pool of worker processes
+    (at most two chunks per worker in flight). Results are yielded lazily, in input
+    order, so memory stays bounded no matter how many resumes are fed in.
+
+    Args:
+        texts (Iterable[str]): Resume texts; any iterable, including generators.
+        batch_size (int): Number of texts spaCy buffers per batch (and per worker chunk).
+        n_process (int): Worker processes (-1 = all cores).
+
+    Yields:
+        dict: The parse_resume result for each text.
     """
-    # Use original text for NER; use cleaned text for skill matching (clean_text lowercases)
-    doc_raw = nlp(resume_text)
-    cleaned = clean_text(resume_text)
-    doc_clean = nlp(cleaned)
+    if n_process == -1:
+        n_process = os.cpu_count() or 1
+    if n_process <= 1:
+        for doc_raw in get_nlp().pipe(texts, batch_size=batch_size):
+            yield _extract_from_doc(doc_raw)
+        return
+
+    # Load the models first so forked workers share them instead of loading their own
+    get_nlp(), get_matcher(), get_fuzzy_index()
+    texts = iter(texts)
+    chunks = iter(lambda: list(itertools.islice(texts, batch_size)), [])
+    with multiprocessing.Pool(n_process) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_parse_chunk, (chunk, batch_size)))
+            if len(pending) >= 2 * n_process:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def _extract_from_doc(doc_raw, skill_doc=None) -> dict:
+    """
+    Builds the parse_resume result from a Doc that has already been through NER.
+    """
+    return _merge_sections([_extract_section(doc_raw, skill_doc)])
+
+
+def _extract_section(doc_raw, skill_doc=None) -> dict:
+    """
+    Extraction results for one piece of text (a whole resume or a single section)
+    in a JSON-serializable form that _merge_sections can combine.
+    """
+    text = doc_raw.text
+    # Skills are matched on the cleaned text rather than on doc_raw: the tokenizer
+    # splits "Node.JS" or "ASP.NET" at a lowercase/uppercase boundary, which clean_text's
+    # lowercasing avoids.
+    if skill_doc is None:
+        skill_doc = make_skill_doc(clean_text(text))
 
+    # NER: name & organizations
+    name = None
+    organizations = []
+    for ent in doc_raw.ents:
+        if ent.label_ == "PERSON" and not name:
+            name = ent.text
+        elif ent.label_ == "ORG":
+            if ent.text not in organizations:
+                organizations.append(ent.text)
+
+    return {
+        # Skills via matcher + fuzzy token fallback (ML_SKILL_ENGINE only applies to JDs)
+        "skills": sorted(_match_skills(skill_doc)),
+        "name": name,
+        "organizations": organizations,
+        # Education heuristic
+        "education": extract_education_from_text(text),
+        # Raw experience signals, turned into years once all sections are known
+        "experience": extract_experience_evidence(text),
+    }
+
+
+def _merge_sections(sections: list) -> dict:
+    """
+    Merges per-section results (in document order) into the parse_resume shape.
+    """
     extracted = {
         "name": None,
         "skills": [],
@@ -199,54 +488,96 @@ def parse_resume(resume_text: str) -> dict:
         "experience_years": 0.0
     }
 
-    # Skills via matcher + fuzzy token fallback
-    matches = matcher(doc_clean)
     skills_found = set()
-    for match_id, start, end in matches:
-        skills_found.add(nlp.vocab.strings[match_id])
-
-    # fuzzy token fallback
-    for token in doc_clean:
-        tok = token.text.lower()
-        for skill in SKILLS_LIST:
-            if fuzz.partial_ratio(tok, skill) > 92:
-                skills_found.add(skill)
+    for section in sections:
+        skills_found.update(section["skills"])
+        if not extracted["name"]:
+            extracted["name"] = section["name"]
+        for org in section["organizations"]:
+            if org not in extracted["organizations"]:
+                extracted["organizations"].append(org)
+        for line in section["education"]:
+            if line not in extracted["education"]:
+                extracted["education"].append(line)
 
     extracted["skills"] = sorted(skills_found)
 
-    # NER: name & organizations
-    for ent in doc_raw.ents:
-        if ent.label_ == "PERSON" and not extracted["name"]:
-            extracted["name"] = ent.text
-        elif ent.label_ == "ORG":
-            if ent.text not in extracted["organizations"]:
-                extracted["organizations"].append(ent.text)
-
-    # Education heuristic
-    extracted["education"] = extract_education_from_text(resume_text)
-
     # Experience estimation
-    extracted["experience_years"] = extract_experience_years(resume_text)
+    extracted["experience_years"] = experience_years_from_evidence([s["experience"] for s in sections])
 
     return extracted
 
 
-def extract_skills_from_description(job_description: str) -> list:
+# --- Section-level incremental parsing ---
+SECTION_HEADINGS = {
+    "skills": ["skills", "technical skills", "core skills", "key skills", "skills & tools", "technologies"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"],
+    "education": ["education", "academic background", "academics", "qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+# Per-section extraction results keyed by section hash + SKILLS_HASH
+section_cache = cache_from_env("sections", "ML_SECTION_CACHE", max_entries=8192, ttl_seconds=24 * 3600)
+
+
+def split_sections(resume_text: str) -> list:
     """
-    Extract skills from JD using matcher + fuzzy fallback.
+    Splits a resume into (section_name, text) chunks at heading lines such as
+    "Experience" or "TECHNICAL SKILLS:". Text before the first heading is the
+    "header"; heading lines stay with their section.
     """
-    cleaned = clean_text(job_description)
-    doc = nlp(cleaned)
-    matches = matcher(doc)
-    found = set()
-    for match_id, start, end in matches:
-        found.add(nlp.vocab.strings[match_id])
+    sections = [("header", [])]
+    for line in resume_text.split("\n"):
+        heading = re.sub(r"[^a-z& ]", "", line.strip().lower()).strip()
+        if heading in _HEADING_LOOKUP:
+            sections.append((_HEADING_LOOKUP[heading], [line]))
+        else:
+            sections[-1][1].append(line)
 
-    # fuzzy fallback (token-level)
-    for token in doc:
-        tok = token.text.lower()
-        for skill in SKILLS_LIST:
-            if fuzz.partial_ratio(tok, skill) > 92:
-                found.add(skill)
+    chunks = [(name, "\n".join(lines)) for name, lines in sections]
+    return [(name, text) for name, text in chunks if text.strip()]
 
-    return sorted(found)
+
+def parse_resume_incremental(resume_text: str) -> dict:
+    """
+    Section-level variant of parse_resume for resumes that are re-sent after every edit.
+
+    Each section's extraction is cached by its content hash, so only the sections that
+    changed since the last call go through spaCy; skills, organizations, education and
+    experience intervals are then merged into the usual parse_resume result.
+    """
+    sections = split_sections(normalize_text(resume_text))
+    keys = [make_key("resume_section", SKILLS_HASH, text) for _, text in sections]
+
+    results = [section_cache.get(key) for key in keys]
+    stale = [i for i, result in enumerate(results) if result is MISSING]
+    if stale:
+        docs = get_nlp().pipe(sections[i][1] for i in stale)
+        for i, doc in zip(stale, docs):
+            results[i] = _extract_section(doc)
+            section_cache.set(keys[i], results[i])
+
+    return _merge_sections(results)
+
+
+def extract_skills_from_description(job_description: str, use_cache: bool = True, engine: str = None) -> list:
+    """
+    Extract skills from JD using matcher + fuzzy fallback.
+    `engine` picks "matcher" (spaCy Matcher) or "automaton" (tokenizer + Aho-Corasick);
+    defaults to ML_SKILL_ENGINE. Results are cached by content hash unless
+    use_cache is False.
+    """
+    engine = engine or DEFAULT_SKILL_ENGINE
+    if engine not in SKILL_ENGINES:
+        raise ValueError(f"Unknown skill engine '{engine}'. Choose from {SKILL_ENGINES}.")
+
+    if use_cache:
+        text = normalize_text(job_description)
+        key = make_key("extract_skills", engine, SKILLS_HASH, text)
+        return parse_cache.get_or_compute(
+            key, lambda: extract_skills_from_description(text, use_cache=False, engine=engine)
+        )
+
+    return sorted(_skills_in(clean_text(job_description), engine))
@@ -1,156 +1,184 @@
-from ml.ats_checker import ATSChecker
+from ml.ats_checker import get_ats_checker
 from ml.career_path_model import CareerPathGenerator
-from ml.recommendation import CareerRecommender
-from ml.resume_optimizer import ResumeOptimizer
+from ml.recommendation import get_recommender
+from ml.resume_optimizer import OPTIMIZATION_TARGETS, ResumeOptimizer
 from ml.skill_gap_analysis import SkillGapAnalyzer
+from ml.taxonomy import get_taxonomy
 
+from ml.analysis_context import AnalysisContext
 from ml.analyzer import analyze_resume_vs_job
+from ml.stage_graph import StageGraph
 
+import asyncio
 import json
+import os
+import time
+from typing import AsyncIterator
 
-job_skills_model = {
-    "data scientist": [
-        "python", "r", "sql", "machine learning", "deep learning",
-        "tensorflow", "pytorch", "scikit-learn", "numpy", "pandas",
-        "matplotlib", "seaborn", "data visualization", "statistics",
-        "natural language processing", "big data", "hadoop", "spark",
-        "cloud platforms", "data wrangling", "feature engineering"
-    ],
-    "frontend developer": [
-        "javascript", "typescript", "react", "vue.js", "angular",
-        "html", "css", "sass", "tailwind css", "bootstrap",
-        "next.js", "redux", "api integration", "graphql", "webpack",
-        "responsive design", "testing (jest, cypress)", "ui frameworks",
-        "cross-browser compatibility", "version control (git)"
-    ],
-    "backend developer": [
-        "python", "java", "c#", "node.js", "express.js",
-        "spring boot", "django", "flask", "sql", "postgresql",
-        "mongodb", "redis", "docker", "kubernetes", "rest api",
-        "graphql", "microservices", "authentication", "testing (pytest, junit)",
-        "cloud services (aws, gcp, azure)"
-    ],
-    "full stack developer": [
-        "javascript", "typescript", "react", "angular", "vue.js",
-        "node.js", "express.js", "django", "flask", "spring boot",
-        "html", "css", "sass", "bootstrap", "tailwind css",
-        "sql", "postgresql", "mongodb", "graphql", "rest api",
-        "docker", "kubernetes", "git", "cloud platforms"
-    ],
-    "ux/ui designer": [
-        "figma", "sketch", "adobe xd", "invision", "illustrator",
-        "photoshop", "wireframing", "prototyping", "user research",
-        "information architecture", "interaction design", "visual design",
-        "design systems", "usability testing", "accessibility (a11y)",
-        "mobile design", "responsive design", "motion design"
-    ],
-    "devops engineer": [
-        "linux", "bash", "python", "docker", "kubernetes",
-        "terraform", "ansible", "jenkins", "gitlab ci/cd", "prometheus",
-        "grafana", "aws", "gcp", "azure", "system monitoring",
-        "networking", "load balancing", "scalability", "cloud security"
-    ],
-    "cybersecurity analyst": [
-        "network security", "penetration testing", "firewalls", "ids/ips",
-        "wireshark", "nmap", "kali linux", "python", "siem tools",
-        "incident response", "threat analysis", "cryptography",
-        "vulnerability scanning", "ethical hacking", "cloud security",
-        "compliance (GDPR, HIPAA)", "risk assessment", "osint"
-    ],
-    "ai/ml engineer": [
-        "python", "r", "c++", "machine learning", "deep learning",
-        "tensorflow", "pytorch", "keras", "scikit-learn", "huggingface",
-        "nlp", "computer vision", "reinforcement learning", "mllib",
-        "sql", "data preprocessing", "cloud ml services",
-        "mlops", "feature engineering", "model deployment"
-    ],
-    "project manager": [
-        "project planning", "scrum", "kanban", "agile methodology",
-        "jira", "confluence", "trello", "microsoft project", "stakeholder management",
-        "risk management", "budgeting", "time management",
-        "communication", "leadership", "quality assurance",
-        "change management", "resource allocation"
-    ],
-    "business analyst": [
-        "requirement gathering", "sql", "excel", "tableau",
-        "power bi", "data analysis", "process modeling",
-        "uml diagrams", "stakeholder communication",
-        "business process management", "agile methodology",
-        "user stories", "gap analysis", "documentation"
-    ],
-    "cloud engineer": [
-        "aws", "gcp", "azure", "terraform", "cloudformation",
-        "docker", "kubernetes", "linux", "python", "boto3",
-        "ci/cd pipelines", "cloud networking", "serverless architecture",
-        "monitoring", "iam", "cost optimization"
-    ],
-    "qa engineer": [
-        "manual testing", "automated testing", "selenium", "cypress",
-        "junit", "pytest", "api testing", "performance testing",
-        "load testing", "test planning", "bug tracking",
-        "jira", "test automation frameworks", "ci/cd integration",
-        "security testing", "mobile testing"
-    ]
+# Ask for summary, experience and skills optimizations in one LLM call (0 = three calls)
+COMBINED_OPTIMIZATION = os.getenv("ML_LLM_COMBINED_OPTIMIZATION", "1") == "1"
+
+
+def _resume_analysis(context: AnalysisContext) -> dict:
+    return analyze_resume_vs_job(context.resume_text, context.job_description, context=context)
+
+
+def _skill_gap(target_role: str, context: AnalysisContext) -> dict:
+    # Role requirements come from the compiled taxonomy (skill_gap.json + aliases)
+    skill_gap_analyzer = SkillGapAnalyzer(taxonomy=get_taxonomy())
+    return skill_gap_analyzer.analyze(None, target_role, context=context)
+
+
+def _recommendations(context: AnalysisContext) -> list:
+    # Shared instance: the job matrix is loaded once per process, not per report
+    recommender = get_recommender()
+    return recommender.get_recommendations(context.text("resume_skills"), top_n=5, context=context)
+
+
+def _ats_score(context: AnalysisContext) -> dict:
+    return get_ats_checker().get_ats_report(context.resume_text, context.job_description, context=context)
+
+
+async def _roadmap(resume_analysis: dict, target_role: str, roadmap_generator: CareerPathGenerator) -> dict:
+    resume_skills = resume_analysis['resume'].get('skills', [])
+    missing_skills = resume_analysis['analysis'].get('missing_skills', [])
+    return await roadmap_generator.generate_roadmap_async(resume_skills, missing_skills, target_role, timeline_months=3)
+
+
+def _optimization(optimization_target: str):
+    async def optimize(resume_text: str, job_description: str, resume_optimizer: ResumeOptimizer) -> dict:
+        return await resume_optimizer.optimize_resume_section_async(resume_text, job_description, optimization_target=optimization_target)
+    return optimize
+
+
+async def _combined_optimization(resume_text: str, job_description: str, resume_optimizer: ResumeOptimizer) -> dict:
+    return await resume_optimizer.optimize_resume_sections_async(resume_text, job_description, OPTIMIZATION_TARGETS)
+
+
+# Which report stage needs what: only the roadmap waits for the resume analysis (it
+# needs the missing skills); every other stage starts right away. Local stages share
+# the request's AnalysisContext, so concurrent stages wait for the one parse and the
+# one vector per vectorizer instead of recomputing them.
+REPORT_GRAPH = (
+    StageGraph()
+    .add("resume_analysis", _resume_analysis, inputs=("context",))
+    .add("skill_gap_analysis", _skill_gap, inputs=("target_role", "context"))
+    .add("career_recommendations", _recommendations, inputs=("context",))
+    .add("ats_score", _ats_score, inputs=("context",))
+    .add("career_roadmap", _roadmap, inputs=("resume_analysis", "target_role", "roadmap_generator"))
+)
+if COMBINED_OPTIMIZATION:
+    # One structured call for summary, experience and skills: resume and JD are sent once
+    REPORT_GRAPH.add("resume_optimization", _combined_optimization,
+                     inputs=("resume_text", "job_description", "resume_optimizer"))
+else:
+    for _target in OPTIMIZATION_TARGETS:
+        REPORT_GRAPH.add(f"optimization_{_target}", _optimization(_target),
+                         inputs=("resume_text", "job_description", "resume_optimizer"))
+
+
+# Report section (and key within it) that each stage's output goes to
+REPORT_SECTIONS = {
+    "resume_analysis": ("resume_analysis", None),
+    "skill_gap_analysis": ("skill_gap_analysis", None),
+    "career_recommendations": ("career_recommendations", None),
+    "ats_score": ("ats_score", None),
+    "career_roadmap": ("career_roadmap", None),
+    "resume_optimization": ("resume_optimization", None),
+    "optimization_summary": ("resume_optimization", "summary"),
+    "optimization_experience": ("resume_optimization", "experience"),
+    "optimization_skills": ("resume_optimization", "skills"),
 }
 
 
-def generate_complete_report(resume_text: str, job_description: str, target_role: str) -> dict:
+def _report_inputs(resume_text: str, job_description: str, target_role: str) -> dict:
+    return dict(
+        resume_text=resume_text,
+        job_description=job_description,
+        target_role=target_role,
+        context=AnalysisContext(resume_text, job_description),
+        # Both share the process-wide LLM client (ML_LLM_BACKEND, GEMINI_API_KEY)
+        roadmap_generator=CareerPathGenerator(),
+        resume_optimizer=ResumeOptimizer(),
+    )
+
+
+async def generate_complete_report_async(resume_text: str, job_description: str, target_role: str) -> dict:
     """
     Generates a comprehensive report including resume analysis, skill gap analysis,
     career recommendations, ATS score, and a career roadmap.
 
+    Stages run through REPORT_GRAPH, so independent ones overlap and the report takes
+    about as long as its slowest chain of stages.
+
     Args:
         resume_text (str): The text of the candidate's resume.
         job_description (str): The text of the job description.
         target_role (str): The desired career role for roadmap generation.
 
     Returns:
-        dict: A comprehensive report with all analyses and recommendations.
+        dict: A comprehensive report with all analyses and recommendations, plus
+              per-stage timings under 'timings'.
     """
-    # Step 1: Analyze Resume vs Job Description
-    analysis_result = analyze_resume_vs_job(resume_text, job_description)
-    resume_skills = analysis_result['resume'].get('skills', [])
-    job_skills = analysis_result['job_description'].get('skills', [])
-    missing_skills = analysis_result['analysis'].get('missing_skills', [])
-
-    # Step 2: Skill Gap Analysis
-    skill_gap_analyzer = SkillGapAnalyzer(job_skills_model)
-    skill_gap_report = skill_gap_analyzer.analyze(resume_skills, target_role)
-
-    # Step 3: Career Recommendations
-    recommender = CareerRecommender(job_data_path='src/ml/data_model/job_roles_dataset_expanded.csv', vectorizer_path='src/ml/data_model/vectorizer.pkl')
-    recommendations = recommender.get_recommendations(", ".join(resume_skills), top_n=5)
-
-    # Step 4: ATS Score
-    ats_checker = ATSChecker()
-    ats_score = ats_checker.get_ats_report(resume_text, job_description)
-
-    # Step 5: Career Roadmap Generation
-    roadmap_generator = CareerPathGenerator(api_key="YOUR_GEMINI_API_KEY")
-    roadmap = roadmap_generator.generate_roadmap(resume_skills, missing_skills, target_role, timeline_months=3)
-    
-    # Step 6: Resume Optimization Suggestions
-    resume_optimizer = ResumeOptimizer(api_key='YOUR_API_KEY')
-    optimization_suggestions_sum = resume_optimizer.optimize_resume_section(resume_text, job_description, optimization_target='summary')
-    optimization_suggestions_exp = resume_optimizer.optimize_resume_section(resume_text, job_description, optimization_target='experience')
-    optimization_suggestions_skills = resume_optimizer.optimize_resume_section(resume_text, job_description, optimization_target='skills')
+    start = time.perf_counter()
+    outputs, timings = await REPORT_GRAPH.run_async(**_report_inputs(resume_text, job_description, target_role))
 
     # Compile the complete report
+    if "resume_optimization" in outputs:
+        resume_optimization = outputs["resume_optimization"]
+    else:
+        resume_optimization = {target: outputs[f"optimization_{target}"] for target in OPTIMIZATION_TARGETS}
     complete_report = {
-        "resume_analysis": analysis_result,
-        "skill_gap_analysis": skill_gap_report,
-        "career_recommendations": recommendations,
-        "ats_score": ats_score,
-        "career_roadmap": roadmap,
-        "resume_optimization": {
-            "summary": optimization_suggestions_sum,
-            "experience": optimization_suggestions_exp,
-            "skills": optimization_suggestions_skills
-        }
+        "resume_analysis": outputs["resume_analysis"],
+        "skill_gap_analysis": outputs["skill_gap_analysis"],
+        "career_recommendations": outputs["career_recommendations"],
+        "ats_score": outputs["ats_score"],
+        "career_roadmap": outputs["career_roadmap"],
+        "resume_optimization": resume_optimization,
+        "timings": {
+            "stages": timings,
+            "total_ms": round((time.perf_counter() - start) * 1000, 2),
+        },
     }
 
     return complete_report
 
+
+async def stream_complete_report(resume_text: str, job_description: str, target_role: str) -> AsyncIterator[dict]:
+    """
+    Same stages as generate_complete_report_async, yielding each section as soon as its
+    stage finishes: the local sections (analysis, skill gap, recommendations, ATS) come
+    back within the cost of the local pipeline, then each LLM section as it arrives.
+
+    Args:
+        resume_text (str): The text of the candidate's resume.
+        job_description (str): The text of the job description.
+        target_role (str): The desired career role for roadmap generation.
+
+    Yields:
+        dict: {'section', 'key' ('summary' etc. within 'resume_optimization' when the
+              optimizations run as separate calls, else None),
+              'data', 'start_ms', 'duration_ms'} per stage; then {'section': 'done',
+              'total_ms'}, or {'section': 'error', 'message'} if a stage failed.
+    """
+    start = time.perf_counter()
+    try:
+        async for stage, output, timing in REPORT_GRAPH.stream(**_report_inputs(resume_text, job_description, target_role)):
+            section, key = REPORT_SECTIONS[stage]
+            yield {"section": section, "key": key, "data": output, **timing}
+    except Exception as e:
+        print(f"Report stage failed: {e}")
+        yield {"section": "error", "message": str(e)}
+        return
+    yield {"section": "done", "total_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def generate_complete_report(resume_text: str, job_description: str, target_role: str) -> dict:
+    """
+    Blocking `generate_complete_report_async` for callers without an event loop.
+    """
+    return asyncio.run(generate_complete_report_async(resume_text, job_description, target_role))
+
 if __name__ == '__main__':
     # Example usage
     resume_text = """John Doe
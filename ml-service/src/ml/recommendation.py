@@ -1,10 +1,142 @@
 # Career/project recommendation models
 
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import joblib
+import hashlib
+import itertools
 import os
+import tempfile
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from ml.ann_index import IVFIndex
+from ml.job_catalog import CATALOG_DIR, JobCatalog, new_vectorizer
+from ml.model_registry import registry
+from ml.skill_matcher import file_sha256
+
+# Default artifacts (relative to the ml-service root, like the ATS models)
+JOB_DATA_PATH = 'src/ml/data_model/job_roles_dataset_expanded.csv'
+VECTORIZER_PATH = 'src/ml/data_model/vectorizer.pkl'
+# Precomputed TF-IDF job matrix (CSR) and the role title of each row
+JOB_MATRIX_PATH = 'src/ml/data_model/job_matrix.npz'
+JOB_TITLES_PATH = 'src/ml/data_model/job_titles.npz'
+# Optional IVF index over the job matrix (built offline with `python -m ml.ann_index`)
+JOB_ANN_PATH = 'src/ml/data_model/job_ann'
+# Lists scanned per query when the ANN index is in use (higher = better recall, slower)
+ANN_NPROBE = int(os.getenv("ML_ANN_NPROBE", "8"))
+# Jobs fetched from the ANN index per query and rescored on their TF-IDF vectors
+ANN_CANDIDATES = int(os.getenv("ML_ANN_CANDIDATES", "50"))
+# How often workers check the job catalog manifest for a new generation
+CATALOG_POLL_SECONDS = float(os.getenv("ML_CATALOG_POLL_SECONDS", "5"))
+# Memory for one dense (students x jobs) float64 score block in get_recommendations_batch
+BATCH_BLOCK_MB = float(os.getenv("ML_BATCH_BLOCK_MB", "256"))
+
+registry.register("career_vectorizer", lambda: joblib.load(VECTORIZER_PATH))
+
+
+def job_index_version(job_data_path, vectorizer_path):
+    """
+    Hash of the job data and vectorizer the job matrix was computed from.
+    """
+    digest = hashlib.sha256()
+    for path in (job_data_path, vectorizer_path):
+        digest.update(file_sha256(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _save_atomic(path, save):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")
+    os.close(fd)
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build_job_index(jobs_df, vectorizer, version, matrix_path=JOB_MATRIX_PATH, titles_path=JOB_TITLES_PATH):
+    """
+    Transforms every job once and writes the CSR matrix and role titles to disk.
+
+    Args:
+        jobs_df (pd.DataFrame): Job rows with 'role_title' and 'combined_text'.
+        vectorizer (TfidfVectorizer): The fitted vectorizer.
+        version (str): Source version stored with the titles (see job_index_version).
+        matrix_path (str): Where to write the CSR matrix (.npz).
+        titles_path (str): Where to write the role titles and version (.npz).
+
+    Returns:
+        tuple: (CSR job matrix, role titles array)
+    """
+    job_vectors = sparse.csr_matrix(vectorizer.transform(jobs_df['combined_text']), dtype=np.float32)
+    role_titles = jobs_df['role_title'].to_numpy(dtype=str)
+    _save_atomic(matrix_path, lambda tmp: sparse.save_npz(tmp, job_vectors))
+    _save_atomic(titles_path, lambda tmp: np.savez(tmp, titles=role_titles, version=np.array(version)))
+    return job_vectors, role_titles
+
+
+def load_job_index(version, matrix_path=JOB_MATRIX_PATH, titles_path=JOB_TITLES_PATH):
+    """
+    Loads the precomputed job matrix and titles, or returns None if they are missing or stale.
+    """
+    try:
+        with np.load(titles_path, allow_pickle=False) as data:
+            if str(data['version']) != version:
+                return None
+            role_titles = data['titles']
+        job_vectors = sparse.load_npz(matrix_path).tocsr()
+    except (OSError, KeyError, ValueError):
+        return None
+    if job_vectors.shape[0] != len(role_titles):
+        return None
+    return job_vectors, role_titles
+
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k largest scores, best first, without sorting the whole array.
+    Ties go to the lowest index (same order as np.argsort(-scores, kind='stable')[:k]).
+    """
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[-1]:
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        # Everything above the k-th score, then the lowest indices of the rows tied with it
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(scores.shape[-1])
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def top_k_rows(scores, k):
+    """
+    Row-wise top_k_indices for a 2-D score matrix: (n, k) column indices, best first.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        tied = scores == kth
+        keep = above | tied
+        # Rows with more ties than free slots keep only their lowest tied columns
+        for row in np.flatnonzero(keep.sum(axis=1) > k):
+            keep[row, np.flatnonzero(tied[row])[k - above[row].sum():]] = False
+        # Exactly k columns per row, in ascending column order
+        candidates = np.nonzero(keep)[1].reshape(len(scores), k)
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    # Stable sort over ascending columns: ties keep the lowest column first
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
 
 class CareerRecommender:
     """
@@ -21,59 +153,266 @@ class CareerRecommender:
         """
         if not os.path.exists(job_data_path):
             raise FileNotFoundError(f"Job data file not found at {job_data_path}")
-        
-        self.jobs_df = pd.read_csv(job_data_path)
-        self.vectorizer = TfidfVectorizer(stop_words='english', token_pattern=r'(?u)\b[a-zA-Z0-9_]{2,}\b')
+
+        self.job_data_path = job_data_path
+        self._jobs_df = None
+        self.vectorizer = new_vectorizer()
         self.job_vectors = None
+        self.role_titles = None
+        self.index_version = None
+        self.ann_index = None
+        self.ann_nprobe = ANN_NPROBE
+        # Index id -> job row (None: the same) and rows the index does not cover
+        self.ann_rows = None
+        self.ann_delta = np.empty(0, dtype=np.int64)
+        self.catalog_generation = None
+        self.catalog_snapshot = None
 
         if vectorizer_path and os.path.exists(vectorizer_path):
             # Load pre-trained vectorizer and job vectors for faster startup
-            self.vectorizer = joblib.load(vectorizer_path)
-            self.job_vectors = self.vectorizer.transform(self.jobs_df['combined_text'])
+            if vectorizer_path == VECTORIZER_PATH:
+                self.vectorizer = registry.get("career_vectorizer")
+            else:
+                self.vectorizer = joblib.load(vectorizer_path)
+
+            version = self.index_version = job_index_version(job_data_path, vectorizer_path)
+            # Only the default dataset has a persisted matrix; others are transformed in memory
+            is_default = (job_data_path, vectorizer_path) == (JOB_DATA_PATH, VECTORIZER_PATH)
+            index = load_job_index(version) if is_default else None
+            if index is None:
+                if is_default:
+                    try:
+                        index = build_job_index(self.jobs_df, self.vectorizer, version)
+                        print(f"Wrote job matrix to {JOB_MATRIX_PATH}")
+                    except OSError as e:
+                        print(f"Could not write job matrix to {JOB_MATRIX_PATH}: {e}")
+                if index is None:
+                    index = (sparse.csr_matrix(self.vectorizer.transform(self.jobs_df['combined_text']), dtype=np.float32),
+                             self.jobs_df['role_title'].to_numpy(dtype=str))
+            self.job_vectors, self.role_titles = index
+            if is_default:
+                self.ann_index = self._load_ann_index(version)
             print("Loaded pre-trained vectorizer and job vectors.")
         else:
-            # If no pre-trained vectorizer, train one from scratch
-            raise ValueError("No pre-trained vectorizer found. Please train the model first using the `train()` method.")
-            
-    def get_recommendations(self, student_skills, top_n=5):
+            # If no pre-trained vectorizer, train one from scratch on the job data
+            print("No pre-trained vectorizer found; fitting one on the job data.")
+            self.vectorizer.fit(self.jobs_df['combined_text'])
+            self.job_vectors = sparse.csr_matrix(self.vectorizer.transform(self.jobs_df['combined_text']), dtype=np.float32)
+            self.role_titles = self.jobs_df['role_title'].to_numpy(dtype=str)
+
+    @classmethod
+    def from_catalog(cls, snapshot):
+        """
+        Builds a recommender over one generation of the incremental job catalog.
+
+        Args:
+            snapshot (CatalogSnapshot): From JobCatalog.snapshot().
+        """
+        recommender = cls.__new__(cls)
+        recommender.job_data_path = None
+        recommender._jobs_df = None
+        recommender.vectorizer = snapshot.vectorizer
+        recommender.job_vectors = snapshot.job_vectors
+        recommender.role_titles = snapshot.role_titles
+        recommender.index_version = f"catalog-{snapshot.generation}"
+        # Built by the last catalog rebuild; jobs upserted since are scored exactly
+        recommender.ann_index = snapshot.ann_index
+        recommender.ann_nprobe = ANN_NPROBE
+        recommender.ann_rows = snapshot.base_rows
+        recommender.ann_delta = snapshot.delta_rows
+        recommender.catalog_generation = snapshot.generation
+        recommender.catalog_snapshot = snapshot
+        return recommender
+
+    @staticmethod
+    def _load_ann_index(version):
+        if not os.path.exists(f"{JOB_ANN_PATH}.json"):
+            return None
+        try:
+            index = IVFIndex.load(JOB_ANN_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Could not load job ANN index from {JOB_ANN_PATH}: {e}")
+            return None
+        if index.meta.get("version") != version:
+            print(f"Ignoring stale job ANN index at {JOB_ANN_PATH}; rebuild it with `python -m ml.ann_index`")
+            return None
+        print(f"Loaded job ANN index ({index.n_lists} lists, nprobe={ANN_NPROBE}).")
+        return index
+
+    def _ann_recommendations(self, student_vectors, top_n):
+        # The index ranks in its reduced space; candidates (plus jobs added since it was
+        # built) are rescored on their TF-IDF vectors, so scores match the exact path
+        ids, _ = self.ann_index.search(student_vectors, max(top_n, ANN_CANDIDATES), nprobe=self.ann_nprobe)
+        if self.ann_rows is not None:
+            ids = np.where(ids >= 0, self.ann_rows[np.maximum(ids, 0)], -1)
+        results = []
+        for q, row_ids in enumerate(ids):
+            rows = np.union1d(row_ids[row_ids >= 0], self.ann_delta)
+            scores = (self.job_vectors[rows] @ student_vectors[q].T).toarray().ravel()
+            results.append([
+                {'role_title': str(self.role_titles[rows[i]]), 'match_score': float(scores[i])}
+                for i in top_k_indices(scores, top_n)
+            ])
+        return results
+
+    @property
+    def jobs_df(self):
+        # The full table is only needed to (re)build the job matrix or for inspection
+        if self._jobs_df is None and self.catalog_snapshot is not None:
+            snapshot = self.catalog_snapshot
+            self._jobs_df = pd.DataFrame({
+                'job_id': snapshot.job_ids, 'role_title': snapshot.role_titles, 'combined_text': snapshot.texts,
+            })
+        elif self._jobs_df is None:
+            self._jobs_df = pd.read_csv(self.job_data_path)
+        return self._jobs_df
+
+    def get_recommendations(self, student_skills, top_n=5, context=None):
         """
         Recommends career roles based on student's skills.
 
         Args:
-            student_skills (str): A string of skills from the student's resume.
+            student_skills (str): A string of skills from the student's resume
+                                  (ignored when a context is given).
             top_n (int): The number of top recommendations to return.
+            context (AnalysisContext, optional): Request context; the TF-IDF vector of its
+                                                 resume skills is computed once and shared.
 
         Returns:
             list: A list of dictionaries, each containing 'role_title' and 'match_score'.
         """
         if not self.job_vectors is None:
             # Vectorize the student's skills
-            student_vector = self.vectorizer.transform([student_skills])
+            if context is not None:
+                student_vector = context.tfidf(self.vectorizer, "resume_skills")
+            else:
+                student_vector = self.vectorizer.transform([student_skills])
+
+            if self.ann_index is not None:
+                # Large catalogs: scan only the closest IVF lists instead of every job
+                return self._ann_recommendations(student_vector, top_n)[0]
 
             # Calculate cosine similarity between student's skills and all job roles
-            similarity_scores = cosine_similarity(student_vector, self.job_vectors).flatten()
+            # (TF-IDF rows are L2-normalized, so cosine is a sparse dot product)
+            similarity_scores = (self.job_vectors @ student_vector.T).toarray().ravel()
 
             # Get the indices of the top N most similar jobs
-            top_indices = similarity_scores.argsort()[-top_n:][::-1]
+            top_indices = top_k_indices(similarity_scores, top_n)
 
             # Collect the recommendations
-            recommendations = []
-            for i in top_indices:
-                role_title = self.jobs_df.iloc[i]['role_title']
-                match_score = float(similarity_scores[i])
-                recommendations.append({
-                    'role_title': role_title,
-                    'match_score': match_score
-                })
+            recommendations = [
+                {'role_title': str(self.role_titles[i]), 'match_score': float(similarity_scores[i])}
+                for i in top_indices
+            ]
 
             return recommendations
         else:
             print("Model not trained. Please run the train() method first.")
             return []
 
+    def get_recommendations_batch(self, student_skills_list, top_n=5, chunk_size=None):
+        """
+        Recommends career roles for many students, streaming results in input order.
+
+        Each chunk of students is vectorized at once and scored against every job with
+        a single sparse matrix product; only one (chunk_size x jobs) score block is held
+        in memory at a time. By default chunk_size is sized so that block fits in
+        ML_BATCH_BLOCK_MB, however many jobs the catalog has.
+
+        Args:
+            student_skills_list (Iterable[str]): Skill strings, one per student (may be a generator).
+            top_n (int): The number of top recommendations per student.
+            chunk_size (int, optional): Students scored per matrix product.
+
+        Yields:
+            list: For each student, the same list of dicts get_recommendations returns.
+        """
+        if self.job_vectors is None:
+            print("Model not trained. Please run the train() method first.")
+            return
+
+        if chunk_size is None:
+            row_bytes = 8 * max(len(self.role_titles), 1)
+            chunk_size = max(1, int(BATCH_BLOCK_MB * 2**20) // row_bytes)
+
+        job_vectors_t = self.job_vectors.T.tocsc()
+        students = iter(student_skills_list)
+        while True:
+            chunk = list(itertools.islice(students, chunk_size))
+            if not chunk:
+                return
+            student_vectors = self.vectorizer.transform(chunk)
+            if self.ann_index is not None:
+                yield from self._ann_recommendations(student_vectors, top_n)
+                continue
+            scores = (student_vectors @ job_vectors_t).toarray()
+            top = top_k_rows(scores, top_n)
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            for row in range(len(chunk)):
+                yield [
+                    {'role_title': str(self.role_titles[j]), 'match_score': float(score)}
+                    for j, score in zip(top[row], top_scores[row])
+                ]
+
+job_catalog = JobCatalog(CATALOG_DIR)
+
+
+def _load_default_recommender():
+    # The incremental catalog, once created, supersedes the static CSV
+    if job_catalog.exists():
+        return CareerRecommender.from_catalog(job_catalog.snapshot())
+    return CareerRecommender(JOB_DATA_PATH, VECTORIZER_PATH)
+
+
+registry.register("career_recommender", _load_default_recommender)
+
+
+def ensure_job_catalog():
+    """
+    Returns the job catalog, creating it from the job CSV on first use. The existing
+    vectorizer is kept so scores match the CSV-based recommender until the first rebuild.
+    """
+    if not job_catalog.exists():
+        vectorizer = registry.get("career_vectorizer") if os.path.exists(VECTORIZER_PATH) else None
+        job_catalog.create(JOB_DATA_PATH, vectorizer, exist_ok=True)
+    return job_catalog
+
+_refresh_lock = threading.Lock()
+_last_poll = 0.0
+
+
+def get_recommender(refresh=False):
+    """
+    Returns the shared recommender for the default job data.
+
+    When the job catalog is in use, a new catalog generation is picked up (at most every
+    CATALOG_POLL_SECONDS, or right away with refresh=True) by building the new recommender
+    aside and swapping the shared reference; requests already holding the old one finish on it.
+    Until the next rebuild, only the segments added since the current snapshot are read.
+    """
+    global _last_poll
+    recommender = registry.get("career_recommender")
+    now = time.monotonic()
+    if not refresh and now - _last_poll < CATALOG_POLL_SECONDS:
+        return recommender
+    if not _refresh_lock.acquire(blocking=refresh):
+        return recommender
+    try:
+        _last_poll = now
+        generation = job_catalog.generation()
+        if generation and generation != recommender.catalog_generation:
+            recommender = CareerRecommender.from_catalog(job_catalog.snapshot(previous=recommender.catalog_snapshot))
+            registry.set("career_recommender", recommender)
+            print(f"Loaded job catalog generation {recommender.catalog_generation} ({len(recommender.role_titles)} jobs).")
+    except Exception as e:
+        print(f"Could not refresh job catalog: {e}")
+    finally:
+        _refresh_lock.release()
+    return recommender
+
 if __name__ == '__main__':    
     
-    recommender = CareerRecommender(job_data_path='src/ml/data_model/job_roles_dataset_expanded.csv', vectorizer_path='src/ml/data_model/vectorizer.pkl')
+    recommender = CareerRecommender(job_data_path=JOB_DATA_PATH, vectorizer_path=VECTORIZER_PATH)
     print("\n--- Career Recommender Initialized ---")
     print(recommender.jobs_df)
     
@@ -87,4 +426,10 @@ if __name__ == '__main__':
     
     print("\nTop Career Recommendations:")
     for rec in recommendations:
-        print(f"- Role: {rec['role_title']} | Match Score: {rec['match_score']:.2f}")
\ No newline at end of file
+        print(f"- Role: {rec['role_title']} | Match Score: {rec['match_score']:.2f}")
+    # Batch path, e.g. for nightly recommendations over all users
+    students = ["python, sql, machine learning", "react, css, javascript", "agile, scrum, jira"] * 100000
+    start = time.perf_counter()
+    count = sum(1 for _ in recommender.get_recommendations_batch(students, top_n=5))
+    elapsed = time.perf_counter() - start
+    print(f"\nBatch: {count} students in {elapsed:.2f}s ({count / elapsed * 60:,.0f} per minute)")
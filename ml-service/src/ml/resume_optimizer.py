@@ -1,20 +1,45 @@
 # Role-based resume suggestions
 
 # backend/src/ml/resume_optimizer.py
-import logging
-import os
-import google.generativeai as genai
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Optional, Sequence
+from ml.llm_client import LLMBlockedError, LLMClient, get_llm_client, run_blocking
+
+OPTIMIZATION_TARGETS = ('summary', 'experience', 'skills')
+
+# Per target: task heading, instructions, and how the resume is labelled in the prompt
+_TASKS = {
+    'summary': (
+        "Generate a professional summary.",
+        "Create a compelling professional summary (4-5 sentences) for the resume below, "
+        "tailored specifically to the given job description. "
+        "Include years of experience and top skills.",
+        "Resume Content",
+    ),
+    'experience': (
+        "Rewrite experience bullet points.",
+        "Rewrite the following experience section bullet points to be more impactful and relevant "
+        "to the job description. Use strong action verbs and quantify achievements. "
+        "Return the rewritten bullet points only.",
+        "Resume Experience Section",
+    ),
+    'skills': (
+        "Suggest missing skills.",
+        "Analyze the job description and the provided resume. List 10 to 15 key skills from the job description "
+        "that are missing or underrepresented in the resume. Also, suggest up to 5 related technical or soft skills "
+        "that would make the candidate a stronger fit for the role.",
+        "Resume Skills Section",
+    ),
+}
 
 class ResumeOptimizer:
-    def __init__(self, api_key: str):
-        # Configure the Gemini API client
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+    def __init__(self, api_key: Optional[str] = None, client: Optional[LLMClient] = None):
+        # Every optimizer shares one LLM client (model, connections and concurrency limit)
+        self.client = client or get_llm_client(api_key)
 
-    def _generate_prompt(self, resume_text: str, job_description: str, optimization_target: str) -> str:
+    def _system_instruction(self) -> str:
         # A master prompt that guides the AI's behavior
-        system_instruction = (
+        return (
             "You are a professional resume optimization expert. Your goal is to rewrite and "
             "provide detailed suggestions for improving a resume to perfectly match a job description. "
             "You must be factual, concise, and use action-oriented language. "
@@ -22,67 +47,63 @@ class ResumeOptimizer:
             "Only focus on the requested optimization target. Provide the output in a clean, readable format."
         )
 
-        # Crafting the user prompt based on the target
-        if optimization_target == 'summary':
-            prompt = (
-                f"{system_instruction}\n\n"
-                f"### Task: Generate a professional summary.\n"
-                f"Create a compelling professional summary (4-5 sentences) for the resume below, "
-                f"tailored specifically to the given job description. "
-                f"Include years of experience and top skills.\n\n"
-                f"**Resume Content:**\n{resume_text}\n\n"
-                f"**Job Description:**\n{job_description}"
-            )
-        elif optimization_target == 'experience':
-            prompt = (
-                f"{system_instruction}\n\n"
-                f"### Task: Rewrite experience bullet points.\n"
-                f"Rewrite the following experience section bullet points to be more impactful and relevant "
-                f"to the job description. Use strong action verbs and quantify achievements. "
-                f"Return the rewritten bullet points only.\n\n"
-                f"**Resume Experience Section:**\n{resume_text}\n\n"
-                f"**Job Description:**\n{job_description}"
-            )
-        elif optimization_target == 'skills':
-            prompt = (
-                f"{system_instruction}\n\n"
-                f"### Task: Suggest missing skills.\n"
-                f"Analyze the job description and the provided resume. List 10 to 15 key skills from the job description "
-                f"that are missing or underrepresented in the resume. Also, suggest up to 5 related technical or soft skills "
-                f"that would make the candidate a stronger fit for the role.\n\n"
-                f"**Resume Skills Section:**\n{resume_text}\n\n"
-                f"**Job Description:**\n{job_description}"
-            )
-        else:
+    def _generate_prompt(self, resume_text: str, job_description: str, optimization_target: str) -> str:
+        if optimization_target not in _TASKS:
             raise ValueError("Invalid optimization target. Choose from 'summary', 'experience', or 'skills'.")
 
-        return prompt
+        # Crafting the user prompt based on the target
+        heading, instructions, resume_label = _TASKS[optimization_target]
+        return (
+            f"{self._system_instruction()}\n\n"
+            f"### Task: {heading}\n"
+            f"{instructions}\n\n"
+            f"**{resume_label}:**\n{resume_text}\n\n"
+            f"**Job Description:**\n{job_description}"
+        )
 
-    def optimize_resume_section(self, resume_text: str, job_description: str, optimization_target: str) -> Dict[str, Any]:
-        try:
-            prompt = self._generate_prompt(resume_text, job_description, optimization_target)
-            
-            # The agent makes a call to the Gemini API
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.2, 
-                ),
-            )
-            
-            # Check for a valid response before accessing its properties
-            if not response.text:
-                raise ValueError("Gemini API returned an empty response.")
-                
-            optimized_content = response.text.strip()
+    def _generate_combined_prompt(self, resume_text: str, job_description: str, targets: Sequence[str]) -> str:
+        """
+        One prompt for several targets: the resume and job description are sent once and
+        the answers come back as one JSON object keyed by target.
+        """
+        for target in targets:
+            if target not in _TASKS:
+                raise ValueError("Invalid optimization target. Choose from 'summary', 'experience', or 'skills'.")
+
+        tasks = "\n\n".join(f"#### {target}: {_TASKS[target][0]}\n{_TASKS[target][1]}" for target in targets)
+        keys = ", ".join(f'"{target}"' for target in targets)
+        return (
+            f"{self._system_instruction()} Handle each task below on its own.\n\n"
+            f"### Tasks\n{tasks}\n\n"
+            f"**Resume Content:**\n{resume_text}\n\n"
+            f"**Job Description:**\n{job_description}\n\n"
+            f"Return a JSON object with the keys {keys}. Each value is the complete answer to that task "
+            f"as one string in a clean, readable format."
+        )
+
+    def _format_response(self, text: Any, optimization_target: str) -> Dict[str, Any]:
+        # Combined replies may hold a list (e.g. skills) where a string was asked for
+        if isinstance(text, list):
+            text = "\n".join(f"- {item}" for item in text)
+        elif text is not None and not isinstance(text, str):
+            text = json.dumps(text)
+
+        # Check for a valid response before accessing its properties
+        if not text or not text.strip():
+            raise ValueError("Gemini API returned an empty response.")
             
-            return {
-                'status': 'success',
-                'optimization_target': optimization_target,
-                'optimized_content': optimized_content,
-                'source_model': 'Gemini 1.5 Pro'
-            }       # This `except` block is your key to identifying errors
-        except genai.types.generation_types.StopCandidateException as e:
+        optimized_content = text.strip()
+        
+        return {
+            'status': 'success',
+            'optimization_target': optimization_target,
+            'optimized_content': optimized_content,
+            'source_model': self.client.label
+        }
+
+    def _format_error(self, e: Exception) -> Dict[str, Any]:
+        # This is your key to identifying errors
+        if isinstance(e, LLMBlockedError):
             # This specific exception is for content blocked by safety filters.
             return {
                 'status': 'error',
@@ -90,14 +111,76 @@ class ResumeOptimizer:
                 'error_details': str(e),
                 'optimized_content': None
             }
+        # Any other exception gets a detailed report.
+        return {
+            'status': 'error',
+            'message': "An unexpected error occurred during optimization. Please check your API key and connection.",
+            'error_details': str(e),
+            'optimized_content': None,
+        }
+
+    def optimize_resume_section(self, resume_text: str, job_description: str, optimization_target: str) -> Dict[str, Any]:
+        """
+        Blocking `optimize_resume_section_async`; also safe to call from a running event loop.
+        """
+        try:
+            return run_blocking(lambda: self.optimize_resume_section_async(resume_text, job_description, optimization_target))
         except Exception as e:
-            # Catch all other exceptions and provide a detailed report.
-            return {
-                'status': 'error',
-                'message': "An unexpected error occurred during optimization. Please check your API key and connection.",
-                'error_details': str(e),
-                'optimized_content': None,
-            }
+            return self._format_error(e)
+
+    async def optimize_resume_section_async(self, resume_text: str, job_description: str, optimization_target: str) -> Dict[str, Any]:
+        """
+        Optimizes one section ('summary', 'experience' or 'skills') with one LLM call.
+        """
+        try:
+            prompt = self._generate_prompt(resume_text, job_description, optimization_target)
+            
+            # The agent makes a call to the LLM (Gemini by default)
+            text = await self.client.generate(prompt, temperature=0.2)
+            return self._format_response(text, optimization_target)
+        except Exception as e:
+            return self._format_error(e)
+
+    def optimize_resume_sections(self, resume_text: str, job_description: str,
+                                 optimization_targets: Sequence[str] = OPTIMIZATION_TARGETS) -> Dict[str, Dict[str, Any]]:
+        """
+        Blocking `optimize_resume_sections_async`; also safe to call from a running event loop.
+        """
+        try:
+            return run_blocking(lambda: self.optimize_resume_sections_async(resume_text, job_description, optimization_targets))
+        except Exception as e:
+            error = self._format_error(e)
+            return {target: dict(error) for target in dict.fromkeys(optimization_targets)}
+
+    async def optimize_resume_sections_async(self, resume_text: str, job_description: str,
+                                             optimization_targets: Sequence[str] = OPTIMIZATION_TARGETS) -> Dict[str, Dict[str, Any]]:
+        """
+        Optimizes several sections with a single structured LLM call instead of one call
+        per section, so the resume and job description are only sent (and billed) once.
+
+        Args:
+            resume_text (str): The resume.
+            job_description (str): The job description.
+            optimization_targets (Sequence[str]): Any of 'summary', 'experience', 'skills'.
+
+        Returns:
+            dict: Target -> the same result dict optimize_resume_section returns.
+        """
+        targets = list(dict.fromkeys(optimization_targets))
+        try:
+            prompt = self._generate_combined_prompt(resume_text, job_description, targets)
+            answers = await self.client.generate_json(prompt, targets, temperature=0.2)
+        except Exception as e:
+            error = self._format_error(e)
+            return {target: dict(error) for target in targets}
+
+        results = {}
+        for target in targets:
+            try:
+                results[target] = self._format_response(answers[target], target)
+            except Exception as e:
+                results[target] = self._format_error(e)
+        return results
 
 # Example of how this class is used in your FastAPI backend
 if __name__ == '__main__':
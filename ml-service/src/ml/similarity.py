@@ -1,23 +1,131 @@
 # backend/src/ml/similarity.py
 
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import os
+from ml.encode_batcher import EncodeBatcher
+from ml.encoder import describe_backend, load_encoder
+from ml.model_registry import registry
+from ml.skill_embeddings import SkillEmbeddingTable
+from ml.taxonomy import get_taxonomy
 
 # This section is updated to find and load the model from your local folder
 current_dir = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(current_dir, "model_weights", "all-MiniLM-L6-v2")
+# Cosine a resume skill needs to count as a match for a job skill in semantic mode
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("ML_SEMANTIC_MATCH_THRESHOLD", "0.75"))
 
-try:
-    print(f"Loading model from local path: {model_path}")
-    model = SentenceTransformer(model_path)
-except Exception as e:
-    print(f"Error loading SentenceTransformer model from local path: {e}")
-    model = None
 
+def _load_encoder():
+    # Backend (torch / onnx / openvino) comes from ML_ENCODER_BACKEND
+    return load_encoder(model_path=model_path)
 
-def calculate_similarity(resume_skills: list[str], job_skills: list[str], return_details: bool = False):
+
+registry.register("sentence_encoder", _load_encoder)
+
+
+def get_model():
+    """
+    Returns the shared sentence encoder, or None if it could not be loaded.
+    """
+    try:
+        return registry.get("sentence_encoder")
+    except Exception as e:
+        print(f"Error loading SentenceTransformer model from local path: {e}")
+        return None
+
+
+def _encode_batch(texts: list[str]) -> np.ndarray:
+    model = registry.get("sentence_encoder")
+    return model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+
+
+# Concurrent requests share encoder forward passes instead of each running a batch of one
+registry.register("encode_batcher", lambda: EncodeBatcher(_encode_batch))
+
+
+def get_encode_batcher() -> EncodeBatcher:
+    return registry.get("encode_batcher")
+
+
+def _encode_texts(texts: list[str]) -> np.ndarray:
+    return get_encode_batcher().encode(texts)
+
+
+def _load_skill_embeddings():
+    taxonomy = get_taxonomy()
+    # The encoder is only loaded when the table has to be (re)built or a new skill shows up
+    key = {"taxonomy": taxonomy.version, "model": os.path.basename(model_path), "encoder": describe_backend()}
+    return SkillEmbeddingTable(_encode_texts, taxonomy.skills, key)
+
+
+registry.register("skill_embeddings", _load_skill_embeddings)
+
+
+def get_skill_embeddings():
+    """
+    Returns the shared skill embedding table, or None if it could not be loaded.
+    """
+    try:
+        return registry.get("skill_embeddings")
+    except Exception as e:
+        print(f"Error loading skill embedding table: {e}")
+        return None
+
+
+def pooled_skill_embedding(skills: list[str]) -> np.ndarray:
+    """
+    Normalized mean of the precomputed embeddings of a skill set (aliases resolved).
+    Raises RuntimeError if the embedding table is unavailable.
+    """
+    table = get_skill_embeddings()
+    if table is None:
+        raise RuntimeError("Skill embedding table is not available.")
+    taxonomy = get_taxonomy()
+    return table.pooled(taxonomy.canonical(s) for s in skills)
+
+
+def match_skills_semantic(resume_skills: list[str], job_skills: list[str],
+                          threshold: float = SEMANTIC_MATCH_THRESHOLD) -> list[dict]:
+    """
+    Finds the closest resume skill for every job skill by embedding cosine.
+
+    The full job x resume cosine matrix comes from one matrix product over the
+    precomputed (normalized) skill embeddings, so related spellings and neighbours
+    ("postgres" / "postgresql", "react" / "react.js") match without an exact hit.
+
+    Args:
+        resume_skills (list): Skills extracted from resume
+        job_skills (list): Skills extracted from job description
+        threshold (float): Minimum cosine for a match
+
+    Returns:
+        list: One dict per (canonical) job skill, in job order, with `job_skill`,
+              `resume_skill` (None below the threshold) and `score`. Empty if the
+              embedding table is unavailable.
+    """
+    taxonomy = get_taxonomy()
+    resume = list(dict.fromkeys(taxonomy.canonical(s) for s in resume_skills))
+    job = list(dict.fromkeys(taxonomy.canonical(s) for s in job_skills))
+    table = get_skill_embeddings() if resume and job else None
+    if table is None:
+        return []
+
+    scores = table.vectors(job) @ table.vectors(resume).T
+    best = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(job)), best]
+    return [
+        {
+            "job_skill": skill,
+            "resume_skill": resume[best[i]] if best_scores[i] >= threshold else None,
+            "score": round(float(best_scores[i]), 4),
+        }
+        for i, skill in enumerate(job)
+    ]
+
+
+def calculate_similarity(resume_skills: list[str], job_skills: list[str], return_details: bool = False,
+                         semantic: bool = False, context=None, skill_matches: list = None):
     """
     Calculates the semantic similarity score between resume skills and job skills.
 
@@ -25,20 +133,38 @@ def calculate_similarity(resume_skills: list[str], job_skills: list[str], return
         resume_skills (list): Skills extracted from resume
         job_skills (list): Skills extracted from job description
         return_details (bool): If True, also return matched & missing skills
+        semantic (bool): If True, a job skill also counts as matched when a resume skill
+                         is close to it in embedding space (see match_skills_semantic)
+        context (AnalysisContext, optional): Request context for these skills; its pooled
+                                             embeddings are reused instead of recomputed
+        skill_matches (list, optional): match_skills_semantic result for these skills, for
+                                        callers that also return it; computed when omitted
 
     Returns:
         int OR (int, list, list): similarity score (0-100),
                                   matched skills (if return_details=True),
                                   missing skills (if return_details=True)
     """
-    if not model or not resume_skills or not job_skills:
+    table = get_skill_embeddings() if resume_skills and job_skills else None
+    if table is None or not resume_skills or not job_skills:
         if return_details:
             return 0, [], job_skills
         return 0
 
-    # Encode skill sets
-    resume_embedding = model.encode(" ".join(resume_skills))
-    job_embedding = model.encode(" ".join(job_skills))
+    # Each skill set is the mean of its skills' precomputed embeddings
+    try:
+        if context is not None:
+            resume_embedding = context.skill_embedding("resume")
+            job_embedding = context.skill_embedding("job_description")
+        else:
+            resume_embedding = pooled_skill_embedding(resume_skills)
+            job_embedding = pooled_skill_embedding(job_skills)
+    except Exception as e:
+        # Unknown skills need the encoder; treat a failed load like a missing model
+        print(f"Error encoding skills: {e}")
+        if return_details:
+            return 0, [], job_skills
+        return 0
 
     resume_embedding = np.array(resume_embedding).reshape(1, -1)
     job_embedding = np.array(job_embedding).reshape(1, -1)
@@ -50,8 +176,13 @@ def calculate_similarity(resume_skills: list[str], job_skills: list[str], return
     score_as_percent = max(0, min(100, score_as_percent))
 
     if return_details:
-        matched = list(set(resume_skills).intersection(set(job_skills)))
-        missing = list(set(job_skills) - set(resume_skills))
-        return score_as_percent, sorted(matched), sorted(missing)
+        if semantic:
+            matches = skill_matches if skill_matches is not None else match_skills_semantic(resume_skills, job_skills)
+            matched = sorted(m["job_skill"] for m in matches if m["resume_skill"] is not None)
+            missing = sorted(m["job_skill"] for m in matches if m["resume_skill"] is None)
+            return score_as_percent, matched, missing
+        # Alias-aware set comparison as boolean vector ops over the taxonomy
+        matched, missing = get_taxonomy().compare(resume_skills, job_skills)
+        return score_as_percent, matched, missing
 
     return score_as_percent
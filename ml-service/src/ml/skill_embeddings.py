@@ -0,0 +1,273 @@
+# backend/src/ml/skill_embeddings.py
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): skills encoded on demand stay in process memory
+    fcntl = None
+
+BASE_DIR = os.path.dirname(__file__)
+# float32 rows, one per skill (row order is kept in the index file)
+SKILL_EMBEDDINGS_PATH = os.path.join(BASE_DIR, "data_model", "skill_embeddings.f32")
+SKILL_EMBEDDINGS_INDEX_PATH = os.path.join(BASE_DIR, "data_model", "skill_embeddings.json")
+
+
+def _write_json_atomic(path: str, data: dict) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def _file_lock(path: str):
+    """
+    Exclusive lock across processes (flock on a sidecar file) for updating the table.
+    """
+    with open(path, "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SkillEmbeddingTable:
+    """
+    Precomputed, L2-normalized sentence embeddings for every skill in the taxonomy.
+
+    The vectors live in a flat float32 file opened as a NumPy memmap, so workers share
+    the pages and a skill-set vector is a lookup plus a mean instead of a model call.
+    Skills outside the table are encoded on demand and appended to the file.
+
+    Several worker processes may append at once, so every write happens under a flock
+    on `<path>.lock`: the index is re-read under the lock (adopting rows other workers
+    added), new rows go after the current end of the file, which is never truncated, so
+    other workers' memmaps stay valid, and the index (skill -> row) is replaced
+    atomically. Where flock is unavailable, on-demand rows are kept in memory only.
+    """
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], skills: Iterable[str], key: Dict[str, str],
+                 path: str = SKILL_EMBEDDINGS_PATH, index_path: str = SKILL_EMBEDDINGS_INDEX_PATH):
+        """
+        Loads the table from disk, rebuilding it when it was built for different inputs.
+
+        Args:
+            encode (Callable): Maps a list of strings to a 2-D array of embeddings.
+            skills (Iterable[str]): Vocabulary to precompute (canonical skill names).
+            key (dict): Identifies what the table was built from (taxonomy version, model);
+                        a stored table with a different key is rebuilt.
+            path (str): Location of the float32 rows.
+            index_path (str): Location of the JSON index (key, dim, row order).
+        """
+        self._encode = encode
+        self.key = dict(key)
+        self.path = path
+        self.index_path = index_path
+        self.lock_path = path + ".lock"
+        self._lock = threading.Lock()
+        self._vectors = None
+        self.dim = 0
+        self.row_ids: Dict[str, int] = {}
+
+        if not self._load():
+            self._build(list(dict.fromkeys(skills)))
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def __contains__(self, skill: str) -> bool:
+        return skill in self.row_ids
+
+    def _read_index(self) -> Optional[Dict[str, int]]:
+        """
+        Skill -> row of the table on disk, or None if it is missing, unreadable, built
+        for another key or dimension, or shorter than the rows it points at.
+        """
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        skills, dim = index.get("skills", []), index.get("dim", 0)
+        if index.get("key") != self.key or not skills or not dim or (self.dim and dim != self.dim):
+            return None
+        # Tables written before rows were stored use consecutive rows
+        rows = index.get("rows") or list(range(len(skills)))
+        try:
+            if os.path.getsize(self.path) < (max(rows) + 1) * dim * 4:
+                return None
+        except OSError:
+            return None
+        self.dim = dim
+        return dict(zip(skills, rows))
+
+    def _load(self) -> bool:
+        row_ids = self._read_index()
+        if row_ids is None:
+            return False
+        self._map()
+        self.row_ids = row_ids
+        return True
+
+    def _map(self) -> None:
+        # Every whole row in the file; rows no index entry points at (a torn append) are never read
+        rows = os.path.getsize(self.path) // (self.dim * 4)
+        self._vectors = np.memmap(self.path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _encode_normalized(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self._encode(texts), dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _build(self, skills: List[str]) -> None:
+        if not skills:
+            return
+        vectors = self._encode_normalized(skills)
+        self.dim = vectors.shape[1]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if fcntl is None:
+                self._write_table(skills, vectors)
+            else:
+                with _file_lock(self.lock_path):
+                    # Another worker may have built it while this one was encoding
+                    if self._load():
+                        return
+                    self._write_table(skills, vectors)
+            self._map()
+            self.row_ids = {s: i for i, s in enumerate(skills)}
+            print(f"Built skill embedding table with {len(skills)} skills at {self.path}")
+        except OSError as e:
+            # Read-only deployments still get an in-memory table
+            print(f"Could not write skill embedding table to {self.path}: {e}")
+            self._vectors = vectors
+            self.row_ids = {s: i for i, s in enumerate(skills)}
+
+    def _write_table(self, skills: List[str], vectors: np.ndarray) -> None:
+        # A new file (new inode): memmaps of the previous table stay valid until remapped
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(vectors.tobytes())
+        os.replace(tmp_path, self.path)
+        self._write_index({s: i for i, s in enumerate(skills)})
+
+    def _write_index(self, row_ids: Dict[str, int]) -> None:
+        _write_json_atomic(self.index_path, {"key": self.key, "dim": self.dim, "skills": list(row_ids),
+                                             "rows": list(row_ids.values())})
+
+    def _append_to_file(self, skills: List[str], vectors: np.ndarray) -> bool:
+        """
+        Appends rows for the skills no worker has added yet; call with the file lock held.
+        Returns False if the table on disk is no longer this one (e.g. rebuilt for a new key).
+        """
+        row_ids = self._read_index()
+        if row_ids is None:
+            return False
+        new = [i for i, skill in enumerate(skills) if skill not in row_ids]
+        if new:
+            row_bytes = self.dim * 4
+            with open(self.path, "r+b") as f:
+                # After the last whole row actually in the file, skipping any torn partial row
+                start = -(-f.seek(0, os.SEEK_END) // row_bytes)
+                f.seek(start * row_bytes)
+                f.write(vectors[new].tobytes())
+            for offset, i in enumerate(new):
+                row_ids[skills[i]] = start + offset
+            self._write_index(row_ids)
+        # Readers don't take the lock: publish the new rows before the ids that point at them
+        self._map()
+        self.row_ids = row_ids
+        return True
+
+    def _append(self, skills: List[str], vectors: np.ndarray) -> None:
+        if not self.dim:
+            self.dim = vectors.shape[1]
+        if isinstance(self._vectors, np.memmap) and fcntl is not None:
+            try:
+                with _file_lock(self.lock_path):
+                    if self._append_to_file(skills, vectors):
+                        return
+                print(f"Skill embedding table at {self.path} changed on disk; keeping new skills in memory")
+            except OSError as e:
+                print(f"Could not append to skill embedding table at {self.path}: {e}")
+
+        start = 0 if self._vectors is None else len(self._vectors)
+        row_ids = dict(self.row_ids)
+        for i, skill in enumerate(skills):
+            row_ids[skill] = start + i
+        previous = None if self._vectors is None else np.asarray(self._vectors)
+        self._vectors = vectors if previous is None else np.vstack([previous, vectors])
+        self.row_ids = row_ids
+
+    def vectors(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Returns one normalized row per skill, encoding and appending unknown skills first.
+
+        Args:
+            skills (Iterable[str]): Canonical skill names.
+
+        Returns:
+            np.ndarray: (n, dim) float32 array.
+        """
+        skills = list(skills)
+        if not skills:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        missing = [s for s in dict.fromkeys(skills) if s not in self.row_ids]
+        if missing:
+            # Encode outside the lock so concurrent callers can share encoder batches
+            encoded = dict(zip(missing, self._encode_normalized(missing)))
+            with self._lock:
+                missing = [s for s in missing if s not in self.row_ids]
+                if missing:
+                    self._append(missing, np.stack([encoded[s] for s in missing]))
+        return np.asarray(self._vectors[[self.row_ids[s] for s in skills]])
+
+    def pooled(self, skills: Iterable[str]) -> Optional[np.ndarray]:
+        """
+        Mean of the normalized skill vectors, re-normalized; None for an empty set.
+        """
+        skills = list(dict.fromkeys(skills))
+        if not skills:
+            return None
+        mean = self.vectors(skills).mean(axis=0)
+        norm = np.linalg.norm(mean)
+        return mean / norm if norm > 0 else mean
+
+
+if __name__ == '__main__':
+    # Build the table offline and compare per-request cost: python -m ml.skill_embeddings (from ml-service/src)
+    import time
+
+    from ml.similarity import get_model, get_skill_embeddings
+
+    table = get_skill_embeddings()
+    resume = ["python", "django", "postgresql", "docker", "react"]
+    job = ["python", "flask", "kubernetes", "aws", "sql"]
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        float(table.pooled(resume) @ table.pooled(job))
+    lookup_us = (time.perf_counter() - start) * 1000
+
+    model = get_model()
+    start = time.perf_counter()
+    for _ in range(20):
+        model.encode([" ".join(resume), " ".join(job)])
+    encode_us = (time.perf_counter() - start) / 20 * 1e6
+
+    print(f"{len(table)} skills, dim {table.dim}")
+    print(f"table lookup: {lookup_us:.1f} us/pair, model encode: {encode_us:.1f} us/pair")
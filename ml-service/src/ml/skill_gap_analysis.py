@@ -1,37 +1,51 @@
 # Skill gap analysis logic
 
 # backend/src/ml/skill_gap_analysis.py
-from typing import List, Dict
+from typing import List, Dict, Optional
+from ml.taxonomy import SkillTaxonomy
 
 class SkillGapAnalyzer:
     """
     A utility class to analyze a student's skills against a target job's requirements.
     It identifies missing skills and provides a clear list of what needs to be learned.
     """
-    def __init__(self, job_data_model: Dict[str, List[str]]):
+    def __init__(self, job_data_model: Optional[Dict[str, List[str]]] = None, taxonomy: Optional[SkillTaxonomy] = None):
         """
         Initializes the analyzer with a pre-loaded model of job skills.
         
         Args:
             job_data_model (Dict[str, List[str]]): A dictionary mapping job roles to their required skills.
                                                     This model is generated and passed from a central data loading script.
+            taxonomy (SkillTaxonomy, optional): A compiled taxonomy (see ml.taxonomy.get_taxonomy) to use
+                                                instead of job_data_model; adds alias resolution.
         """
-        if not job_data_model:
-            raise ValueError("Job data model cannot be empty. It must be provided to the analyzer.")
-        self.job_data_model = job_data_model
+        if taxonomy is None:
+            if not job_data_model:
+                raise ValueError("Job data model cannot be empty. It must be provided to the analyzer.")
+            taxonomy = SkillTaxonomy(role_skills=job_data_model)
+        self.taxonomy = taxonomy
+        self.job_data_model = taxonomy.role_requirements
 
-    def analyze(self, student_skills: List[str], target_role: str) -> Dict[str, List[str]]:
+    def analyze(self, student_skills: Optional[List[str]], target_role: str, context=None) -> Dict[str, List[str]]:
         """
         Performs the core skill gap analysis.
         
         Args:
             student_skills (List[str]): A list of skills extracted from the student's resume.
             target_role (str): The target job role (e.g., 'Data Scientist').
+            context (AnalysisContext, optional): Request context; its parsed resume skills are
+                                                 used when student_skills is None.
             
         Returns:
             Dict[str, List[str]]: A dictionary containing lists of existing and missing skills.
         """
-        if target_role not in self.job_data_model:
+        if student_skills is None:
+            student_skills = context.resume_skills if context is not None else []
+
+        try:
+            # Required-and-absent / required-and-present as boolean vector ops over the taxonomy
+            missing_skills, existing_skills = self.taxonomy.gap(student_skills, target_role)
+        except KeyError:
             return {
                 "status": "error",
                 "message": f"Target role '{target_role}' not found in our database.",
@@ -39,23 +53,27 @@ class SkillGapAnalyzer:
                 "existing_skills": student_skills
             }
 
-        required_skills = set(self.job_data_model[target_role])
-        student_skills_set = {skill.strip().lower() for skill in student_skills}
-        
-        # Identify missing skills by finding the difference between the sets
-        missing_skills_set = required_skills - student_skills_set
-        
-        # Find which of the student's skills match the required skills
-        existing_skills_set = student_skills_set.intersection(required_skills)
-
         # Return the results in a clear dictionary format
         return {
             "status": "success",
             "message": "Skill gap analysis complete.",
-            "missing_skills": sorted(list(missing_skills_set)),
-            "existing_skills": sorted(list(existing_skills_set))
+            "missing_skills": missing_skills,
+            "existing_skills": existing_skills
         }
 
+    def rank_roles(self, student_skills: List[str], top_n: int = 5) -> List[Dict[str, float]]:
+        """
+        Ranks the known roles by the share of their required skills the student already has.
+
+        Args:
+            student_skills (List[str]): A list of skills extracted from the student's resume.
+            top_n (int): The number of roles to return.
+
+        Returns:
+            List[Dict[str, float]]: Dictionaries with 'role' and 'coverage' (0-1), best first.
+        """
+        return self.taxonomy.rank_roles(student_skills, top_n=top_n)
+
 # Example of how to use this class
 if __name__ == '__main__':
     # --- Sample Data Model (This is what you'd load from a file) ---
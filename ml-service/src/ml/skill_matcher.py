@@ -0,0 +1,119 @@
+# backend/src/ml/skill_matcher.py
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable, List, Tuple
+
+BASE_DIR = os.path.dirname(__file__)
+# Compiled token patterns for the skill PhraseMatcher (built from the skill taxonomy)
+SKILL_PATTERNS_PATH = os.path.join(BASE_DIR, "data_model", "skill_patterns.json")
+
+
+def file_sha256(path: str) -> str:
+    """
+    Content hash of a file, used to version artifacts derived from it.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _artifact_key(nlp, skills_hash: str) -> dict:
+    import spacy
+
+    # Tokenization can change with the spaCy release and the model's tokenizer settings
+    return {
+        "skills_hash": skills_hash,
+        "spacy_version": spacy.__version__,
+        "model": f"{nlp.meta.get('lang', '')}_{nlp.meta.get('name', '')}-{nlp.meta.get('version', '')}",
+    }
+
+
+def build_skill_patterns(nlp, terms: Iterable[Tuple[str, str]]) -> List[list]:
+    """
+    Tokenizes every term once (tokenizer only) into [skill, lowercased tokens] pairs.
+    """
+    return [[skill, [token.lower_ for token in nlp.make_doc(term)]] for term, skill in terms]
+
+
+def compile_skill_patterns(nlp, terms: Iterable[Tuple[str, str]], skills_hash: str,
+                           path: str = SKILL_PATTERNS_PATH) -> dict:
+    """
+    Builds the pattern artifact and writes it atomically to `path`.
+
+    Args:
+        nlp: The spaCy pipeline whose tokenizer defines the patterns.
+        terms (Iterable[Tuple[str, str]]): (term, skill) pairs; a skill can have several
+                                           terms (its own name plus aliases).
+        skills_hash (str): Version of the skill taxonomy the terms came from.
+        path (str): Where to write the JSON artifact.
+
+    Returns:
+        dict: The artifact that was written.
+    """
+    artifact = dict(_artifact_key(nlp, skills_hash))
+    artifact["patterns"] = build_skill_patterns(nlp, terms)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(artifact, f)
+        # mkstemp creates the file 0600; workers running as another user must be able to read it
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return artifact
+
+
+def _read_artifact(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_skill_matcher(nlp, terms: List[Tuple[str, str]], skills_hash: str, path: str = SKILL_PATTERNS_PATH):
+    """
+    Returns a case-insensitive PhraseMatcher for the (term, skill) pairs, keyed by skill string.
+
+    Patterns come from the compiled artifact when its taxonomy version, spaCy version and
+    model match; otherwise they are rebuilt with the tokenizer and the artifact is
+    rewritten (best effort) so the next worker can load it directly.
+    """
+    from spacy.matcher import PhraseMatcher
+    from spacy.tokens import Doc
+
+    artifact = _read_artifact(path)
+    key = _artifact_key(nlp, skills_hash)
+    if artifact is None or any(artifact.get(k) != v for k, v in key.items()):
+        try:
+            artifact = compile_skill_patterns(nlp, terms, skills_hash, path)
+            print(f"Compiled skill patterns to {path}")
+        except OSError as e:
+            print(f"Could not write skill patterns to {path}: {e}")
+            artifact = {"patterns": build_skill_patterns(nlp, terms)}
+
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill, words in artifact["patterns"]:
+        if words:
+            # Use the skill string as the matcher ID (lowercased)
+            matcher.add(skill, [Doc(nlp.vocab, words=words)])
+    return matcher
+
+
+if __name__ == '__main__':
+    # Offline build step: python -m ml.skill_matcher (from ml-service/src)
+    from ml.nlp_pipeline import SKILLS_HASH, get_nlp
+    from ml.taxonomy import get_taxonomy
+
+    built = compile_skill_patterns(get_nlp(), get_taxonomy().extraction_terms(), SKILLS_HASH)
+    print(f"Wrote {len(built['patterns'])} skill patterns to {SKILL_PATTERNS_PATH}")
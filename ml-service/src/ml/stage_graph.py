@@ -0,0 +1,201 @@
+# backend/src/ml/stage_graph.py
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+# Worker threads shared by every graph run for synchronous (local, CPU-bound) stages
+STAGE_WORKERS = int(os.getenv("ML_STAGE_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _local_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="report-stage")
+    return _pool
+
+
+class Stage:
+    """
+    One node of a StageGraph: a function and the names of the values it consumes.
+    """
+    def __init__(self, name: str, func: Callable, inputs: Tuple[str, ...], is_async: bool):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.is_async = is_async
+
+
+class StageGraph:
+    """
+    Small DAG executor for multi-step reports.
+
+    Each stage names its inputs; an input is either another stage's output or a value
+    passed to `run`. A stage starts as soon as all of its inputs are available, so
+    independent stages overlap: coroutine functions (network-bound LLM calls) run on the
+    event loop, plain functions (local models) run on a shared thread pool. The result of
+    a run is every stage's output plus its start offset and duration, and total latency
+    follows the slowest dependency chain instead of the sum of all stages.
+    """
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable, inputs: Iterable[str] = (), is_async: Optional[bool] = None) -> "StageGraph":
+        """
+        Declares a stage.
+
+        Args:
+            name (str): Stage name; its output is available to later stages under this name.
+            func (Callable): Called with one keyword argument per input.
+            inputs (Iterable[str]): Names of the stage outputs or run arguments it needs.
+            is_async (bool, optional): Await `func` on the event loop instead of running it on
+                                       the thread pool (detected from `func` when omitted).
+
+        Returns:
+            StageGraph: The graph, so declarations can be chained.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        if is_async is None:
+            is_async = asyncio.iscoroutinefunction(func)
+        self.stages[name] = Stage(name, func, tuple(inputs), is_async)
+        return self
+
+    def _validate(self, values: Dict[str, Any]) -> None:
+        for stage in self.stages.values():
+            for name in stage.inputs:
+                if name not in self.stages and name not in values:
+                    raise ValueError(f"Stage '{stage.name}' needs '{name}', which is neither a stage nor a run argument.")
+
+        # Depth-first search for cycles (0 = unvisited, 1 = on the current path, 2 = done)
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            state[name] = 1
+            for dep in self.stages[name].inputs:
+                if dep not in self.stages:
+                    continue
+                if state.get(dep) == 1:
+                    raise ValueError(f"Stages '{name}' and '{dep}' depend on each other.")
+                if dep not in state:
+                    visit(dep)
+            state[name] = 2
+
+        for name in self.stages:
+            if name not in state:
+                visit(name)
+
+    async def stream(self, **values) -> AsyncIterator[Tuple[str, Any, Dict[str, float]]]:
+        """
+        Runs every stage, each as soon as its inputs are ready, yielding results as
+        stages finish (so callers can forward fast stages before slow ones are done).
+
+        Args:
+            **values: The external inputs stages can name (e.g. resume_text).
+
+        Yields:
+            tuple: (stage name, output, timing) in completion order; timing has 'start_ms'
+                   relative to the start of the run and 'duration_ms'. A failing stage
+                   raises here, and closing the iterator early cancels unfinished stages.
+        """
+        self._validate(values)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def execute(stage: Stage) -> Any:
+            try:
+                deps = [tasks[name] for name in stage.inputs if name in tasks]
+                if deps:
+                    await asyncio.gather(*deps)
+                kwargs = {name: outputs[name] if name in self.stages else values[name] for name in stage.inputs}
+
+                stage_start = time.perf_counter()
+                if stage.is_async:
+                    result = await stage.func(**kwargs)
+                else:
+                    result = await loop.run_in_executor(_local_pool(), functools.partial(stage.func, **kwargs))
+                stage_end = time.perf_counter()
+            except BaseException as e:
+                finished.put_nowait((stage.name, e))
+                raise
+
+            outputs[stage.name] = result
+            timings[stage.name] = {
+                "start_ms": round((stage_start - started) * 1000, 2),
+                "duration_ms": round((stage_end - stage_start) * 1000, 2),
+            }
+            finished.put_nowait((stage.name, None))
+            return result
+
+        # Tasks are created in declaration order; each one waits on its own dependencies
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(execute(stage))
+        try:
+            for _ in range(len(tasks)):
+                name, error = await finished.get()
+                if error is not None:
+                    raise error
+                yield name, outputs[name], timings[name]
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            # Collect the cancelled/failed tasks so their exceptions are not reported as unhandled
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def run_async(self, **values) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+        """
+        Runs every stage (see `stream`) and returns once all of them are done.
+
+        Returns:
+            tuple: (outputs by stage name, timings by stage name)
+        """
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        async for name, output, timing in self.stream(**values):
+            outputs[name] = output
+            timings[name] = timing
+        return outputs, timings
+
+    def run(self, **values) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+        """
+        Blocking `run_async` for callers without an event loop.
+        """
+        return asyncio.run(self.run_async(**values))
+
+
+if __name__ == '__main__':
+    # Three independent 200 ms stages and one that needs two of them: ~400 ms, not 800 ms
+    def local(name):
+        def work(**_):
+            time.sleep(0.2)
+            return name
+        return work
+
+    async def remote(**_):
+        await asyncio.sleep(0.2)
+        return "remote"
+
+    graph = (StageGraph()
+             .add("a", local("a"), inputs=("text",))
+             .add("b", local("b"), inputs=("text",))
+             .add("c", remote)
+             .add("d", local("d"), inputs=("a", "c")))
+
+    start = time.perf_counter()
+    outputs, timings = graph.run(text="hello")
+    print(f"total: {(time.perf_counter() - start) * 1000:.0f} ms")
+    for name, timing in timings.items():
+        print(f"  {name}: {timing}")
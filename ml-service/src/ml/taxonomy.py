@@ -0,0 +1,193 @@
+# backend/src/ml/taxonomy.py
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ml.model_registry import registry
+from ml.skill_matcher import file_sha256
+
+BASE_DIR = os.path.dirname(__file__)
+# Extraction vocabulary, grouped by category
+SKILLS_FILE = os.path.join(BASE_DIR, "skills.json")
+# Required skills per target role
+SKILL_GAP_FILE = os.path.join(BASE_DIR, "skill_gap.json")
+# alias/synonym -> canonical skill name
+SKILL_ALIASES_FILE = os.path.join(BASE_DIR, "skill_aliases.json")
+TAXONOMY_FILES = (SKILLS_FILE, SKILL_GAP_FILE, SKILL_ALIASES_FILE)
+# Bump when the way the files are compiled changes (e.g. which terms are extracted)
+TAXONOMY_FORMAT = "3"
+
+
+def taxonomy_version(paths: Iterable[str] = TAXONOMY_FILES) -> str:
+    """
+    Content hash over the taxonomy files and TAXONOMY_FORMAT; anything derived from
+    the taxonomy (matcher patterns, parse caches, embedding tables) is keyed by it.
+    """
+    digest = hashlib.sha256()
+    digest.update(TAXONOMY_FORMAT.encode("utf-8"))
+    for path in paths:
+        digest.update(file_sha256(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.strip().lower().split())
+
+
+class SkillTaxonomy:
+    """
+    Compiled skill vocabulary shared by extraction, matching and gap analysis.
+
+    Every canonical skill gets an integer id; aliases (e.g. "k8s") resolve to their
+    canonical name ("kubernetes") before lookup. A skill set is represented as a NumPy
+    boolean vector over the vocabulary, and role requirements as a boolean
+    roles x skills matrix, so matching and gap analysis are vectorized bit operations.
+
+    Aliases are extraction terms too: "k8s" in a resume is extracted as "kubernetes".
+    Keep them unambiguous, since an alias that is also an everyday word would be
+    extracted wherever it appears. Role requirements are reported under the names
+    skill_gap.json gives them.
+    """
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None,
+                 role_skills: Optional[Dict[str, List[str]]] = None,
+                 aliases: Optional[Dict[str, str]] = None, version: Optional[str] = None):
+        """
+        Args:
+            categories (dict, optional): Category -> skills used for extraction.
+            role_skills (dict, optional): Role -> required skills.
+            aliases (dict, optional): Alias -> canonical skill.
+            version (str, optional): Identifier of the source data (see taxonomy_version).
+        """
+        categories = categories or {}
+        role_skills = role_skills or {}
+        self.version = version
+        self.aliases = {normalize_skill(a): normalize_skill(c) for a, c in (aliases or {}).items()}
+
+        self.categories = {
+            name: list(dict.fromkeys(self.canonical(s) for s in skills))
+            for name, skills in categories.items()
+        }
+        # Requirements as written in skill_gap.json (what gap() reports) and their canonical skills
+        self.role_requirements = {
+            normalize_skill(role): list(dict.fromkeys(normalize_skill(s) for s in skills))
+            for role, skills in role_skills.items()
+        }
+        self.role_skills = {
+            role: list(dict.fromkeys(self.canonical(s) for s in skills))
+            for role, skills in self.role_requirements.items()
+        }
+
+        vocabulary = [s for skills in self.categories.values() for s in skills]
+        vocabulary += [s for skills in self.role_skills.values() for s in skills]
+        vocabulary += list(self.aliases.values())
+        self.skills: List[str] = list(dict.fromkeys(vocabulary))
+        self.skill_ids: Dict[str, int] = {s: i for i, s in enumerate(self.skills)}
+
+        # Extraction terms: skills.json entries and alias surface forms, each with its canonical skill
+        self._terms = [(normalize_skill(s), self.canonical(s)) for skills in categories.values() for s in skills]
+        self._terms += list(self.aliases.items())
+
+        self.role_names: List[str] = list(self.role_skills)
+        self.role_ids: Dict[str, int] = {r: i for i, r in enumerate(self.role_names)}
+        self.role_matrix = np.zeros((len(self.role_names), len(self.skills)), dtype=bool)
+        for r, skills in enumerate(self.role_skills.values()):
+            self.role_matrix[r, [self.skill_ids[s] for s in skills]] = True
+        self._role_sizes = self.role_matrix.sum(axis=1)
+        # Per role: requirement names and the skill id each one resolves to
+        self._requirement_names = [np.array(names, dtype=object) for names in self.role_requirements.values()]
+        self._requirement_ids = [np.array([self.skill_ids[self.canonical(s)] for s in names], dtype=np.int64)
+                                 for names in self.role_requirements.values()]
+
+    @classmethod
+    def from_files(cls, skills_file: str = SKILLS_FILE, skill_gap_file: str = SKILL_GAP_FILE,
+                   aliases_file: str = SKILL_ALIASES_FILE) -> "SkillTaxonomy":
+        data = []
+        for path in (skills_file, skill_gap_file, aliases_file):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Taxonomy file not found at {path}")
+            with open(path, "r", encoding="utf-8") as f:
+                data.append(json.load(f))
+        return cls(*data, version=taxonomy_version((skills_file, skill_gap_file, aliases_file)))
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def canonical(self, skill: str) -> str:
+        skill = normalize_skill(skill)
+        return self.aliases.get(skill, skill)
+
+    def extraction_terms(self) -> List[Tuple[str, str]]:
+        """
+        (term, canonical skill) pairs to build extraction patterns from: the
+        skills.json vocabulary followed by every alias.
+        """
+        return list(dict.fromkeys(self._terms))
+
+    def to_vector(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Boolean vector over the vocabulary; skills outside it are ignored.
+        """
+        vector = np.zeros(len(self.skills), dtype=bool)
+        ids = [self.skill_ids[s] for s in map(self.canonical, skills) if s in self.skill_ids]
+        vector[ids] = True
+        return vector
+
+    def from_vector(self, vector: np.ndarray) -> List[str]:
+        """
+        Sorted skill names set in a boolean vector.
+        """
+        return sorted(self.skills[i] for i in np.flatnonzero(vector))
+
+    def compare(self, have: Iterable[str], want: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Returns (matched, missing): skills of `want` present / absent in `have`,
+        after alias resolution. Skills outside the vocabulary fall back to set logic.
+        """
+        have = {self.canonical(s) for s in have}
+        want = {self.canonical(s) for s in want}
+        have_vec, want_vec = self.to_vector(have), self.to_vector(want)
+
+        matched = self.from_vector(want_vec & have_vec)
+        missing = self.from_vector(want_vec & ~have_vec)
+
+        unknown = {s for s in want if s not in self.skill_ids}
+        matched += sorted(unknown & have)
+        missing += sorted(unknown - have)
+        return sorted(matched), sorted(missing)
+
+    def gap(self, skills: Iterable[str], role: str) -> Tuple[List[str], List[str]]:
+        """
+        Returns (missing, existing) required skills of a role for a skill set, under the
+        role's own requirement names (matching is alias-aware).
+        Raises KeyError for unknown roles.
+        """
+        r = self.role_ids[normalize_skill(role)]
+        have = self.to_vector(skills)[self._requirement_ids[r]]
+        names = self._requirement_names[r]
+        return sorted(names[~have].tolist()), sorted(names[have].tolist())
+
+    def role_coverage(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Fraction of each role's required skills covered by the skill set, in role_names order.
+        """
+        covered = (self.role_matrix & self.to_vector(skills)).sum(axis=1)
+        return covered / np.maximum(self._role_sizes, 1)
+
+    def rank_roles(self, skills: Iterable[str], top_n: int = 5) -> List[Dict[str, float]]:
+        """
+        Roles whose requirements the skill set covers best.
+        """
+        coverage = self.role_coverage(skills)
+        order = np.argsort(-coverage, kind="stable")[:top_n]
+        return [{"role": self.role_names[i], "coverage": round(float(coverage[i]), 4)} for i in order]
+
+
+registry.register("skill_taxonomy", SkillTaxonomy.from_files)
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    return registry.get("skill_taxonomy")
@@ -0,0 +1,68 @@
+# backend/tests/test_fuzzy_index.py
+# FuzzySkillIndex must return exactly what the brute-force partial_ratio loop returns
+
+import random
+import string
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from ml.fuzzy_index import FuzzySkillIndex, brute_force_match
+
+ALPHABET = string.ascii_lowercase + "+#.-"
+
+
+def _word(rng, low=1, high=14):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(low, high)))
+
+
+def _mutate(rng, word):
+    # One random edit, so some tokens land just above or below the threshold
+    i = rng.randrange(len(word) + 1)
+    edit = rng.choice(["insert", "delete", "replace"])
+    if edit == "insert" or not word:
+        return word[:i] + rng.choice(ALPHABET) + word[i:]
+    i = min(i, len(word) - 1)
+    if edit == "delete":
+        return word[:i] + word[i + 1:]
+    return word[:i] + rng.choice(ALPHABET) + word[i + 1:]
+
+
+def test_matches_brute_force_on_random_vocabularies():
+    for seed in range(20):
+        rng = random.Random(seed)
+        skills = list({_word(rng) for _ in range(rng.randint(20, 120))})
+        tokens = [_word(rng, 1, 20) for _ in range(60)]
+        tokens += [rng.choice(skills) for _ in range(20)]
+        tokens += [_mutate(rng, rng.choice(skills)) for _ in range(40)]
+        tokens += [_word(rng, 2, 5) + rng.choice(skills) + _word(rng, 0, 4) for _ in range(20)]
+        threshold = rng.choice([80, 92])
+
+        index = FuzzySkillIndex(skills, threshold=threshold)
+        assert index.match(tokens) == brute_force_match(tokens, skills, threshold), seed
+
+
+def test_memoized_tokens_give_the_same_result():
+    rng = random.Random(7)
+    skills = list({_word(rng) for _ in range(80)})
+    index = FuzzySkillIndex(skills, memo_size=10)
+    for _ in range(5):
+        tokens = [_mutate(rng, rng.choice(skills)) for _ in range(30)]
+        expected = brute_force_match(tokens, skills)
+        assert index.match(tokens) == expected
+        assert index.match(tokens) == expected
+
+
+def test_empty_inputs():
+    index = FuzzySkillIndex(["python", "sql"])
+    assert index.match([]) == set()
+    assert index.match(["", ""]) == set()
+    assert FuzzySkillIndex([]).match(["python"]) == set()
+
+
+if __name__ == '__main__':
+    print("Running fuzzy index tests...")
+    test_matches_brute_force_on_random_vocabularies()
+    test_memoized_tokens_give_the_same_result()
+    test_empty_inputs()
+    print("All tests passed!")
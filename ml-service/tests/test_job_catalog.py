@@ -0,0 +1,143 @@
+# backend/tests/test_job_catalog.py
+# JobCatalog: upserts, deletes, rebuilds and incremental snapshots
+
+import random
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pandas as pd
+
+from ml import job_catalog
+from ml.job_catalog import JobCatalog
+from ml.recommendation import CareerRecommender
+
+SKILLS = ["python", "sql", "docker", "react", "css", "java", "spring", "aws", "kubernetes", "pandas",
+          "tableau", "excel", "figma", "linux", "terraform", "go", "rust", "kafka", "spark", "scala"]
+
+
+def _create(directory, n_jobs=40):
+    rng = random.Random(n_jobs)
+    rows = [{"role_title": f"Role {i}", "combined_text": " ".join(rng.sample(SKILLS, 5))} for i in range(n_jobs)]
+    csv_path = os.path.join(directory, "jobs.csv")
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    catalog = JobCatalog(os.path.join(directory, "catalog"))
+    catalog.create(csv_path)
+    return catalog
+
+
+def _same(a, b):
+    assert list(a.job_ids) == list(b.job_ids)
+    assert list(a.role_titles) == list(b.role_titles)
+    assert list(a.texts) == list(b.texts)
+    assert (a.job_vectors != b.job_vectors).nnz == 0
+    assert list(a.base_rows) == list(b.base_rows)
+    assert list(a.delta_rows) == list(b.delta_rows)
+
+
+def test_upsert_delete_and_rebuild():
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = _create(directory)
+        assert len(catalog.snapshot()) == 40
+
+        catalog.upsert_jobs([
+            {"job_id": "row-3", "role_title": "Data Engineer", "combined_text": "spark kafka scala"},
+            {"job_id": "new-1", "role_title": "Frontend Developer", "combined_text": "react css figma"},
+        ])
+        catalog.delete_jobs(["row-0", "row-1"])
+        snapshot = catalog.snapshot()
+        ids = list(snapshot.job_ids)
+        assert "row-0" not in ids and "row-1" not in ids
+        # An edited job keeps its position; a new one is appended
+        assert ids.index("row-3") == 1 and ids[-1] == "new-1"
+        assert snapshot.role_titles[ids.index("row-3")] == "Data Engineer"
+        assert catalog.stats()["delta_rows"] == 4
+
+        top = CareerRecommender.from_catalog(snapshot).get_recommendations("react css figma", top_n=1)
+        assert top[0]["role_title"] == "Frontend Developer"
+
+        catalog.rebuild()
+        rebuilt = catalog.snapshot()
+        assert list(rebuilt.job_ids) == ids
+        stats = catalog.stats()
+        assert stats["segments"] == 1 and stats["delta_rows"] == 0 and not stats["rebuild_due"]
+
+
+def test_rebuild_due_after_many_changes():
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = _create(directory, n_jobs=8)
+        catalog.upsert_jobs([{"job_id": "new-1", "role_title": "A", "combined_text": "python"}])
+        assert not catalog.rebuild_due()
+        catalog.delete_jobs(["row-1", "row-2"])
+        assert catalog.rebuild_due()
+
+
+def test_incremental_snapshot_matches_full_reload():
+    previous_min_rows = job_catalog.ANN_MIN_ROWS
+    for ann_min_rows in (0, 1):
+        job_catalog.ANN_MIN_ROWS = ann_min_rows
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                catalog = _create(directory)
+                rng = random.Random(ann_min_rows)
+                previous = catalog.snapshot()
+                for step in range(30):
+                    ids = list(previous.job_ids)
+                    op = rng.random()
+                    if op < 0.5:
+                        job_id = rng.choice(ids + [f"new-{step}"])
+                        catalog.upsert_jobs([{"job_id": job_id, "role_title": f"Role {step}",
+                                              "combined_text": " ".join(rng.sample(SKILLS, 4))}])
+                    elif op < 0.85:
+                        catalog.delete_jobs(rng.sample(ids, 2))
+                    else:
+                        catalog.rebuild()
+                    current = catalog.snapshot(previous=previous)
+                    _same(current, catalog.snapshot())
+                    assert current.generation == catalog.generation()
+                    previous = current
+        finally:
+            job_catalog.ANN_MIN_ROWS = previous_min_rows
+
+
+def test_ann_recommendations_match_exact_scores():
+    previous_min_rows = job_catalog.ANN_MIN_ROWS
+    job_catalog.ANN_MIN_ROWS = 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            catalog = _create(directory, n_jobs=120)
+            catalog.upsert_jobs([{"job_id": "new-1", "role_title": "Platform Engineer",
+                                  "combined_text": "kubernetes terraform aws linux"}])
+            catalog.delete_jobs(["row-5"])
+            snapshot = catalog.snapshot()
+            assert snapshot.ann_index is not None and list(snapshot.delta_rows) == [len(snapshot) - 1]
+
+            with_ann = CareerRecommender.from_catalog(snapshot)
+            exact = CareerRecommender.from_catalog(snapshot)
+            exact.ann_index = None
+            for query in ["python sql pandas", "kubernetes terraform aws linux", "react css", "java spring kafka"]:
+                # Candidates are rescored on their TF-IDF vectors
+                exact_scores = {r["role_title"]: round(r["match_score"], 6)
+                                for r in exact.get_recommendations(query, top_n=len(snapshot))}
+                for r in with_ann.get_recommendations(query):
+                    assert round(r["match_score"], 6) == exact_scores[r["role_title"]], query
+
+                # Probing every list is exact
+                with_ann.ann_nprobe = with_ann.ann_index.n_lists
+                got = [round(r["match_score"], 6) for r in with_ann.get_recommendations(query)]
+                expected = [round(r["match_score"], 6) for r in exact.get_recommendations(query)]
+                assert got == expected, query
+                with_ann.ann_nprobe = 8
+            assert with_ann.get_recommendations("kubernetes terraform aws linux", top_n=1)[0]["role_title"] == "Platform Engineer"
+    finally:
+        job_catalog.ANN_MIN_ROWS = previous_min_rows
+
+
+if __name__ == '__main__':
+    print("Running job catalog tests...")
+    test_upsert_delete_and_rebuild()
+    test_rebuild_due_after_many_changes()
+    test_incremental_snapshot_matches_full_reload()
+    test_ann_recommendations_match_exact_scores()
+    print("All tests passed!")
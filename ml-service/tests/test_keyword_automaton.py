@@ -0,0 +1,73 @@
+# backend/tests/test_keyword_automaton.py
+# Aho-Corasick keyword search must agree with the per-keyword \b regex it replaced
+
+import random
+import re
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+
+from ml.ats_checker import ATSChecker
+from ml.keyword_automaton import AhoCorasick, regex_word_boundary
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/ml/data_model'))
+# Word characters (including non-ASCII and digits), separators and punctuation
+ALPHABET = "ab1_é9 .-+#/\n,"
+
+
+def test_regex_word_boundary_matches_re():
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+        expected = {m.start() for m in re.finditer(r"\b", text)}
+        assert {i for i in range(len(text) + 1) if regex_word_boundary(text, i)} == expected, repr(text)
+
+
+def test_automaton_finds_every_occurrence():
+    rng = random.Random(1)
+    for _ in range(200):
+        patterns = list({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(8)})
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 40)))
+        automaton = AhoCorasick()
+        for pattern in patterns:
+            automaton.add(pattern)
+        found = sorted(automaton.iter_matches(text))
+        expected = sorted((i, i + len(p), p) for p in patterns for i in range(len(text)) if text.startswith(p, i))
+        assert found == expected, (patterns, text)
+
+
+def test_token_patterns():
+    automaton = AhoCorasick()
+    automaton.add(["machine", "learning"], "ml")
+    automaton.add(["learning"], "learning")
+    tokens = ["deep", "machine", "learning", "and", "learning"]
+    assert list(automaton.iter_matches(tokens)) == [(1, 3, "ml"), (2, 3, "learning"), (4, 5, "learning")]
+
+
+def test_find_keywords_matches_regex():
+    checker = ATSChecker(os.path.join(DATA_DIR, "ats_vectorizer.pkl"), os.path.join(DATA_DIR, "job_keywords.pkl"),
+                         load_spacy=False)
+    keywords = list(checker.job_keywords)
+    rng = random.Random(2)
+    separators = [" ", " ", ", ", ".\n", "-", "/", "_", ""]
+    for _ in range(40):
+        words = []
+        for _ in range(rng.randint(5, 40)):
+            word = rng.choice(keywords) if rng.random() < 0.5 else rng.choice(["Led", "team", "x", "2023", "é"])
+            words.append(word.upper() if rng.random() < 0.1 else word)
+            words.append(rng.choice(separators))
+        resume = "".join(words)
+        lowered = resume.lower()
+        expected = np.array([bool(re.search(r"\b" + re.escape(k) + r"\b", lowered)) for k in keywords])
+        assert np.array_equal(checker._find_keywords(resume), expected), resume
+
+
+if __name__ == '__main__':
+    print("Running keyword automaton tests...")
+    test_regex_word_boundary_matches_re()
+    test_automaton_finds_every_occurrence()
+    test_token_patterns()
+    test_find_keywords_matches_regex()
+    print("All tests passed!")
@@ -0,0 +1,83 @@
+# backend/tests/test_recommendation.py
+# Top-k selection must match a full stable sort, including the order of ties; batch
+# recommendations must match single ones however they are chunked
+
+import random
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+import pandas as pd
+
+from ml import recommendation
+from ml.job_catalog import JobCatalog
+from ml.recommendation import CareerRecommender, top_k_indices, top_k_rows
+
+SKILLS = ["python", "sql", "docker", "react", "css", "java", "spring", "aws", "kubernetes", "pandas"]
+
+
+def _tie_heavy(rng, shape):
+    # Few distinct values (and many zero rows) so most cuts fall inside a run of ties
+    scores = rng.integers(0, rng.integers(1, 5), size=shape).astype(np.float64) / 4
+    if len(shape) == 2:
+        scores[rng.random(shape[0]) < 0.3] = 0
+    return scores
+
+
+def test_top_k_indices_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        n = int(rng.integers(1, 60))
+        scores = _tie_heavy(rng, (n,))
+        for k in (0, 1, 3, int(rng.integers(1, n + 1)), n, n + 2):
+            expected = np.argsort(-scores, kind='stable')[:max(k, 0)]
+            assert np.array_equal(top_k_indices(scores, k), expected), (scores, k)
+
+
+def test_top_k_rows_matches_stable_sort():
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        shape = (int(rng.integers(1, 12)), int(rng.integers(1, 40)))
+        scores = _tie_heavy(rng, shape)
+        for k in (1, 3, int(rng.integers(1, shape[1] + 1)), shape[1], shape[1] + 1):
+            expected = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+            assert np.array_equal(top_k_rows(scores, k), expected), (scores, k)
+
+
+def test_distinct_scores():
+    rng = np.random.default_rng(2)
+    scores = rng.random((20, 500))
+    assert np.array_equal(top_k_rows(scores, 5), np.argsort(-scores, axis=1)[:, :5])
+    assert np.array_equal(top_k_indices(scores[0], 5), np.argsort(-scores[0])[:5])
+
+
+def test_batch_chunks_fit_the_memory_budget():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "jobs.csv")
+        pd.DataFrame([{"role_title": f"Role {i}", "combined_text": " ".join(rng.sample(SKILLS, 4))}
+                      for i in range(30)]).to_csv(csv_path, index=False)
+        catalog = JobCatalog(os.path.join(directory, "catalog"))
+        catalog.create(csv_path)
+        recommender = CareerRecommender.from_catalog(catalog.snapshot())
+
+    students = [" ".join(rng.sample(SKILLS, 3)) for _ in range(10)]
+    previous_block_mb = recommendation.BATCH_BLOCK_MB
+    # Room for three rows of 30 float64 scores: the students are scored in four chunks
+    recommendation.BATCH_BLOCK_MB = 3 * 30 * 8 / 2**20
+    try:
+        batch = list(recommender.get_recommendations_batch(iter(students), top_n=3))
+    finally:
+        recommendation.BATCH_BLOCK_MB = previous_block_mb
+    assert batch == [recommender.get_recommendations(s, top_n=3) for s in students]
+
+
+if __name__ == '__main__':
+    print("Running top-k tests...")
+    test_top_k_indices_matches_stable_sort()
+    test_top_k_rows_matches_stable_sort()
+    test_distinct_scores()
+    test_batch_chunks_fit_the_memory_budget()
+    print("All tests passed!")
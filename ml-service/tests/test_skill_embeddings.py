@@ -0,0 +1,98 @@
+# backend/tests/test_skill_embeddings.py
+# SkillEmbeddingTable: on-demand appends, reloads and concurrent writers
+
+import json
+import multiprocessing
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import numpy as np
+
+from ml.skill_embeddings import SkillEmbeddingTable
+
+KEY = {"taxonomy": "test", "model": "fake"}
+
+
+def _encode(texts):
+    # Deterministic across processes (no str hash randomization)
+    rows = []
+    for text in texts:
+        seed = int.from_bytes(text.encode("utf-8")[:8].ljust(8, b"\0"), "little") + len(text)
+        rows.append(np.random.default_rng(seed).standard_normal(16))
+    return np.array(rows)
+
+
+def _expected(skills):
+    vectors = _encode(skills).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _table(directory, skills=("python", "java")):
+    return SkillEmbeddingTable(_encode, skills, KEY, os.path.join(directory, "skills.f32"),
+                               os.path.join(directory, "skills.json"))
+
+
+def test_build_append_and_reload():
+    with tempfile.TemporaryDirectory() as directory:
+        table = _table(directory)
+        assert len(table) == 2 and "python" in table
+
+        skills = ["python", "rust", "go", "rust"]
+        assert np.allclose(table.vectors(skills), _expected(skills), atol=1e-6)
+        assert len(table) == 4
+
+        reloaded = _table(directory)
+        assert reloaded.row_ids == table.row_ids
+        assert np.allclose(reloaded.vectors(["go", "java"]), _expected(["go", "java"]), atol=1e-6)
+
+
+def test_other_key_rebuilds():
+    with tempfile.TemporaryDirectory() as directory:
+        _table(directory).vectors(["rust"])
+        table = SkillEmbeddingTable(_encode, ["sql"], dict(KEY, model="other"),
+                                    os.path.join(directory, "skills.f32"), os.path.join(directory, "skills.json"))
+        assert list(table.row_ids) == ["sql"]
+
+
+def test_pooled_is_normalized():
+    with tempfile.TemporaryDirectory() as directory:
+        table = _table(directory)
+        assert table.pooled([]) is None
+        assert abs(np.linalg.norm(table.pooled(["python", "java", "sql"])) - 1) < 1e-6
+
+
+def _append_worker(args):
+    directory, worker = args
+    table = _table(directory)
+    for i in range(30):
+        skills = [f"skill-{(worker * 7 + i * j) % 50}" for j in range(1, 4)]
+        if not np.allclose(table.vectors(skills), _expected(skills), atol=1e-6):
+            return False
+    return True
+
+
+def test_concurrent_appends_keep_every_row():
+    if not hasattr(os, "fork"):
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        _table(directory)
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            assert all(pool.map(_append_worker, [(directory, w) for w in range(6)]))
+
+        table = _table(directory)
+        with open(os.path.join(directory, "skills.json"), encoding="utf-8") as f:
+            rows = json.load(f)["rows"]
+        assert len(set(rows)) == len(rows) == len(table)
+        skills = list(table.row_ids)
+        assert np.allclose(table.vectors(skills), _expected(skills), atol=1e-6)
+
+
+if __name__ == '__main__':
+    print("Running skill embedding table tests...")
+    test_build_append_and_reload()
+    test_other_key_rebuilds()
+    test_pooled_is_normalized()
+    test_concurrent_appends_keep_every_row()
+    print("All tests passed!")
@@ -0,0 +1,100 @@
+# backend/tests/test_skill_engines.py
+# The "automaton" skill engine must agree with the spaCy Matcher on every input
+
+import random
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import spacy
+
+from ml import nlp_pipeline
+from ml.model_registry import registry
+from ml.preprocess import clean_text
+
+FILLER = ("we are looking for an engineer with experience in and strong knowledge of building "
+          "scalable services using years of hands-on work on cloud platforms team").split()
+PUNCTUATION = ["+", "++", "-", "--", ".", "...", "#", "@", "_", "/", "(", ")", " ", " "]
+
+
+def setup_module(module=None):
+    # Only the tokenizer is used for skills, so a blank English pipeline is enough
+    registry.set("spacy", spacy.blank("en"))
+    registry.reset("skill_matcher")
+    registry.reset("skill_automaton")
+
+
+def teardown_module(module=None):
+    registry.reset("spacy")
+    registry.reset("skill_matcher")
+    registry.reset("skill_automaton")
+
+
+def _terms():
+    return [term for term, _ in nlp_pipeline.get_taxonomy().extraction_terms()]
+
+
+def _sentence(rng, terms):
+    words = []
+    for _ in range(rng.randint(6, 20)):
+        words.append(rng.choice(terms) if rng.random() < 0.3 else rng.choice(FILLER))
+        if rng.random() < 0.15:
+            words[-1] += ","
+    return " ".join(words).capitalize() + rng.choice([".", "!", ":"])
+
+
+def _adversarial(rng, terms):
+    # Skills glued to punctuation and abbreviations ("r.", "c++11", "x--y", "r_")
+    parts = []
+    for _ in range(rng.randint(3, 12)):
+        r = rng.random()
+        parts.append(rng.choice(terms) if r < 0.35 else rng.choice(FILLER + ["r.", "c.", "a", "2019"])
+                     if r < 0.7 else rng.choice(PUNCTUATION))
+        parts.append(rng.choice(["", " ", " ", rng.choice(PUNCTUATION)]))
+    return "".join(parts)
+
+
+def test_automaton_matches_matcher():
+    rng = random.Random(1)
+    terms = _terms()
+    texts = [" ".join(_sentence(rng, terms) for _ in range(rng.randint(1, 4))) for _ in range(300)]
+    texts += [_adversarial(rng, terms) for _ in range(1000)]
+    for text in texts:
+        cleaned = clean_text(text)
+        assert nlp_pipeline._skills_in(cleaned, "automaton") == nlp_pipeline._skills_in(cleaned, "matcher"), text
+
+
+def test_matcher_is_the_default_engine():
+    assert nlp_pipeline.DEFAULT_SKILL_ENGINE in nlp_pipeline.SKILL_ENGINES
+    if not os.getenv("ML_SKILL_ENGINE"):
+        assert nlp_pipeline.DEFAULT_SKILL_ENGINE == "matcher"
+
+
+def test_aliases_extract_canonical_skill():
+    resume = "Deployed services on K8s, backed by Postgres."
+    skills = nlp_pipeline.parse_resume(resume, use_cache=False)["skills"]
+    assert "kubernetes" in skills and "postgresql" in skills
+    assert "k8s" not in skills and "postgres" not in skills
+    for engine in nlp_pipeline.SKILL_ENGINES:
+        assert {"kubernetes", "postgresql"} <= nlp_pipeline._skills_in(clean_text(resume), engine)
+
+
+def test_unknown_engine_is_rejected():
+    try:
+        nlp_pipeline._skills_in("python", "regex")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for an unknown skill engine")
+
+
+if __name__ == '__main__':
+    print("Running skill engine tests...")
+    setup_module()
+    try:
+        test_automaton_matches_matcher()
+        test_matcher_is_the_default_engine()
+        test_aliases_extract_canonical_skill()
+        test_unknown_engine_is_rejected()
+    finally:
+        teardown_module()
+    print("All tests passed!")
@@ -0,0 +1,117 @@
+# backend/tests/test_stage_graph.py
+# StageGraph: validation, dependency order, concurrency and error propagation
+
+import asyncio
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from ml.stage_graph import StageGraph
+
+
+def _raises(exc_type, func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except exc_type as e:
+        return e
+    raise AssertionError(f"expected {exc_type.__name__}")
+
+
+def test_outputs_flow_between_stages():
+    async def shout(text):
+        return text.upper()
+
+    graph = (StageGraph()
+             .add("words", lambda text: text.split(), inputs=("text",))
+             .add("loud", shout, inputs=("text",))
+             .add("summary", lambda words, loud: f"{len(words)}:{loud}", inputs=("words", "loud")))
+    outputs, timings = graph.run(text="a b c")
+    assert outputs == {"words": ["a", "b", "c"], "loud": "A B C", "summary": "3:A B C"}
+    assert set(timings) == {"words", "loud", "summary"}
+    assert timings["summary"]["start_ms"] >= timings["loud"]["start_ms"]
+
+
+def test_rejects_cycles_unknown_inputs_and_duplicates():
+    cyclic = (StageGraph()
+              .add("a", lambda c: c, inputs=("c",))
+              .add("b", lambda a: a, inputs=("a",))
+              .add("c", lambda b: b, inputs=("b",)))
+    assert "depend on each other" in str(_raises(ValueError, cyclic.run))
+
+    self_loop = StageGraph().add("a", lambda a: a, inputs=("a",))
+    _raises(ValueError, self_loop.run)
+
+    missing = StageGraph().add("a", lambda text: text, inputs=("text",))
+    assert "'text'" in str(_raises(ValueError, missing.run))
+
+    _raises(ValueError, StageGraph().add("a", lambda: 1).add, "a", lambda: 2)
+
+
+def test_independent_stages_overlap():
+    def slow(**_):
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+    async def remote(**_):
+        await asyncio.sleep(0.2)
+        return "remote"
+
+    graph = (StageGraph()
+             .add("a", slow, inputs=("text",))
+             .add("b", slow, inputs=("text",))
+             .add("c", remote)
+             .add("d", lambda a, c: (a, c), inputs=("a", "c")))
+    start = time.perf_counter()
+    outputs, _ = graph.run(text="x")
+    elapsed = time.perf_counter() - start
+    assert outputs["d"][1] == "remote"
+    # Three 200 ms stages run side by side; a sequential run would take 600 ms or more
+    assert elapsed < 0.5, elapsed
+
+
+def test_errors_propagate_and_cancel_pending_stages():
+    def fail(text):
+        raise RuntimeError("boom")
+
+    async def slow_remote(text):
+        await asyncio.sleep(5)
+        return text
+
+    graph = (StageGraph()
+             .add("bad", fail, inputs=("text",))
+             .add("slow", slow_remote, inputs=("text",))
+             .add("after", lambda bad: bad, inputs=("bad",)))
+    start = time.perf_counter()
+    assert "boom" in str(_raises(RuntimeError, graph.run, text="x"))
+    # The slow stage was cancelled instead of awaited
+    assert time.perf_counter() - start < 2
+
+
+def test_stream_yields_in_completion_order():
+    async def delayed(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    async def fast():
+        return await delayed(0.01, "fast")
+
+    async def slow():
+        return await delayed(0.1, "slow")
+
+    async def collect():
+        graph = StageGraph().add("slow", slow).add("fast", fast)
+        return [name async for name, _, _ in graph.stream()]
+
+    assert asyncio.run(collect()) == ["fast", "slow"]
+
+
+if __name__ == '__main__':
+    print("Running stage graph tests...")
+    test_outputs_flow_between_stages()
+    test_rejects_cycles_unknown_inputs_and_duplicates()
+    test_independent_stages_overlap()
+    test_errors_propagate_and_cancel_pending_stages()
+    test_stream_yields_in_completion_order()
+    print("All tests passed!")